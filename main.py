@@ -1,7 +1,6 @@
-import numpy as np
 import pygame
 
-from nozzlesim import Wall, Point, Mesh
+from nozzlesim import Wall, Point, Mesh, export
 
 if __name__ == "__main__":
     pygame.init()
@@ -16,9 +15,8 @@ if __name__ == "__main__":
     print(endx)
     mesh = Mesh(1.25, 1, [], topwalls + bottomwalls, endx, 1)
     mesh.simulate()
-    table = mesh.getxytable(0, 1000, 0.011)
     mesh.drawallshocks(screen, displaybounds, x_dim, y_dim)
-    np.savetxt("table.csv", table, delimiter=",")
+    export.write(export.contour(mesh.contour(), 0, 1000, 0.011), "table.csv")
     print(mesh.calcarearatio())
     running = True
     while running:
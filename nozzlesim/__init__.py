@@ -2,16 +2,24 @@
 
 from .point import Point
 from .shock import Shock
-from .wall import Wall
-from .mesh import Mesh, drawshock, convertpoint
-from . import helperfuncs
+from .wall import SymmetryPlane, Wall
+from .contour import Contour, Polyline
+from .mesh import Mesh
+from .render import drawshock, convertpoint
+from . import cache, helperfuncs, isentropic, kernels
 
 __all__ = [
     "Point",
     "Shock",
     "Wall",
+    "SymmetryPlane",
     "Mesh",
+    "Contour",
+    "Polyline",
     "drawshock",
     "convertpoint",
+    "cache",
     "helperfuncs",
+    "isentropic",
+    "kernels",
 ]
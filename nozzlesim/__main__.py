@@ -0,0 +1,7 @@
+"""Entry point of ``python -m nozzlesim``; see :mod:`nozzlesim.cli`."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
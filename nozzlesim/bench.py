@@ -0,0 +1,300 @@
+"""Benchmarks of the solver and the gas-dynamics kernels.
+
+Run ``python -m nozzlesim.bench --out bench.json`` to time the ``main.py``
+symmetric arc case over a range of wall counts ``n`` and turning angles
+``theta``, and to microbenchmark :func:`~nozzlesim.helperfuncs.calcmach`,
+:func:`~nozzlesim.helperfuncs.shockprop` and
+:meth:`Shock.findintersection <nozzlesim.shock.Shock.findintersection>`.
+
+The report records wall time, events per second and peak traced memory per
+case.  It also records the exponent ``k`` of a least-squares fit of
+``time ~ n ** k`` per ``theta``, and the per-call time of each
+microbenchmark with cold (just cleared) and warm memo caches.  Reports from
+two commits are compared with ``python -m nozzlesim.bench --compare
+base.json head.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterable, Optional, Sequence
+
+import numpy as np
+
+from . import cache
+from . import helperfuncs as h
+from .mesh import Mesh
+from .point import Point
+from .shock import Shock
+from .wall import Wall
+
+NS = (5, 10, 20, 50, 100, 200, 500)
+THETAS = (20.0, 34.45)
+QUICKNS = (5, 10, 20, 40)
+MICROCALLS = 2000
+
+
+def arcmesh(n: int, theta: float, gamma: float = 1.25) -> Mesh:
+    """Return the unsimulated symmetric arc mesh of ``main.py``."""
+
+    topwalls, endx = Wall.createarc(Point(0, 0.5), 0.007, theta, n)
+    bottomwalls, endx = Wall.createarc(Point(0, -0.5), 0.007, -theta, n)
+    return Mesh(gamma, 1, [], topwalls + bottomwalls, endx, 1)
+
+
+def timecase(n: int, theta: float, memory: bool = True) -> dict:
+    """Simulate one arc case and return its timings.
+
+    The case runs once untraced for the timings.  With ``memory`` it runs a
+    second time under :mod:`tracemalloc` for ``peakmemory`` (bytes).
+    Memo caches are cleared first so every case starts cold.
+    """
+
+    cache.clear()
+    mesh = arcmesh(n, theta)
+    start = time.perf_counter()
+    events = mesh.simulate()
+    seconds = time.perf_counter() - start
+    result = {
+        "n": n,
+        "theta": theta,
+        "seconds": seconds,
+        "events": events,
+        "eventspersec": events / seconds if seconds > 0 else None,
+        "segments": len(mesh.shocks),
+        "peakmemory": None,
+    }
+    if memory:
+        del mesh
+        cache.clear()
+        tracemalloc.start()
+        try:
+            arcmesh(n, theta).simulate()
+            result["peakmemory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def fitexponent(ns: Sequence[float], values: Sequence[float]) -> Optional[float]:
+    """Return ``k`` of the least-squares fit ``values ~ ns ** k``.
+
+    Pairs with a non-positive or missing value are skipped; fewer than two
+    distinct ``ns`` give ``None``.
+    """
+
+    pairs = [(n, v) for n, v in zip(ns, values) if v is not None and v > 0]
+    if len({n for n, _ in pairs}) < 2:
+        return None
+    x, y = np.log(np.array(pairs, dtype=float)).T
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def scaling(cases: Iterable[dict]) -> dict:
+    """Return the fitted scaling exponents of ``cases`` per ``theta``."""
+
+    bytheta: dict[float, list[dict]] = {}
+    for case in cases:
+        bytheta.setdefault(case["theta"], []).append(case)
+    fits = {}
+    for theta, group in bytheta.items():
+        ns = [case["n"] for case in group]
+        fits[str(theta)] = {
+            name: fitexponent(ns, [case[name] for case in group])
+            for name in ("seconds", "events", "segments", "peakmemory")
+        }
+    return fits
+
+
+def timecalls(func: Callable, args: Sequence[tuple]) -> float:
+    """Return the mean seconds per call of ``func`` over ``args``."""
+
+    start = time.perf_counter()
+    for a in args:
+        func(*a)
+    return (time.perf_counter() - start) / len(args)
+
+
+def microargs(calls: int, seed: int = 0) -> dict[str, list[tuple]]:
+    """Return distinct, physically valid arguments for each microbenchmark."""
+
+    rng = random.Random(seed)
+    gamma = 1.25
+    vmax = h.calcvmax(gamma)
+    calcmach = [(gamma, 1.0, rng.uniform(0.1, 0.9 * vmax)) for _ in range(calls)]
+    shockprop = [
+        (gamma, rng.uniform(1.0, 60.0), rng.uniform(-20, 20), rng.uniform(-1, 1))
+        for _ in range(calls)
+    ]
+    intersection = [
+        (
+            Point(rng.random(), rng.random()),
+            Point(rng.random(), rng.random()),
+            rng.uniform(-80, 80),
+            rng.uniform(-80, 80),
+        )
+        for _ in range(calls)
+    ]
+    return {
+        "calcmach": calcmach,
+        "shockprop": shockprop,
+        "findintersection": intersection,
+    }
+
+
+def microbenchmarks(calls: int = MICROCALLS) -> dict:
+    """Return the per-call seconds of the kernel microbenchmarks.
+
+    Memoized kernels report ``cold`` (first call on each argument after
+    clearing the caches) and ``warm`` (the same calls again).
+    :meth:`Shock.findintersection` is not memoized and reports one time under
+    both names.
+    """
+
+    args = microargs(calls)
+    funcs = {
+        "calcmach": h.calcmach,
+        "shockprop": h.shockprop,
+        "findintersection": Shock.findintersection,
+    }
+    # Make room for every argument so the warm pass only sees hits; unbounded
+    # caches (``maxsize=None``) already have room.
+    sizes = {
+        name: info.maxsize
+        for name, info in cache.stats().items()
+        if info.maxsize is not None
+    }
+    for name in sizes:
+        cache.configure(maxsize=max(calls, *sizes.values()), name=name)
+    results = {}
+    try:
+        for name, func in funcs.items():
+            # Build the Prandtl-Meyer table outside the timed loop.
+            h.calcmach(1.25, 1.0, 1.0)
+            cache.clear()
+            cold = timecalls(func, args[name])
+            warm = timecalls(func, args[name])
+            results[name] = {"cold": cold, "warm": warm, "calls": calls}
+    finally:
+        for name, maxsize in sizes.items():
+            cache.configure(maxsize=maxsize, name=name)
+        cache.clear()
+    return results
+
+
+def gitcommit() -> Optional[str]:
+    """Return the current git commit hash, or ``None`` outside a checkout."""
+
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run(
+    ns: Sequence[int] = NS,
+    thetas: Sequence[float] = THETAS,
+    memory: bool = True,
+    calls: int = MICROCALLS,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Run the whole suite and return the report.
+
+    ``progress`` is called with each case result as it finishes.
+    """
+
+    cases = []
+    for theta in thetas:
+        for n in ns:
+            case = timecase(n, theta, memory)
+            cases.append(case)
+            if progress is not None:
+                progress(case)
+    return {
+        "commit": gitcommit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "cases": cases,
+        "scaling": scaling(cases),
+        "micro": microbenchmarks(calls) if calls else {},
+    }
+
+
+def timings(report: dict) -> dict[str, float]:
+    """Return the timings of ``report`` by name, for comparison."""
+
+    out = {}
+    for case in report["cases"]:
+        out[f"arc n={case['n']} theta={case['theta']}"] = case["seconds"]
+    for name, result in report["micro"].items():
+        for mode in ("cold", "warm"):
+            out[f"{name} {mode}"] = result[mode]
+    return out
+
+
+def compare(base: dict, head: dict) -> list[tuple[str, float, float, float]]:
+    """Return ``(name, base, head, head / base)`` for timings in both reports."""
+
+    old, new = timings(base), timings(head)
+    return [
+        (name, old[name], new[name], new[name] / old[name])
+        for name in old
+        if name in new and old[name] > 0
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m nozzlesim.bench")
+    parser.add_argument("--n", type=int, nargs="+", help="wall counts to run")
+    parser.add_argument("--theta", type=float, nargs="+", help="arc angles to run")
+    parser.add_argument("--quick", action="store_true", help=f"use n in {QUICKNS}")
+    parser.add_argument("--calls", type=int, default=MICROCALLS)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASE", "HEAD"), help="compare two reports"
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path) as f:
+                reports.append(json.load(f))
+        for name, old, new, ratio in compare(*reports):
+            print(f"{name:40s} {old:12.6g} {new:12.6g} {ratio:7.2f}x")
+        return 0
+
+    ns = args.n or (QUICKNS if args.quick else NS)
+    thetas = args.theta or THETAS
+
+    def progress(case):
+        print(
+            f"n={case['n']:4d} theta={case['theta']:6.2f} "
+            f"{case['seconds']:9.3f}s {case['events']:8d} events",
+            file=sys.stderr,
+        )
+
+    report = run(ns, thetas, not args.no_memory, args.calls, progress)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""Bounded memoization for the helpers in :mod:`nozzlesim.helperfuncs`.
+
+:func:`memoize` replaces ``functools.lru_cache(maxsize=None)``.  Every
+memoized function gets a least-recently-used cache with a size limit and
+counters for hits, misses and evictions.  The caches are registered by the
+qualified name of their function (``"nozzlesim.helperfuncs.calcmach"``) so
+they can be inspected, resized or cleared together::
+
+    from nozzlesim import cache
+
+    cache.configure(maxsize=256, tolerance=1e-12)
+    ...
+    for name, stats in cache.stats().items():
+        print(name, stats.hitrate)
+    cache.clear()
+
+With a non-zero ``tolerance``, float arguments are rounded to multiples of it
+before they are used as keys.  Calls whose arguments differ by less than that
+then share one entry, and return the result computed for whichever of them
+was seen first.  The default of ``0`` keeps keys exact.
+
+The registry holds caches weakly: one disappears with its function.  A
+second function with the same qualified name is registered with a ``-2``
+(``-3``, ...) suffix.  Functions may also be looked up by their bare name
+when only one cache has it.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+# Entries kept per function unless configured otherwise.
+DEFAULT_MAXSIZE = 1024
+
+_registry: "weakref.WeakValueDictionary[str, MemoCache]" = weakref.WeakValueDictionary()
+
+
+class CacheStats(NamedTuple):
+    """Counters of a single :class:`MemoCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    maxsize: Optional[int]
+    tolerance: float
+
+    @property
+    def hitrate(self) -> float:
+        """Fraction of calls answered from the cache."""
+
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+
+class MemoCache:
+    """Least-recently-used cache for the results of ``func``.
+
+    ``maxsize=None`` lets the cache grow without limit and ``maxsize=0``
+    disables it.  :meth:`wrap` returns the function that calls ``func``
+    through the cache.  Lookups take no lock, so the counters are approximate
+    when several threads share a cache; evictions and reconfiguration are
+    serialized.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        maxsize: Optional[int] = DEFAULT_MAXSIZE,
+        tolerance: float = 0.0,
+    ) -> None:
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.maxsize = None
+        self.tolerance = 0.0
+        self.configure(maxsize, tolerance)
+
+    def key(self, args: tuple, kwargs: dict) -> tuple:
+        """Return the cache key for a call with ``args`` and ``kwargs``."""
+
+        if kwargs:
+            args = args + (None,) + tuple(sorted(kwargs.items()))
+        tol = self.tolerance
+        if tol:
+            args = tuple(
+                round(arg / tol) if type(arg) is float else arg for arg in args
+            )
+        return args
+
+    def wrap(self) -> Callable:
+        """Return ``func`` wrapped in this cache.
+
+        The wrapper has ``cache_clear``, ``cache_info`` and ``cache``
+        attributes, like a :func:`functools.lru_cache` function.
+        """
+
+        func, entries = self.func, self.entries
+
+        def wrapper(*args, **kwargs):
+            key = self.key(args, kwargs) if kwargs or self.tolerance else args
+            try:
+                result = entries[key]
+            except KeyError:
+                pass
+            else:
+                self.hits += 1
+                try:
+                    entries.move_to_end(key)
+                except KeyError:  # evicted by another thread meanwhile
+                    pass
+                return result
+
+            self.misses += 1
+            # Not under the lock: memoized helpers call each other.
+            result = func(*args, **kwargs)
+            if self.maxsize != 0:
+                entries[key] = result
+                if self.maxsize is not None and len(entries) > self.maxsize:
+                    with self.lock:
+                        self.trim()
+            return result
+
+        functools.update_wrapper(wrapper, func)
+        wrapper.cache = self
+        wrapper.cache_clear = self.cache_clear
+        wrapper.cache_info = self.cache_info
+        return wrapper
+
+    def trim(self) -> None:
+        """Evict least recently used entries until the size limit holds."""
+
+        if self.maxsize is None:
+            return
+        while len(self.entries) > self.maxsize:
+            try:
+                self.entries.popitem(last=False)
+            except KeyError:
+                break
+            self.evictions += 1
+
+    def configure(
+        self, maxsize: Optional[int] = -1, tolerance: Optional[float] = None
+    ) -> None:
+        """Change the size limit and key tolerance; ``-1``/``None`` keep them.
+
+        Changing the tolerance drops every entry, since old keys no longer
+        match.  Shrinking the limit evicts entries straight away.
+        """
+
+        if maxsize is not None and maxsize != -1 and maxsize < 0:
+            raise ValueError("maxsize must be non-negative or None")
+        if tolerance is not None and tolerance < 0:
+            raise ValueError("tolerance must be non-negative")
+        with self.lock:
+            if maxsize != -1:
+                self.maxsize = maxsize
+            if tolerance is not None and tolerance != self.tolerance:
+                self.tolerance = tolerance
+                self.entries.clear()
+            self.trim()
+
+    def cache_clear(self) -> None:
+        """Drop all entries and reset the counters."""
+
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def cache_info(self) -> CacheStats:
+        """Return the current counters."""
+
+        return CacheStats(
+            self.hits,
+            self.misses,
+            self.evictions,
+            len(self.entries),
+            self.maxsize,
+            self.tolerance,
+        )
+
+
+def memoize(
+    func: Optional[Callable] = None,
+    *,
+    maxsize: Optional[int] = DEFAULT_MAXSIZE,
+    tolerance: float = 0.0,
+):
+    """Decorator caching ``func`` in a registered :class:`MemoCache`.
+
+    Usable bare (``@memoize``) or with arguments (``@memoize(maxsize=64)``).
+    """
+
+    def decorate(func: Callable) -> Callable:
+        memo = MemoCache(func, maxsize, tolerance)
+        register(memo)
+        return memo.wrap()
+
+    if func is None:
+        return decorate
+    return decorate(func)
+
+
+def register(memo: MemoCache) -> None:
+    """Add ``memo`` to the registry, suffixing its name if that is taken."""
+
+    name, count = memo.name, 1
+    while name in _registry:
+        count += 1
+        name = f"{memo.name}-{count}"
+    memo.name = name
+    _registry[name] = memo
+
+
+def getcache(name: str) -> MemoCache:
+    """Return the registered cache called ``name``.
+
+    ``name`` is a qualified name as in :func:`stats`, or the bare function
+    name if no other cache has it.
+    """
+
+    memo = _registry.get(name)
+    if memo is not None:
+        return memo
+    matches = [m for key, m in list(_registry.items()) if key.split(".")[-1] == name]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        names = sorted(m.name for m in matches)
+        raise KeyError(f"{name!r} is ambiguous, use one of {names}")
+    raise KeyError(f"no memoized function named {name!r}")
+
+
+def configure(
+    maxsize: Optional[int] = -1,
+    tolerance: Optional[float] = None,
+    name: Optional[str] = None,
+) -> None:
+    """Apply :meth:`MemoCache.configure` to one cache or, by default, all."""
+
+    caches = [getcache(name)] if name is not None else list(_registry.values())
+    for memo in caches:
+        memo.configure(maxsize, tolerance)
+
+
+def clear(name: Optional[str] = None) -> None:
+    """Clear one cache or, by default, all of them."""
+
+    caches = [getcache(name)] if name is not None else list(_registry.values())
+    for memo in caches:
+        memo.cache_clear()
+
+
+def stats() -> dict[str, CacheStats]:
+    """Return the counters of every registered cache by qualified name."""
+
+    return {name: memo.cache_info() for name, memo in list(_registry.items())}
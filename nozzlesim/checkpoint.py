@@ -0,0 +1,273 @@
+"""Binary checkpoints of :class:`~nozzlesim.mesh.Mesh` simulation state.
+
+A checkpoint file holds everything needed to continue a simulation:
+
+* the 8 byte magic ``b"NZCKPT01"``,
+* a little-endian ``uint32`` header length followed by a JSON header with the
+  scalar mesh state (``gamma``, ``initialmach``, ``x``, ``remainingangle``,
+  ``endexpansion``, ``tolerance``), the mesh settings (``mergeturn``,
+  ``maxturn``, ``retain``, ``spillpath``), the spill counters and the record
+  count, padded with spaces so the records start on a 64 byte boundary,
+* one fixed-size record per segment (dtype :data:`RECORD`).
+
+Records follow the order of :attr:`Mesh.shocks`, then any wall in
+:attr:`Mesh.wallsegments` that is not among them.  ``active`` holds the
+position in :attr:`Mesh.activeshocks`, or ``-1``.  Because the records are a
+plain array at a known offset, :func:`readcheckpoint` can memory-map them.
+Nothing has to be parsed to inspect a large run.
+
+:class:`SegmentLog` uses the same records for the segments a
+memory-bounded mesh spills to disk (see the ``retain`` argument of
+:class:`~nozzlesim.mesh.Mesh`).  A log is the magic ``b"NZSEGLOG"`` padded
+to 64 bytes followed by records, and :func:`readsegmentlog` memory-maps it.
+A mesh resumed from a checkpoint keeps appending to the log it spilled to,
+after dropping any records written after the checkpoint was saved.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Optional, Union
+
+import numpy as np
+
+from .point import Point
+from .shock import Shock
+from .store import SHOCK, WALL
+from .wall import SymmetryPlane, Wall
+
+MAGIC = b"NZCKPT01"
+LOGMAGIC = b"NZSEGLOG"
+ALIGNMENT = 64
+
+RECORD = np.dtype(
+    [
+        ("startx", "<f8"),
+        ("starty", "<f8"),
+        ("endx", "<f8"),
+        ("endy", "<f8"),
+        ("angle", "<f8"),
+        ("v", "<f8"),
+        ("theta", "<f8"),
+        ("gamma", "<f8"),
+        ("turningangle", "<f8"),
+        ("active", "<i4"),
+        ("kind", "i1"),
+        ("flags", "u1"),
+    ]
+)
+
+# Bits of the ``flags`` field.
+INSHOCKS = 1
+INWALLSEGMENTS = 2
+HASEND = 4
+SYMMETRY = 8  # a wall record that is a :class:`SymmetryPlane`
+
+
+def torecords(mesh) -> np.ndarray:
+    """Return the segments of ``mesh`` as an array of :data:`RECORD`."""
+
+    arrays = mesh.as_arrays()
+    count = len(arrays["kind"])
+    inshocks = {id(seg) for seg in mesh.shocks}
+    extra = [w for w in mesh.wallsegments if id(w) not in inshocks]
+
+    records = np.zeros(count + len(extra), dtype=RECORD)
+    for name in arrays:
+        records[name][:count] = arrays[name]
+    for i, wall in enumerate(extra, count):
+        records[i]["startx"], records[i]["starty"] = wall.start.x, wall.start.y
+        records[i]["angle"] = wall.angle
+        records[i]["kind"] = WALL
+        end = (np.nan, np.nan) if wall.end is None else (wall.end.x, wall.end.y)
+        records[i]["endx"], records[i]["endy"] = end
+        for name in ("v", "theta", "gamma", "turningangle"):
+            records[i][name] = np.nan
+
+    flags = np.where(~np.isnan(records["endx"]), HASEND, 0)
+    flags[:count] |= INSHOCKS
+    rows = {id(seg): i for i, seg in enumerate(mesh.shocks)}
+    rows.update((id(wall), i) for i, wall in enumerate(extra, count))
+    for wall in mesh.wallsegments:
+        flags[rows[id(wall)]] |= INWALLSEGMENTS
+    for seg in mesh.shocks + extra:
+        if isinstance(seg, SymmetryPlane):
+            flags[rows[id(seg)]] |= SYMMETRY
+    records["flags"] = flags
+    records["active"] = -1
+    for i, seg in enumerate(mesh.activeshocks):
+        records["active"][rows[id(seg)]] = i
+    return records
+
+
+def save(mesh, path: str) -> None:
+    """Write a checkpoint of ``mesh`` to ``path``."""
+
+    records = torecords(mesh)
+    log = mesh.log
+    header = {
+        "version": 2,
+        "count": len(records),
+        "gamma": mesh.gamma,
+        "initialmach": mesh.initialmach,
+        "x": mesh.x,
+        "remainingangle": mesh.remainingangle,
+        "endexpansion": mesh.endexpansion,
+        "tolerance": mesh.index.tolerance,
+        "mergeturn": mesh.mergeturn,
+        "maxturn": mesh.maxturn,
+        "retain": mesh.retain,
+        "spillpath": None if log is None else log.path,
+        "spillcount": None if log is None else log.count,
+        "spillstats": mesh.spillstats,
+    }
+    if log is not None:
+        log.flush()
+    text = json.dumps(header).encode()
+    used = len(MAGIC) + 4 + len(text)
+    text += b" " * (-used % ALIGNMENT)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(text)))
+        f.write(text)
+        f.write(records.tobytes())
+
+
+def readcheckpoint(
+    path: str, mmap: bool = True
+) -> tuple[dict, Union[np.ndarray, np.memmap]]:
+    """Return the header and records of the checkpoint at ``path``.
+
+    With ``mmap`` the records are a read-only memory map of the file.
+    """
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path!r} is not a nozzlesim checkpoint")
+        (size,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(size))
+        offset = f.tell()
+        if not mmap:
+            records = np.fromfile(f, dtype=RECORD, count=header["count"])
+    if mmap:
+        if header["count"] == 0:
+            records = np.zeros(0, dtype=RECORD)
+        else:
+            records = np.memmap(
+                path, RECORD, mode="r", offset=offset, shape=(header["count"],)
+            )
+    if len(records) != header["count"]:
+        raise ValueError(f"checkpoint {path!r} is truncated")
+    return header, records
+
+
+def load(cls, path: str, mmap: bool = True):
+    """Rebuild a ``cls`` (a :class:`Mesh`) from the checkpoint at ``path``."""
+
+    header, records = readcheckpoint(path, mmap)
+    segments = []
+    for rec in records.tolist():
+        startx, starty, endx, endy, angle, v, theta, gamma, turn, _, kind, flags = rec
+        end = Point(endx, endy) if flags & HASEND else None
+        if kind == WALL and flags & SYMMETRY:
+            seg = SymmetryPlane(Point(startx, starty))
+            seg.end = end
+        elif kind == WALL:
+            seg = Wall(Point(startx, starty), angle, end)
+        else:
+            seg = Shock(Point(startx, starty), turn, gamma, v, theta, end)
+            seg.angle = angle
+        segments.append(seg)
+
+    flags = records["flags"]
+    shocks = [seg for seg, f in zip(segments, flags) if f & INSHOCKS]
+    walls = [seg for seg, f in zip(segments, flags) if f & INWALLSEGMENTS]
+    retain = header.get("retain", "all")
+    mesh = cls(
+        header["gamma"],
+        header["initialmach"],
+        walls,
+        shocks,
+        header["endexpansion"],
+        header["remainingangle"],
+        header["x"],
+        header["tolerance"],
+        # The spill log is reopened below rather than started afresh.
+        retain="discard" if retain == "spill" else retain,
+        mergeturn=header.get("mergeturn", 0.0),
+        maxturn=header.get("maxturn"),
+    )
+    if retain == "spill":
+        mesh.retain = retain
+        mesh.log = SegmentLog(header["spillpath"], header["spillcount"])
+    if "spillstats" in header:
+        mesh.spillstats = dict(header["spillstats"])
+    positions = records["active"]
+    order = np.argsort(positions, kind="stable")
+    mesh.activeshocks = [segments[i] for i in order if positions[i] >= 0]
+    return mesh
+
+
+def fromarrays(arrays: dict) -> np.ndarray:
+    """Return store columns (see :meth:`CharacteristicStore.take`) as records."""
+
+    records = np.zeros(len(arrays["kind"]), dtype=RECORD)
+    for name, column in arrays.items():
+        records[name] = column
+    records["active"] = -1
+    records["flags"] = np.where(np.isnan(records["endx"]), 0, HASEND) | INSHOCKS
+    return records
+
+
+class SegmentLog:
+    """Append-only file of segment records.
+
+    With ``count`` an existing log is reopened and cut back to its first
+    ``count`` records instead of starting a new one.
+    """
+
+    def __init__(self, path: str, count: Optional[int] = None) -> None:
+        self.path = path
+        if count is None:
+            self.count = 0
+            self.file = open(path, "wb")
+            self.file.write(LOGMAGIC.ljust(ALIGNMENT, b" "))
+            return
+        self.file = open(path, "r+b")
+        if self.file.read(len(LOGMAGIC)) != LOGMAGIC:
+            self.file.close()
+            raise ValueError(f"{path!r} is not a nozzlesim segment log")
+        size = ALIGNMENT + count * RECORD.itemsize
+        if self.file.seek(0, 2) < size:
+            self.file.close()
+            raise ValueError(f"segment log {path!r} is truncated")
+        self.file.truncate(size)
+        self.file.seek(size)
+        self.count = count
+
+    def append(self, records: np.ndarray) -> None:
+        """Write ``records`` to the end of the log."""
+
+        self.file.write(np.ascontiguousarray(records, dtype=RECORD).tobytes())
+        self.count += len(records)
+
+    def flush(self) -> None:
+        if not self.file.closed:
+            self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def readsegmentlog(path: str) -> np.ndarray:
+    """Return the records of the segment log at ``path`` as a read-only memmap."""
+
+    with open(path, "rb") as f:
+        if f.read(len(LOGMAGIC)) != LOGMAGIC:
+            raise ValueError(f"{path!r} is not a nozzlesim segment log")
+        f.seek(0, 2)
+        count = (f.tell() - ALIGNMENT) // RECORD.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD)
+    return np.memmap(path, RECORD, mode="r", offset=ALIGNMENT, shape=(count,))
@@ -0,0 +1,203 @@
+"""Headless batch runs of nozzle cases described in TOML or JSON files.
+
+Run ``python -m nozzlesim cases.toml --out results``.  A config file holds
+case parameters with the names of :data:`nozzlesim.sweep.DEFAULTS`::
+
+    outputs = ["contour", "nodes"]   # any of OUTPUTS
+    format = "csv"                   # csv, npz or bin
+
+    [defaults]                       # applied to every case
+    gamma = 1.25
+
+    [[cases]]                        # one table per case
+    name = "baseline"
+    n = 20
+
+    [grid]                           # and/or the product of value lists
+    n = [10, 40]
+    theta = [20.0, 30.0]
+
+Without ``cases`` or ``grid`` the defaults are a single case.  Each case is
+simulated without a display and its outputs are streamed to
+``<out>/<name>.<dataset>.<format>`` with :mod:`nozzlesim.export`.  The
+contour is sampled at ``tablepoints`` points, ``tabledeltax`` apart from
+``tablestart``.  A ``plot`` pattern renders the mesh into the output
+directory.  Case names must be unique across all config files.  One line
+per case with its events and timing goes to stdout and, as JSON, to
+``<out>/results.jsonl``.
+
+Only the solver is imported at startup; :mod:`tomllib` and the process pool
+of ``--workers`` are loaded when needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Optional, Sequence
+
+from . import export, render
+from .sweep import DEFAULTS, buildmesh, grid
+
+OUTPUTS = ("contour", "segments", "nodes")
+
+# Settings of a config file that are not case parameters.
+SETTINGS = {"outputs": ["contour"], "format": "csv"}
+
+
+def loadconfig(path: str) -> dict:
+    """Return the contents of the ``.toml`` or ``.json`` file at ``path``."""
+
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+def expandcases(config: dict, prefix: str = "case") -> list[tuple[str, dict]]:
+    """Return ``(name, params)`` for every case of ``config``.
+
+    Unnamed cases are called ``prefix`` followed by their position.  Unknown
+    parameters raise ``ValueError``.
+    """
+
+    unknown = set(config) - {"defaults", "cases", "grid", *SETTINGS}
+    if unknown:
+        raise ValueError(f"unknown config sections: {sorted(unknown)}")
+    defaults = config.get("defaults", {})
+    cases = [{**defaults, **case} for case in config.get("cases", [])]
+    if "grid" in config:
+        cases += [{**defaults, **case} for case in grid(**config["grid"])]
+    if "cases" not in config and "grid" not in config:
+        cases = [dict(defaults)]
+
+    out = []
+    for i, case in enumerate(cases):
+        name = str(case.pop("name", f"{prefix}{i:04d}"))
+        unknown = set(case) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"case {name!r} has unknown parameters {sorted(unknown)}")
+        out.append((name, case))
+    return out
+
+
+def runcase(
+    name: str, params: dict, outdir: str, outputs: Sequence[str], format: str
+) -> dict:
+    """Simulate one case, write its outputs and return its result record.
+
+    Errors are reported in the record's ``error`` instead of being raised.
+    """
+
+    p = {**DEFAULTS, **params}
+    result = {"name": name, "params": params, "files": []}
+    start = time.perf_counter()
+    try:
+        mesh = buildmesh(p)
+        result["events"] = mesh.simulate(engine=p["engine"])
+        result["seconds"] = time.perf_counter() - start
+        result["arearatio"] = mesh.calcarearatio()
+        result["segments"] = len(mesh.shocks)
+        datasets = {
+            "contour": lambda: export.contour(
+                mesh.contour(), p["tablestart"], p["tablepoints"], p["tabledeltax"]
+            ),
+            "segments": lambda: export.segments(mesh),
+            "nodes": lambda: export.nodes(mesh),
+        }
+        for output in outputs:
+            path = os.path.join(outdir, f"{name}.{output}.{format}")
+            export.write(datasets[output](), path, format)
+            result["files"].append(path)
+        if p["plot"]:
+            path = os.path.join(outdir, p["plot"].format(name=name, **p))
+            width, height = p["plotsize"]
+            render.savemesh(mesh, path, p["plotbounds"], width, height)
+            result["files"].append(path)
+        result["error"] = None
+    except Exception as exc:  # reported per case, see docstring
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def _runcase(args: tuple) -> dict:
+    return runcase(*args)
+
+
+def describe(result: dict) -> str:
+    """Return the one-line summary printed for ``result``."""
+
+    name = f"{result['name']:24s}"
+    if result["error"] is not None:
+        return f"{name} failed after {result['elapsed']:.3f}s: {result['error']}"
+    return (
+        f"{name} {result['events']:9d} events "
+        f"{result['seconds']:9.3f}s  arearatio {result['arearatio']:.6f}"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="nozzlesim", description="Simulate nozzle cases from config files."
+    )
+    parser.add_argument("configs", nargs="+", help="TOML or JSON case files")
+    parser.add_argument("-o", "--out", default="nozzlesim-out", help="output directory")
+    parser.add_argument(
+        "--outputs", nargs="*", choices=OUTPUTS, help="datasets to write"
+    )
+    parser.add_argument("--format", choices=export.FORMATS, help="output file format")
+    parser.add_argument("--workers", type=int, default=1, help="parallel processes")
+    args = parser.parse_args(argv)
+
+    jobs = []
+    try:
+        for path in args.configs:
+            config = loadconfig(path)
+            prefix = os.path.splitext(os.path.basename(path))[0] + "-"
+            outputs = args.outputs
+            if outputs is None:
+                outputs = config.get("outputs", SETTINGS["outputs"])
+            format = args.format or config.get("format", SETTINGS["format"])
+            if set(outputs) - set(OUTPUTS) or format not in export.FORMATS:
+                raise ValueError(f"{path}: unknown outputs or format")
+            for name, params in expandcases(config, prefix):
+                jobs.append((name, params, args.out, outputs, format))
+        # Cases write to files named after them.
+        names = [job[0] for job in jobs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate case names {duplicates}")
+    except (OSError, ValueError) as exc:
+        print(f"nozzlesim: {exc}", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.workers > 1 and len(jobs) > 1:
+        import multiprocessing
+
+        pool = multiprocessing.Pool(min(args.workers, len(jobs)))
+        results = pool.imap(_runcase, jobs)
+    else:
+        pool = None
+        results = map(_runcase, jobs)
+
+    failed = 0
+    try:
+        with open(os.path.join(args.out, "results.jsonl"), "a") as f:
+            for result in results:
+                print(describe(result), flush=True)
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+                failed += result["error"] is not None
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return 1 if failed else 0
@@ -0,0 +1,209 @@
+"""Wall contours as sorted vertex arrays with vectorized evaluation.
+
+A :class:`Polyline` is a piecewise-linear wall: vertices sorted by ``x`` and
+the angle of the segment leaving each vertex.  An open polyline continues
+past its last vertex as a ray, like the last wall of :meth:`Wall.createarc
+<nozzlesim.wall.Wall.createarc>`.  Evaluating it at an array of ``x`` finds
+every segment with one :func:`numpy.searchsorted`.  A :class:`Contour` pairs
+the upper and lower walls of a nozzle::
+
+    contour = mesh.contour()
+    y = contour.upper(np.linspace(0, 10, 1000))
+    contour = Contour.load("contour.csv")
+    walls = contour.upper.towalls() + contour.lower.towalls()
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .point import Point
+from .wall import Wall
+
+
+class Polyline:
+    """A wall through the vertices ``(x[i], y[i])``.
+
+    ``angles[i]`` is the angle (degrees) of the segment leaving vertex ``i``.
+    With one angle per vertex the polyline is open and the last one is the
+    angle of the ray past the last vertex.  With one fewer it ends at the last
+    vertex.  Angles default to the directions between the vertices.
+    """
+
+    def __init__(
+        self,
+        x: Sequence[float],
+        y: Sequence[float],
+        angles: Optional[Sequence[float]] = None,
+    ) -> None:
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        if self.x.ndim != 1 or self.x.shape != self.y.shape or not len(self.x):
+            raise ValueError("x and y must be non-empty 1-d arrays of equal length")
+        if (np.diff(self.x) < 0).any():
+            raise ValueError("polyline vertices must be sorted by x")
+        if angles is None:
+            angles = np.degrees(np.arctan2(np.diff(self.y), np.diff(self.x)))
+        self.angles = np.asarray(angles, dtype=float)
+        if len(self.angles) not in (len(self.x) - 1, len(self.x)):
+            raise ValueError("need one angle per segment, plus one for an open end")
+        self.open = len(self.angles) == len(self.x)
+        slopes = np.tan(np.radians(self.angles))
+        # One slope per vertex; a closed end never uses the last one.
+        self.slopes = slopes if self.open else np.append(slopes, 0.0)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __call__(self, x, left: float = np.nan):
+        """Return the wall ``y`` at ``x`` (scalar or array).
+
+        ``left`` is returned before the first vertex and after the last one
+        of a closed polyline.  A point on a vertex is evaluated on the
+        segment leaving it.
+        """
+
+        x = np.asarray(x, dtype=float)
+        k = np.searchsorted(self.x, x, side="right") - 1
+        inside = k >= 0
+        if not self.open:
+            inside &= x <= self.x[-1]
+        k = np.maximum(k, 0)
+        y = (x - self.x[k]) * self.slopes[k] + self.y[k]
+        return np.where(inside, y, left)
+
+    @classmethod
+    def fromwalls(cls, walls: Sequence[Wall]) -> "Polyline":
+        """Return the polyline of consecutive ``walls``, each starting at the
+        end of the one before."""
+
+        x = [wall.start.x for wall in walls]
+        y = [wall.start.y for wall in walls]
+        end = walls[-1].end
+        if end is not None:
+            x.append(end.x)
+            y.append(end.y)
+        return cls(x, y, [wall.angle for wall in walls])
+
+    @classmethod
+    def arc(
+        cls, start: Point, deltax: float, totalangle: float, numsegments: int
+    ) -> "Polyline":
+        """Return the walls of :meth:`Wall.createarc` without its loop.
+
+        Vertex ``i`` lies on the line at 89.9 degrees through
+        ``start.x + deltax * i``, offset along it by ``u[i]``, and the segment
+        leaving it turns by ``deltaangle * i``.  Meeting the next line gives
+        ``u[i + 1] = u[i] + deltax * s[i] / (S - s[i])``, where ``s`` are the
+        segment slopes and ``S`` that of the line, so ``u`` is a cumulative
+        sum.
+        """
+
+        deltaangle = totalangle / numsegments
+        angles = deltaangle * np.arange(numsegments + 1)
+        slopes = np.tan(np.radians(angles[:-1]))
+        steep = math.tan(math.radians(89.9))
+        u = np.concatenate([[0.0], np.cumsum(deltax * slopes / (steep - slopes))])
+        x = start.x + deltax * np.arange(numsegments + 1) + u
+        y = start.y + steep * u
+        return cls(x, y, angles)
+
+    def towalls(self) -> list[Wall]:
+        """Return the polyline as linked :class:`Wall` segments."""
+
+        points = [Point(x, y) for x, y in zip(self.x.tolist(), self.y.tolist())]
+        walls = [
+            Wall(start, angle, end)
+            for start, end, angle in zip(points, points[1:], self.angles.tolist())
+        ]
+        if self.open:
+            walls.append(Wall(points[-1], float(self.angles[-1])))
+        return walls
+
+
+def wallchains(walls: Sequence[Wall], nextwalls: dict) -> list[list[Wall]]:
+    """Return ``walls`` as chains linked end to start through ``nextwalls``.
+
+    Unlike :func:`nozzlesim.adaptive.chains`, single walls are chains too.
+    """
+
+    successors = {id(wall) for wall in nextwalls.values()}
+    out = []
+    for wall in walls:
+        if id(wall) in successors:
+            continue
+        chain = [wall]
+        while id(chain[-1]) in nextwalls:
+            chain.append(nextwalls[id(chain[-1])])
+        out.append(chain)
+    return out
+
+
+class Contour:
+    """The ``upper`` and ``lower`` walls of a nozzle, as :class:`Polyline`."""
+
+    def __init__(self, upper: Polyline, lower: Polyline) -> None:
+        self.upper = upper
+        self.lower = lower
+
+    def height(self, x):
+        """Return the distance between the walls at ``x``."""
+
+        return self.upper(x) - self.lower(x)
+
+    def table(self, startx: float, numpoints: int, deltax: float) -> np.ndarray:
+        """Return ``numpoints`` rows of ``(x, upper y)`` from ``startx`` on.
+
+        ``y`` is ``-inf`` where the upper wall does not exist, as in
+        :meth:`Mesh.getxytable <nozzlesim.mesh.Mesh.getxytable>`.
+        """
+
+        x = startx + deltax * np.arange(numpoints)
+        return np.stack([x, self.upper(x, left=-np.inf)], axis=1)
+
+    @classmethod
+    def frommesh(cls, mesh) -> "Contour":
+        """Return the highest and lowest wall chains of ``mesh``.
+
+        After a simulation these include the walls added by wave
+        cancellation.
+        """
+
+        walls = [seg for seg in mesh.shocks if isinstance(seg, Wall)]
+        chains = wallchains(walls, mesh.nextwalls)
+        if not chains:
+            raise ValueError("mesh has no walls")
+        chains.sort(key=lambda chain: chain[0].start.y)
+        return cls(Polyline.fromwalls(chains[-1]), Polyline.fromwalls(chains[0]))
+
+    @classmethod
+    def fromtable(
+        cls, upper: np.ndarray, lower: Optional[np.ndarray] = None, axis: float = 0.0
+    ) -> "Contour":
+        """Return the contour through the ``(x, y)`` rows of ``upper`` and ``lower``.
+
+        Without ``lower`` the upper wall is mirrored about ``y = axis``.
+        """
+
+        upper = np.asarray(upper, dtype=float)
+        lower = upper * [1, -1] + [0, 2 * axis] if lower is None else lower
+        lower = np.asarray(lower, dtype=float)
+        return cls(Polyline(*upper.T), Polyline(*lower.T))
+
+    @classmethod
+    def load(cls, path: str, delimiter: Optional[str] = ",") -> "Contour":
+        """Read a contour from a text table such as the ``table.csv`` of ``main.py``.
+
+        Two columns are ``x`` and the upper ``y``, mirrored about ``y = 0``;
+        three are ``x``, upper ``y`` and lower ``y``.
+        """
+
+        data = np.loadtxt(path, delimiter=delimiter, ndmin=2)
+        if data.shape[1] == 2:
+            return cls.fromtable(data)
+        if data.shape[1] == 3:
+            return cls.fromtable(data[:, :2], data[:, [0, 2]])
+        raise ValueError(f"expected 2 or 3 columns in {path!r}, got {data.shape[1]}")
@@ -0,0 +1,265 @@
+"""Solve for the arc angle that gives a nozzle a target exit condition.
+
+:func:`design` finds the total turning angle ``theta`` of the symmetric arc
+walls built by :func:`nozzlesim.sweep.buildmesh` (the ``main.py`` geometry)
+for which the simulated nozzle reaches a target::
+
+    from nozzlesim import design
+
+    result = design.design("mach", 3.0, gamma=1.25, n=20)
+    print(result.theta, result.arearatio, result.simulations)
+
+Targets are the exit Mach number (``"mach"``), the area ratio
+(``"arearatio"``) or the nozzle length (``"length"``, the ``x`` of the last
+event).  Area ratios are ``A/A*`` of the exit: :meth:`Mesh.calcarearatio
+<nozzlesim.mesh.Mesh.calcarearatio>` over the squared throat ``height``,
+times the ``A/A*`` of the inflow when ``initialmach`` is not ``1``.  A Mach
+target is converted to an area ratio with
+:func:`~nozzlesim.helperfuncs.calcarearatio`.  The exit Mach of a result
+comes from :func:`~nozzlesim.kernels.calcmachfromarearatio` on the supersonic
+branch, and is ``nan`` when the area ratio has no such solution.
+
+Every quantity grows with ``theta``, so the search is a bracketed root find.
+It first runs Brent's method on a coarse mesh of ``coarsen`` wall segments,
+where each simulation is cheap.  The coarse root and slope then warm-start a
+secant search on the full mesh, which usually brackets the root within two
+or three simulations before Brent's method polishes it.  Simulations are
+remembered per ``(n, theta)``, and the memoized helpers keep their caches
+from one simulation to the next.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Callable, NamedTuple, Optional
+
+from . import helperfuncs as h
+from .kernels import calcmachfromarearatio
+from .mesh import Mesh
+from .sweep import DEFAULTS, buildmesh
+
+TARGETS = ("mach", "arearatio", "length")
+
+
+class Design(NamedTuple):
+    """A converged design and the simulated mesh that achieves it."""
+
+    theta: float
+    n: int
+    arearatio: float
+    exitmach: float
+    length: float
+    error: float
+    simulations: int
+    mesh: Mesh
+
+
+def brent(
+    f: Callable[[float], float],
+    a: float,
+    b: float,
+    fa: float,
+    fb: float,
+    xtol: float,
+    ftol: float,
+    maxiter: int = 50,
+) -> float:
+    """Return a root of ``f`` in ``[a, b]``, where ``fa`` and ``fb`` differ in sign.
+
+    Brent's method: inverse quadratic interpolation or secant steps, falling
+    back to bisection whenever they do not shrink the bracket fast enough.
+    Stops once ``|f| <= ftol`` or the bracket is narrower than ``xtol``.
+    """
+
+    if fa * fb > 0:
+        raise ValueError("root is not bracketed")
+    if abs(fa) < abs(fb):
+        a, b, fa, fb = b, a, fb, fa
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(maxiter):
+        if abs(fb) <= ftol:
+            return b
+        if fa * fb > 0:
+            a, fa = c, fc
+            d = e = b - a
+        if abs(fa) < abs(fb):
+            c, fc = b, fb
+            b, fb = a, fa
+            a, fa = c, fc
+        tol = 2 * 2.2e-16 * abs(b) + xtol / 2
+        m = (a - b) / 2
+        if abs(m) <= tol:
+            return b
+        if abs(e) >= tol and abs(fc) > abs(fb):
+            s = fb / fc
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fc / fa, fb / fa
+                p = s * (2 * m * q * (q - r) - (b - c) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        c, fc = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = f(b)
+    return b
+
+
+class Solver:
+    """Evaluate and remember simulations of one design problem.
+
+    Measured values are kept for every ``(n, theta)`` simulated; only the
+    mesh closest to the goal on the full ``n`` is kept, as :attr:`best`.
+    """
+
+    def __init__(self, target: str, value: float, params: dict) -> None:
+        if target not in TARGETS:
+            raise ValueError(f"unknown target {target!r}, expected one of {TARGETS}")
+        self.target = target
+        self.params = {**DEFAULTS, **params}
+        if target == "mach":
+            self.goal = h.calcarearatio(self.params["gamma"], value)
+        else:
+            self.goal = value
+        self.scale = 1 / self.params["height"] ** 2
+        if self.params["initialmach"] != 1:
+            self.scale *= h.calcarearatio(
+                self.params["gamma"], self.params["initialmach"]
+            )
+        self.results: dict[tuple[int, float], float] = {}
+        self.best: Optional[tuple[float, float, Mesh]] = None
+
+    @property
+    def simulations(self) -> int:
+        return len(self.results)
+
+    def arearatio(self, mesh: Mesh) -> float:
+        """Return the exit ``A/A*`` of a simulated ``mesh``."""
+
+        return mesh.calcarearatio() * self.scale
+
+    def residual(self, theta: float, n: int) -> float:
+        """Return the measured quantity minus the goal for ``theta`` and ``n``."""
+
+        key = (n, theta)
+        if key not in self.results:
+            mesh = buildmesh({**self.params, "theta": theta, "n": n})
+            mesh.simulate(engine=self.params["engine"])
+            if self.target == "length":
+                measured = mesh.x
+            else:
+                measured = self.arearatio(mesh)
+            self.results[key] = measured - self.goal
+            error = abs(self.results[key])
+            if n == self.params["n"] and (self.best is None or error < self.best[0]):
+                self.best = error, theta, mesh
+        return self.results[key]
+
+    def slope(self, n: int, theta: float) -> float:
+        """Return the secant slope between the two simulations nearest ``theta``."""
+
+        near = sorted((abs(t - theta), t) for m, t in self.results if m == n)[:2]
+        (_, t0), (_, t1) = near
+        return (self.results[n, t1] - self.results[n, t0]) / (t1 - t0)
+
+    def secant(
+        self, n: int, x0: float, slope: float, bounds: tuple, ftol: float
+    ) -> tuple[float, float, float, float]:
+        """Take secant steps from ``x0`` until the residual changes sign.
+
+        ``slope`` is the first step's estimate of the derivative, e.g. from a
+        coarser mesh.  Steps overshoot slightly so that, once close, the next
+        one crosses the root and leaves a narrow bracket.  Returns
+        ``(a, b, f(a), f(b))`` bracketing the root, or ``(x, x, f, f)`` when
+        ``|f(x)| <= ftol``.
+        """
+
+        lo, hi = bounds
+        f0 = self.residual(x0, n)
+        for _ in range(30):
+            if abs(f0) <= ftol:
+                return x0, x0, f0, f0
+            # Every target grows with ``theta``; a slope that says otherwise
+            # comes from noise, so fall back to a fixed step.
+            step = -1.05 * f0 / slope if slope > 0 else -math.copysign(0.01 * x0, f0)
+            x1 = min(max(x0 + step, lo), hi)
+            if x1 == x0:
+                break
+            f1 = self.residual(x1, n)
+            if f0 * f1 <= 0:
+                return x0, x1, f0, f1
+            slope = (f1 - f0) / (x1 - x0)
+            x0, f0 = x1, f1
+        raise ValueError(f"no theta in {bounds} reaches the {self.target} target")
+
+
+def design(
+    target: str,
+    value: float,
+    bracket: tuple[float, float] = (1.0, 40.0),
+    coarsen: Optional[int] = 5,
+    rtol: float = 1e-6,
+    xtol: float = 1e-9,
+    maxiter: int = 50,
+    **params,
+) -> Design:
+    """Return the arc design whose simulated nozzle reaches ``value`` of ``target``.
+
+    ``params`` are the case parameters of :mod:`nozzlesim.sweep` (``gamma``,
+    ``n``, ``deltax``, ``height``, ``engine``, ...); ``theta`` is solved for
+    within ``bracket``.  The solve stops once the measured quantity is within
+    ``rtol`` of the target or ``theta`` is known to ``xtol`` degrees.  With
+    ``coarsen`` set to fewer walls than ``n``, a coarse mesh is solved first
+    to warm-start the full one.  Raises ``ValueError`` if the target cannot
+    be reached inside ``bracket``.
+    """
+
+    solver = Solver(target, value, params)
+    n = solver.params["n"]
+    ftol = rtol * abs(solver.goal)
+    lo, hi = bracket
+    coarse = coarsen if coarsen is not None and coarsen < n else n
+
+    def f(theta):
+        return solver.residual(theta, coarse)
+
+    flo, fhi = f(lo), f(hi)
+    if flo * fhi > 0:
+        raise ValueError(f"no theta in {bracket} reaches the {target} target")
+    if coarse == n:
+        theta = brent(f, lo, hi, flo, fhi, xtol, ftol, maxiter)
+    else:
+        # The full mesh only needs a starting point near the coarse root.
+        guess = brent(f, lo, hi, flo, fhi, 1e-3, 1e-3 * abs(solver.goal), maxiter)
+        slope = solver.slope(coarse, guess)
+        a, b, fa, fb = solver.secant(n, guess, slope, bracket, ftol)
+        theta = (
+            a
+            if a == b
+            else brent(
+                lambda t: solver.residual(t, n), a, b, fa, fb, xtol, ftol, maxiter
+            )
+        )
+
+    solver.residual(theta, n)
+    error, theta, mesh = solver.best
+    arearatio = solver.arearatio(mesh)
+    return Design(
+        theta=theta,
+        n=n,
+        arearatio=arearatio,
+        exitmach=float(calcmachfromarearatio(solver.params["gamma"], arearatio)),
+        length=mesh.x,
+        error=solver.results[n, theta],
+        simulations=solver.simulations,
+        mesh=mesh,
+    )
@@ -0,0 +1,395 @@
+"""Event-driven sweep engine used by :meth:`nozzlesim.mesh.Mesh.simulate`.
+
+The original event loop rebuilds the whole picture at every step: it drops
+ended segments, re-sorts the active front by projected ``y``, intersects every
+neighbouring pair and then picks the smallest ``x``.  :class:`SweepEngine`
+keeps that front sorted between events instead and only looks at the
+neighbours of segments that were created, ended or reordered.  Pending work is
+held in four heaps:
+
+``events``
+    crossings of neighbouring segments that the mesh would handle
+    (see :meth:`Mesh.checkpair`),
+``crossings``
+    every crossing of neighbouring segments, used to swap them in the front
+    once the sweep has passed the crossing,
+``wallends``
+    predefined wall corners waiting for their expansion wave,
+``expiries``
+    segments with a known end, removed once the sweep is past it.
+
+Heap entries are never updated in place; they are checked against the current
+front when they reach the top of the heap and discarded if stale.  The front
+itself is a :class:`Front`, which finds a segment's neighbours without scanning
+the whole front.
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_right
+from itertools import count
+from typing import TYPE_CHECKING, Callable, Iterator, NamedTuple, Optional, Union
+
+from .shock import Shock
+from .wall import Wall
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle only needed for typing
+    from .mesh import Mesh
+
+Segment = Union[Shock, Wall]
+
+
+class Event(NamedTuple):
+    """A handled event, as yielded by :meth:`Mesh.iterevents`.
+
+    ``kind`` is ``"wall"`` for an expansion wave leaving a wall corner and
+    ``"intersection"`` otherwise.  ``objects`` are the two segments involved,
+    ``created`` the segments the event added and ``ended`` those of
+    ``objects`` that it terminated.
+    """
+
+    kind: str
+    x: float
+    y: float
+    objects: tuple
+    created: tuple
+    ended: tuple
+
+
+class Front:
+    """The active segments of a sweep, ordered from top to bottom.
+
+    Segments are held in blocks of at most ``2 * load`` entries, together with
+    a map from each segment to its block and the index each block starts at.
+    Locating, inserting and removing a segment therefore costs
+    ``O(load + len / load)`` rather than a scan of the whole front.
+    """
+
+    load = 32
+
+    def __init__(self, segments=()) -> None:
+        segments = list(segments)
+        self.blocks = [
+            segments[i : i + self.load] for i in range(0, len(segments), self.load)
+        ] or [[]]
+        self.where: dict[int, list] = {}
+        for block in self.blocks:
+            for seg in block:
+                self.where[id(seg)] = block
+        self.size = len(segments)
+        self.renumber()
+
+    def renumber(self) -> None:
+        """Recompute block numbers and start indices after blocks changed."""
+
+        self.number = {}
+        self.starts = []
+        start = 0
+        for b, block in enumerate(self.blocks):
+            self.number[id(block)] = b
+            self.starts.append(start)
+            start += len(block)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, seg) -> bool:
+        return id(seg) in self.where
+
+    def __iter__(self) -> Iterator[Segment]:
+        for block in self.blocks:
+            yield from block
+
+    def __getitem__(self, i: int) -> Segment:
+        b = bisect_right(self.starts, i) - 1
+        return self.blocks[b][i - self.starts[b]]
+
+    def index(self, seg: Segment) -> int:
+        """Return the position of ``seg`` in the front."""
+
+        block = self.where[id(seg)]
+        return self.starts[self.number[id(block)]] + block.index(seg)
+
+    def after(self, seg: Segment) -> Optional[Segment]:
+        """Return the segment directly below ``seg``, or ``None``."""
+
+        block = self.where[id(seg)]
+        i = block.index(seg) + 1
+        if i < len(block):
+            return block[i]
+        b = self.number[id(block)] + 1
+        return self.blocks[b][0] if b < len(self.blocks) else None
+
+    def insert(self, i: int, seg: Segment) -> None:
+        """Insert ``seg`` so that it ends up at position ``i``."""
+
+        b = bisect_right(self.starts, i) - 1
+        block = self.blocks[b]
+        block.insert(i - self.starts[b], seg)
+        self.where[id(seg)] = block
+        self.size += 1
+        starts = self.starts
+        for c in range(b + 1, len(starts)):
+            starts[c] += 1
+        if len(block) > 2 * self.load:
+            half = block[self.load :]
+            del block[self.load :]
+            self.blocks.insert(b + 1, half)
+            for moved in half:
+                self.where[id(moved)] = half
+            self.renumber()
+
+    def remove(self, seg: Segment) -> int:
+        """Remove ``seg`` and return the position it had."""
+
+        block = self.where.pop(id(seg))
+        b = self.number[id(block)]
+        j = block.index(seg)
+        i = self.starts[b] + j
+        del block[j]
+        self.size -= 1
+        starts = self.starts
+        for c in range(b + 1, len(starts)):
+            starts[c] -= 1
+        if not block and len(self.blocks) > 1:
+            del self.blocks[b]
+            self.renumber()
+        return i
+
+    def swap(self, top: Segment, bottom: Segment) -> None:
+        """Exchange the positions of ``top`` and ``bottom``."""
+
+        where = self.where
+        topblock, bottomblock = where[id(top)], where[id(bottom)]
+        i, j = topblock.index(top), bottomblock.index(bottom)
+        topblock[i], bottomblock[j] = bottom, top
+        where[id(top)], where[id(bottom)] = bottomblock, topblock
+
+
+class SweepEngine:
+    """Incremental replacement for the ``firstevent``/``handleevent`` loop."""
+
+    def __init__(self, mesh: "Mesh") -> None:
+        from .mesh import epsilon
+
+        self.mesh = mesh
+        self.epsilon = epsilon
+        self.counter = count()
+        # Position of each segment in ``mesh.activeshocks``; ties between wall
+        # corners at the same ``x`` are resolved in that order.
+        self.rank: dict[int, int] = {}
+        self.events: list = []
+        self.crossings: list = []
+        self.wallends: list = []
+        self.expiries: list = []
+
+        for seg in mesh.activeshocks:
+            self.rank[id(seg)] = next(self.counter)
+        active = mesh.removeended(mesh.activeshocks, mesh.x)
+        ordered = mesh.sortshocks(active, mesh.x)
+        self.front = Front(ordered)
+        for seg in ordered:
+            self.track(seg)
+        for top, bottom in zip(ordered, ordered[1:]):
+            self.pushpair(top, bottom)
+
+    def run(self, stop: float = float("inf")) -> None:
+        """Propagate the mesh until no more events occur or ``stop`` is reached."""
+
+        for _ in self.iterevents(stop):
+            pass
+
+    def iterevents(
+        self,
+        stop: float = float("inf"),
+        proceed: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Event]:
+        """Handle events one at a time, yielding an :class:`Event` for each.
+
+        ``proceed`` is called before every event; returning ``False`` stops
+        the iteration with the mesh in a consistent state.
+        """
+
+        mesh = self.mesh
+        event = self.firstevent()
+        lastcheck = mesh.remainingangle <= 0
+
+        while event is not None and mesh.x < stop:
+            if proceed is not None and not proceed():
+                return
+            yield self.handleevent(event)
+            event = self.firstevent()
+            if lastcheck:
+                return
+
+    def firstevent(self) -> Optional[list]:
+        """Return the next event in the format used by :meth:`Mesh.firstevent`."""
+
+        intersection = self.firstintersection()
+        intersectionx = float("inf")
+        if intersection and not (
+            isinstance(intersection[0], Wall) and isinstance(intersection[1], Wall)
+        ):
+            intersectionx = intersection[2].x
+
+        wall, nextwall = self.firstwallend()
+        firstwallend = float("inf") if wall is None else wall.end.x
+
+        if firstwallend <= intersectionx and nextwall is not None:
+            return ["wall", [wall, nextwall, wall.end]]
+        if intersection and intersectionx != float("inf"):
+            return ["intersection", intersection]
+        return None
+
+    def handleevent(self, event: list) -> Event:
+        """Apply ``event`` to the mesh and update the front around it."""
+
+        mesh = self.mesh
+        before = len(mesh.shocks)
+        record = mesh.processevent(event)
+
+        for seg in record.ended:
+            self.remove(seg)
+        self.expire()
+        self.reorder()
+        for seg in mesh.shocks[before:]:
+            self.rank[id(seg)] = next(self.counter)
+            self.insert(seg)
+        return record
+
+    def track(self, seg: Segment) -> None:
+        """Queue the end events of ``seg``, which has just joined the front."""
+
+        if seg.end is not None:
+            key = (seg.end.x, self.rank[id(seg)], seg)
+            heapq.heappush(self.expiries, key)
+            if isinstance(seg, Wall):
+                heapq.heappush(self.wallends, key)
+
+    def pushpair(self, top: Segment, bottom: Segment) -> None:
+        """Queue the crossing of neighbours ``top`` and ``bottom``, if any."""
+
+        point = Shock.intersect(top, bottom)
+        if point is None:
+            return
+        k = next(self.counter)
+        heapq.heappush(self.crossings, (point.x, k, top, bottom))
+        if point.x >= self.mesh.x:
+            heapq.heappush(self.events, (point.x, k, top, bottom, point))
+
+    def adjacent(self, top: Segment, bottom: Segment) -> bool:
+        """Return ``True`` if ``bottom`` directly follows ``top`` in the front."""
+
+        return top in self.front and self.front.after(top) is bottom
+
+    def validevent(self, entry: tuple) -> bool:
+        """Return ``True`` if the queued crossing ``entry`` is still an event."""
+
+        _, _, top, bottom, point = entry
+        return self.adjacent(top, bottom) and self.mesh.checkpair(
+            self.mesh.activeshocks, top, bottom, point, self.mesh.x
+        )
+
+    def firstintersection(self) -> Optional[tuple]:
+        """Return ``(top, bottom, point)`` for the earliest pending crossing."""
+
+        events = self.events
+        while events and not self.validevent(events[0]):
+            heapq.heappop(events)
+        if not events:
+            return None
+
+        # Several crossings can share an ``x``; the scan engine takes the
+        # topmost one, so do the same here.
+        tied = [heapq.heappop(events)]
+        while events and events[0][0] == tied[0][0]:
+            entry = heapq.heappop(events)
+            if self.validevent(entry):
+                tied.append(entry)
+        best = min(tied, key=lambda entry: self.front.index(entry[2]))
+        for entry in tied:
+            heapq.heappush(events, entry)
+        return best[2], best[3], best[4]
+
+    def firstwallend(self) -> tuple[Optional[Wall], Optional[Wall]]:
+        """Return the next wall corner without a wave and the wall after it."""
+
+        wallends = self.wallends
+        while wallends:
+            wall = wallends[0][2]
+            if wall in self.front and wall.end.x >= self.mesh.x:
+                shock, nextwall = self.mesh.wallendlinks(wall)
+                if shock is None and not self.mesh.quietcorner(nextwall):
+                    return wall, nextwall
+            heapq.heappop(wallends)
+        return None, None
+
+    def insert(self, seg: Segment) -> None:
+        """Insert ``seg`` into the front at its projected ``y`` position."""
+
+        x = self.mesh.x
+        key = self.mesh.projecty(seg, x)
+        front = self.front
+        lo, hi = 0, len(front)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.mesh.projecty(front[mid], x) < key:
+                hi = mid
+            else:
+                lo = mid + 1
+        front.insert(lo, seg)
+        self.track(seg)
+        if lo > 0:
+            self.pushpair(front[lo - 1], seg)
+        if lo + 1 < len(front):
+            self.pushpair(seg, front[lo + 1])
+
+    def remove(self, seg: Segment) -> None:
+        """Remove ``seg`` from the front and pair up its former neighbours."""
+
+        front = self.front
+        if seg not in front:
+            return
+        i = front.remove(seg)
+        self.rank.pop(id(seg), None)
+        if 0 < i < len(front):
+            self.pushpair(front[i - 1], front[i])
+
+    def expire(self) -> None:
+        """Drop segments that ended before the current ``x``."""
+
+        expiries = self.expiries
+        while expiries and expiries[0][0] < self.mesh.x:
+            self.remove(heapq.heappop(expiries)[2])
+
+    def reorder(self) -> None:
+        """Swap neighbours whose crossing the sweep has already passed."""
+
+        mesh = self.mesh
+        x = mesh.x
+        # The front is ordered just after ``x``; see :meth:`Mesh.projecty`.
+        limit = x + 2 * self.epsilon
+        front = self.front
+        crossings = self.crossings
+        deferred = []
+        while crossings and crossings[0][0] <= limit:
+            entry = heapq.heappop(crossings)
+            top, bottom = entry[2], entry[3]
+            if not self.adjacent(top, bottom):
+                continue
+            if mesh.projecty(top, x) >= mesh.projecty(bottom, x):
+                if entry[0] >= x:
+                    deferred.append(entry)
+                continue
+            i = front.index(top)
+            front.swap(top, bottom)
+            # A crossing between ``x`` and the projection point is still an
+            # event for the scan engine, whichever order the pair is in.
+            self.pushpair(bottom, top)
+            if i > 0:
+                self.pushpair(front[i - 1], bottom)
+            if i + 2 < len(front):
+                self.pushpair(top, front[i + 2])
+        for entry in deferred:
+            heapq.heappush(crossings, entry)
@@ -0,0 +1,251 @@
+"""Chunked export of wall contours, segments and node states.
+
+Each exporter returns a :class:`Dataset`: a record dtype, the number of rows
+and an iterator over chunks of at most ``chunksize`` rows.  :func:`write`
+streams a dataset to a file one chunk at a time, so the full table never
+exists in memory::
+
+    from nozzlesim import export
+
+    export.write(export.contour(mesh.contour(), 0, 10**7, 1e-6), "contour.bin")
+    export.write(export.segments(mesh), "segments.npz")
+    header, records = export.readbinary("contour.bin")
+
+The format follows the file extension unless given:
+
+``"csv"``
+    a ``#``-commented header line with the column names, then one line per
+    row; floats are written with 17 significant digits so they read back
+    exactly,
+``"npz"``
+    a compressed NumPy archive holding the records as one ``.npy`` entry named
+    after the dataset, readable with :func:`numpy.load`,
+``"bin"``
+    the 8 byte magic ``b"NZEXPORT"``, a little-endian ``uint32`` header
+    length and a JSON header (``dataset``, ``count`` and the record
+    ``descr``), padded so the little-endian records start on a 64 byte
+    boundary.  :func:`readbinary` memory-maps them without parsing.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zipfile
+from typing import Iterator, NamedTuple, Optional, Union
+
+import numpy as np
+
+from . import kernels
+from .checkpoint import ALIGNMENT
+from .contour import Contour
+from .store import FIELDS, SHOCK
+
+MAGIC = b"NZEXPORT"
+FORMATS = ("csv", "npz", "bin")
+CHUNKSIZE = 65536
+
+CONTOUR = np.dtype([("x", "<f8"), ("upper", "<f8"), ("lower", "<f8")])
+SEGMENT = np.dtype(
+    [(name, np.dtype(dtype).newbyteorder("<")) for name, dtype in FIELDS]
+)
+NODE = np.dtype(
+    [
+        ("x", "<f8"),
+        ("y", "<f8"),
+        ("v", "<f8"),
+        ("theta", "<f8"),
+        ("gamma", "<f8"),
+        ("mach", "<f8"),
+    ]
+)
+
+
+class Dataset(NamedTuple):
+    """Rows to export, produced lazily in chunks."""
+
+    name: str
+    dtype: np.dtype
+    count: int
+    chunks: Iterator[np.ndarray]
+
+
+def contour(
+    source: Contour,
+    startx: float,
+    numpoints: int,
+    deltax: float,
+    chunksize: int = CHUNKSIZE,
+) -> Dataset:
+    """Return both walls of ``source`` sampled at ``startx + deltax * i``.
+
+    Walls are ``nan`` where they do not exist.
+    """
+
+    def chunks():
+        for start in range(0, numpoints, chunksize):
+            x = startx + deltax * np.arange(start, min(start + chunksize, numpoints))
+            chunk = np.empty(len(x), CONTOUR)
+            chunk["x"] = x
+            chunk["upper"] = source.upper(x)
+            chunk["lower"] = source.lower(x)
+            yield chunk
+
+    return Dataset("contour", CONTOUR, numpoints, chunks())
+
+
+def segments(mesh, chunksize: int = CHUNKSIZE) -> Dataset:
+    """Return the :meth:`Mesh.as_arrays` columns of every segment of ``mesh``.
+
+    With a bounded ``retain`` mode these are the retained segments only.  Do
+    not simulate further while the chunks are being written.
+    """
+
+    arrays = mesh.as_arrays()
+    count = len(arrays["kind"])
+
+    def chunks():
+        for start in range(0, count, chunksize):
+            stop = min(start + chunksize, count)
+            chunk = np.empty(stop - start, SEGMENT)
+            for name, column in arrays.items():
+                chunk[name] = column[start:stop]
+            yield chunk
+
+    return Dataset("segments", SEGMENT, count, chunks())
+
+
+def nodes(mesh, chunksize: int = CHUNKSIZE) -> Dataset:
+    """Return one row per shock: the node it starts at and the flow upstream.
+
+    ``mach`` comes from :func:`nozzlesim.kernels.calcmach`, one chunk at a
+    time.  Do not simulate further while the chunks are being written.
+    """
+
+    arrays = mesh.as_arrays()
+    rows = np.flatnonzero(arrays["kind"] == SHOCK)
+    names = {"x": "startx", "y": "starty", "v": "v", "theta": "theta", "gamma": "gamma"}
+
+    def chunks():
+        for start in range(0, len(rows), chunksize):
+            chunkrows = rows[start : start + chunksize]
+            chunk = np.empty(len(chunkrows), NODE)
+            for name, column in names.items():
+                chunk[name] = arrays[column][chunkrows]
+            chunk["mach"] = kernels.calcmach(chunk["gamma"], chunk["v"])
+            yield chunk
+
+    return Dataset("nodes", NODE, len(rows), chunks())
+
+
+def formatof(path: str, format: Optional[str] = None) -> str:
+    """Return ``format``, or the one named by the extension of ``path``."""
+
+    format = format or os.path.splitext(path)[1].lstrip(".").lower()
+    if format not in FORMATS:
+        raise ValueError(f"unknown export format {format!r}, expected one of {FORMATS}")
+    return format
+
+
+def write(dataset: Dataset, path: str, format: Optional[str] = None) -> int:
+    """Stream ``dataset`` to ``path`` and return the number of rows written."""
+
+    writer = {"csv": writecsv, "npz": writenpz, "bin": writebinary}
+    written = writer[formatof(path, format)](dataset, path)
+    if written != dataset.count:
+        raise ValueError(
+            f"{dataset.name} produced {written} rows, expected {dataset.count}"
+        )
+    return written
+
+
+def writecsv(dataset: Dataset, path: str) -> int:
+    fmt = [
+        "%d" if dataset.dtype[name].kind in "iu" else "%.17g"
+        for name in dataset.dtype.names
+    ]
+    written = 0
+    with open(path, "w") as f:
+        f.write("# " + ",".join(dataset.dtype.names) + "\n")
+        for chunk in dataset.chunks:
+            np.savetxt(f, chunk, fmt=fmt, delimiter=",")
+            written += len(chunk)
+    return written
+
+
+def writenpz(dataset: Dataset, path: str) -> int:
+    header = {
+        "descr": np.lib.format.dtype_to_descr(dataset.dtype),
+        "fortran_order": False,
+        "shape": (dataset.count,),
+    }
+    written = 0
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        with archive.open(dataset.name + ".npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array_header_1_0(f, header)
+            for chunk in dataset.chunks:
+                f.write(np.ascontiguousarray(chunk, dataset.dtype).tobytes())
+                written += len(chunk)
+    return written
+
+
+def writebinary(dataset: Dataset, path: str) -> int:
+    header = {
+        "version": 1,
+        "dataset": dataset.name,
+        "count": dataset.count,
+        "descr": dataset.dtype.descr,
+    }
+    text = json.dumps(header).encode()
+    used = len(MAGIC) + 4 + len(text)
+    text += b" " * (-used % ALIGNMENT)
+    written = 0
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(text)))
+        f.write(text)
+        for chunk in dataset.chunks:
+            f.write(np.ascontiguousarray(chunk, dataset.dtype).tobytes())
+            written += len(chunk)
+    return written
+
+
+def readbinary(path: str) -> tuple[dict, Union[np.ndarray, np.memmap]]:
+    """Return the header and a read-only memory map of the records at ``path``."""
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path!r} is not a nozzlesim export")
+        (size,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(size))
+        offset = f.tell()
+        f.seek(0, 2)
+        available = f.tell() - offset
+    dtype = np.dtype([tuple(field) for field in header["descr"]])
+    if available < header["count"] * dtype.itemsize:
+        raise ValueError(f"export {path!r} is truncated")
+    if header["count"] == 0:
+        return header, np.zeros(0, dtype)
+    records = np.memmap(path, dtype, mode="r", offset=offset, shape=(header["count"],))
+    return header, records
+
+
+def read(path: str, format: Optional[str] = None) -> np.ndarray:
+    """Return the records of an export in any format.
+
+    Binary exports are memory-mapped; the others are read into memory.
+    """
+
+    format = formatof(path, format)
+    if format == "bin":
+        return readbinary(path)[1]
+    if format == "npz":
+        with np.load(path) as archive:
+            return archive[archive.files[0]]
+    with open(path) as f:
+        names = f.readline().lstrip("#").strip().split(",")
+    dtypes = {dtype.names: dtype for dtype in (CONTOUR, SEGMENT, NODE)}
+    if tuple(names) not in dtypes:
+        raise ValueError(f"{path!r} has unknown columns {names}")
+    return np.loadtxt(path, dtype=dtypes[tuple(names)], delimiter=",", ndmin=1)
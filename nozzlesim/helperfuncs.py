@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import math
-from functools import lru_cache
-from typing import Callable
+from typing import Callable, Optional
+
+from . import pmtable
+from .cache import memoize
 
 
 def sign(x: float) -> float:
@@ -19,16 +21,20 @@ def machangle(mach: float) -> float:
     return math.asin(1 / mach)
 
 
-@lru_cache(maxsize=None)
+def _prandtlmeyer(k: float, mach: float) -> float:
+    """Return the Prandtl-Meyer angle of ``mach`` in radians."""
+
+    alpha = machangle(mach)
+    return k * math.atan(1 / (math.tan(alpha) * k)) - (math.pi / 2 - alpha)
+
+
+@memoize
 def calcv(gamma: float, mach1: float, mach2: float) -> float:
     """Return the Prandtl-Meyer angle change from ``mach1`` to ``mach2``."""
 
     k = math.sqrt((gamma + 1) / (gamma - 1))
-    alpha1 = machangle(mach1)
-    alpha2 = machangle(mach2)
-    v1 = k * math.atan(1 / (math.tan(alpha1) * k)) - (math.pi / 2 - alpha1)
-    v2 = k * math.atan(1 / (math.tan(alpha2) * k)) - (math.pi / 2 - alpha2)
-    return math.degrees(v2 - v1)
+    v1 = 0.0 if mach1 == 1 else _prandtlmeyer(k, mach1)
+    return math.degrees(_prandtlmeyer(k, mach2) - v1)
 
 
 def binarysearch(
@@ -54,20 +60,57 @@ def binarysearch(
     return val
 
 
-@lru_cache(maxsize=None)
-def calcmach(gamma: float, mach1: float, angle: float, steps: int = 30) -> float:
-    """Return Mach number corresponding to ``angle`` increase from ``mach1``."""
+@memoize
+def calcmach(
+    gamma: float, mach1: float, angle: float, steps: Optional[int] = None
+) -> float:
+    """Return Mach number corresponding to ``angle`` increase from ``mach1``.
+
+    The result comes from the inverse Prandtl-Meyer table of
+    :mod:`nozzlesim.pmtable`.  Passing ``steps`` uses the original bisection
+    with that many steps instead, as do turns that end outside
+    ``[0, calcvmax(gamma))``.
+    """
 
     if angle == 0:
         return 1.0
 
+    if steps is None:
+        v = angle if mach1 == 1 else angle + calcv(gamma, 1.0, mach1)
+        table = pmtable.gettable(gamma)
+        if 0 <= v < table.vmax:
+            return table.mach(v)
+        steps = 30
+
     def f(mach2: float) -> float:
         return calcv(gamma, mach1, mach2)
 
     return binarysearch(1.0, 100.0, angle, steps, f)
 
 
-@lru_cache(maxsize=None)
+def configurepm(
+    tolerance: Optional[float] = None, polish: Optional[bool] = None
+) -> None:
+    """Set the accuracy of the inverse Prandtl-Meyer tables used by :func:`calcmach`.
+
+    ``tolerance`` is the relative Mach number error the tables are built for
+    and ``polish`` adds a Newton step to every lookup.  Memoized results that
+    depend on :func:`calcmach` are cleared.
+    """
+
+    pmtable.configure(tolerance, polish)
+    for func in (
+        calcmach,
+        calcshockemitangle,
+        calcshockpropangle,
+        alphadiff,
+        shockangle,
+        shockprop,
+    ):
+        func.cache_clear()
+
+
+@memoize
 def calcshockemitangle(
     gamma: float, angle: float, mach1: float = -1.0, v1: float = -1.0
 ) -> float:
@@ -82,7 +125,7 @@ def calcshockemitangle(
     return abar + 0.5 * abs(angle)
 
 
-@lru_cache(maxsize=None)
+@memoize
 def calcvmax(gamma: float) -> float:
     """Return the maximum Prandtl-Meyer angle for ``gamma``."""
 
@@ -90,7 +133,7 @@ def calcvmax(gamma: float) -> float:
     return math.degrees(math.pi / 2 * (k - 1))
 
 
-@lru_cache(maxsize=None)
+@memoize
 def calcshockpropangle(
     gamma: float, v1: float, theta: float, turningangle: float
 ) -> float:
@@ -104,7 +147,7 @@ def calcshockpropangle(
     return abar + theta - turningangle / 2
 
 
-@lru_cache(maxsize=None)
+@memoize
 def alphadiff(gamma: float, v1: float, v2: float) -> float:
     """Return difference in Mach angles corresponding to ``v1`` and ``v2``."""
 
@@ -115,7 +158,7 @@ def alphadiff(gamma: float, v1: float, v2: float) -> float:
     return alpha1 - alpha2
 
 
-@lru_cache(maxsize=None)
+@memoize
 def calcarearatio(gamma: float, mach: float) -> float:
     """Return area ratio ``A/A*`` for a given ``mach`` and ``gamma``."""
 
@@ -127,7 +170,7 @@ def calcarearatio(gamma: float, mach: float) -> float:
     )
 
 
-@lru_cache(maxsize=None)
+@memoize
 def calcmachfromarearatio(gamma: float, ratio: float, steps: int = 20) -> float:
     """Inverse of :func:`calcarearatio` using a binary search."""
 
@@ -137,7 +180,7 @@ def calcmachfromarearatio(gamma: float, ratio: float, steps: int = 20) -> float:
     return binarysearch(1.1, 1000.0, ratio, steps, f)
 
 
-@lru_cache(maxsize=None)
+@memoize
 def shockangle(gamma: float, v: float, theta: float, turningangle: float) -> float:
     """Return angle of the upstream characteristic at a wall turn."""
 
@@ -146,7 +189,7 @@ def shockangle(gamma: float, v: float, theta: float, turningangle: float) -> flo
     return -sign(turningangle) * alpha1 + theta
 
 
-@lru_cache(maxsize=None)
+@memoize
 def shockprop(gamma: float, v: float, theta: float, turningangle: float) -> float:
     """Return propagation angle of a characteristic through a wall turn."""
 
@@ -155,3 +198,24 @@ def shockprop(gamma: float, v: float, theta: float, turningangle: float) -> floa
         gamma, v + abs(turningangle), theta + turningangle, turningangle
     )
     return (angle1 + angle2) / 2
+
+
+def machstate(gamma: float, v: float) -> tuple[float, float]:
+    """Return the Mach number and Mach angle (degrees) at Prandtl-Meyer angle ``v``.
+
+    This is the one inverse Prandtl-Meyer evaluation a flow region needs.
+    """
+
+    mach = calcmach(gamma, 1.0, v)
+    return mach, math.degrees(machangle(mach))
+
+
+def propangle(theta: float, turningangle: float, mu1: float, mu2: float) -> float:
+    """Return :func:`shockprop` from the Mach angles on both sides of the turn.
+
+    ``mu1`` and ``mu2`` are the Mach angles (degrees) upstream and downstream.
+    """
+
+    angle1 = -sign(turningangle) * mu1 + theta
+    angle2 = -sign(turningangle) * mu2 + (theta + turningangle)
+    return (angle1 + angle2) / 2
@@ -0,0 +1,71 @@
+"""Hash index of segment start points used by :class:`~nozzlesim.mesh.Mesh`."""
+
+from __future__ import annotations
+
+import math
+from itertools import count
+from typing import Iterable, Optional
+
+
+class StartIndex:
+    """Map quantized start coordinates to the segments beginning there.
+
+    With ``tolerance == 0`` points are matched exactly.  Otherwise coordinates
+    are bucketed onto a grid of cell size ``tolerance`` and a lookup checks the
+    neighbouring cells too, so two points match when both coordinates differ
+    by at most ``tolerance``.
+    """
+
+    def __init__(self, tolerance: float = 0.0, segments: Iterable = ()) -> None:
+        if tolerance < 0:
+            raise ValueError("tolerance must be non-negative")
+        self.tolerance = tolerance
+        self.cells: dict[tuple, list] = {}
+        self.counter = count()
+        for seg in segments:
+            self.add(seg)
+
+    def key(self, x: float, y: float) -> tuple:
+        """Return the cell holding ``(x, y)``."""
+
+        if self.tolerance == 0:
+            return (x, y)
+        return (math.floor(x / self.tolerance), math.floor(y / self.tolerance))
+
+    def add(self, seg) -> None:
+        """Index ``seg`` under its start point."""
+
+        cell = self.cells.setdefault(self.key(seg.start.x, seg.start.y), [])
+        cell.append((next(self.counter), seg))
+
+    def remove(self, seg) -> None:
+        """Stop indexing ``seg``; segments that are not indexed are ignored."""
+
+        key = self.key(seg.start.x, seg.start.y)
+        cell = self.cells.get(key)
+        if not cell:
+            return
+        cell[:] = [entry for entry in cell if entry[1] is not seg]
+        if not cell:
+            del self.cells[key]
+
+    def find(self, x: float, y: float, cls: Optional[type] = None) -> list:
+        """Return segments starting at ``(x, y)``, oldest first.
+
+        Only instances of ``cls`` are returned when it is given.
+        """
+
+        tol = self.tolerance
+        if tol == 0:
+            entries = self.cells.get((x, y), [])
+        else:
+            kx, ky = self.key(x, y)
+            entries = []
+            for i in (kx - 1, kx, kx + 1):
+                for j in (ky - 1, ky, ky + 1):
+                    for entry in self.cells.get((i, j), ()):
+                        start = entry[1].start
+                        if abs(start.x - x) <= tol and abs(start.y - y) <= tol:
+                            entries.append(entry)
+            entries.sort(key=lambda entry: entry[0])
+        return [seg for _, seg in entries if cls is None or isinstance(seg, cls)]
@@ -0,0 +1,219 @@
+"""Opt-in per-phase timers and counters for :meth:`Mesh.simulate`.
+
+``mesh.enablestats()`` attaches a :class:`SimulationStats` to ``mesh.stats``
+and replaces the phase methods of that one mesh (``removeended``,
+``sortshocks``, ``findpairs``, ``handled``, ``firstevent``, ...) and of the
+sweep engines it creates with timed wrappers.  Nothing is wrapped while
+stats are disabled, so an uninstrumented run pays nothing.  Times are
+inclusive: ``firstevent`` contains the ``findpairs`` calls it makes.
+
+With ``trace=True`` every timed call is also kept as a Chrome trace event.
+:meth:`SimulationStats.savetrace` writes them, together with the active-front
+size as a counter track, in the JSON format opened by ``chrome://tracing``
+and https://ui.perfetto.dev.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from . import cache
+
+# Methods timed on the mesh and on its sweep engines.
+MESHPHASES = (
+    "firstevent",
+    "removeended",
+    "sortshocks",
+    "findpairs",
+    "checkpair",
+    "handled",
+    "wallendlinks",
+    "handleevent",
+    "compact",
+)
+ENGINEPHASES = (
+    "firstintersection",
+    "firstwallend",
+    "handleevent",
+    "insert",
+    "remove",
+    "expire",
+    "reorder",
+)
+
+
+class SimulationStats:
+    """Cumulative phase times, call counts, front sizes and cache hit rates.
+
+    ``times`` holds nanoseconds and ``calls`` the call count per phase name,
+    e.g. ``"mesh.findpairs"`` or ``"sweep.reorder"``.  ``front`` holds one
+    ``(x, active segments)`` sample per handled event.
+    """
+
+    def __init__(self, trace: bool = False, maxtrace: int = 1_000_000) -> None:
+        self.times: dict[str, int] = {}
+        self.calls: dict[str, int] = {}
+        self.front: list[tuple[float, int]] = []
+        self.trace: Optional[list] = [] if trace else None
+        self.maxtrace = maxtrace
+        self.origin = time.perf_counter_ns()
+        self.cachebase = cache.stats()
+        self.patched: list[tuple[object, str]] = []
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """Return ``func`` wrapped to count and time its calls as ``name``."""
+
+        times, calls, trace = self.times, self.calls, self.trace
+        times.setdefault(name, 0)
+        calls.setdefault(name, 0)
+        clock = time.perf_counter_ns
+        origin = self.origin
+        maxtrace = self.maxtrace
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                times[name] += elapsed
+                calls[name] += 1
+                if trace is not None and len(trace) < maxtrace:
+                    trace.append((name, start - origin, elapsed))
+
+        return wrapper
+
+    def instrument(
+        self, obj: object, names: Iterable[str], prefix: str, restore: bool = True
+    ) -> None:
+        """Time the methods ``names`` of ``obj`` as ``prefix + "." + name``.
+
+        Pass ``restore=False`` for short-lived objects such as sweep engines,
+        which :meth:`restore` then does not keep alive.
+        """
+
+        for name in names:
+            setattr(obj, name, self.timed(f"{prefix}.{name}", getattr(obj, name)))
+            if restore:
+                self.patched.append((obj, name))
+
+    @property
+    def active(self) -> bool:
+        """``True`` while wrappers are installed."""
+
+        return bool(self.patched)
+
+    def restore(self) -> None:
+        """Remove every wrapper installed by :meth:`instrument`."""
+
+        for obj, name in self.patched:
+            vars(obj).pop(name, None)
+        self.patched = []
+
+    def sample(self, x: float, size: int) -> None:
+        """Record the active-front ``size`` after the event at ``x``."""
+
+        self.front.append((x, size))
+        if self.trace is not None and len(self.trace) < self.maxtrace:
+            self.trace.append(("front", time.perf_counter_ns() - self.origin, size))
+
+    @property
+    def events(self) -> int:
+        return len(self.front)
+
+    def cachestats(self) -> dict[str, dict]:
+        """Return memo-cache hits, misses and hit rate since the stats started."""
+
+        out = {}
+        for name, now in cache.stats().items():
+            base = self.cachebase.get(name)
+            hits = now.hits - (base.hits if base else 0)
+            misses = now.misses - (base.misses if base else 0)
+            total = hits + misses
+            out[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hitrate": hits / total if total else 0.0,
+            }
+        return out
+
+    def summary(self) -> dict:
+        """Return every counter as plain data, suitable for JSON."""
+
+        phases = {
+            name: {
+                "calls": self.calls[name],
+                "seconds": self.times[name] / 1e9,
+                "mean": self.times[name] / 1e9 / self.calls[name],
+            }
+            for name in self.times
+            if self.calls[name]
+        }
+        sizes = [size for _, size in self.front]
+        return {
+            "events": self.events,
+            "phases": phases,
+            "maxfront": max(sizes, default=0),
+            "meanfront": sum(sizes) / len(sizes) if sizes else 0.0,
+            "caches": self.cachestats(),
+        }
+
+    def totrace(self) -> dict:
+        """Return the recorded calls in the Chrome trace event format."""
+
+        if self.trace is None:
+            raise ValueError("stats were enabled without trace=True")
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for name, start, value in self.trace:
+            if name == "front":
+                events.append(
+                    {
+                        "name": "active front",
+                        "ph": "C",
+                        "ts": start / 1000,
+                        "pid": pid,
+                        "args": {"segments": value},
+                    }
+                )
+            else:
+                events.append(
+                    {
+                        "name": name,
+                        "cat": name.split(".")[0],
+                        "ph": "X",
+                        "ts": start / 1000,
+                        "dur": value / 1000,
+                        "pid": pid,
+                        "tid": tid,
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def savetrace(self, path: str) -> None:
+        """Write :meth:`totrace` to ``path`` as JSON."""
+
+        with open(path, "w") as f:
+            json.dump(self.totrace(), f)
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        lines = [f"{'phase':24s} {'calls':>10s} {'seconds':>10s} {'mean us':>10s}"]
+        phases = sorted(summary["phases"].items(), key=lambda p: -p[1]["seconds"])
+        for name, phase in phases:
+            lines.append(
+                f"{name:24s} {phase['calls']:10d} {phase['seconds']:10.4f} "
+                f"{phase['mean'] * 1e6:10.2f}"
+            )
+        lines.append(
+            f"events {summary['events']}, active front max {summary['maxfront']}"
+            f" mean {summary['meanfront']:.1f}"
+        )
+        for name, info in summary["caches"].items():
+            if info["hits"] or info["misses"]:
+                lines.append(f"cache {name}: hit rate {info['hitrate']:.1%}")
+        return "\n".join(lines)
@@ -0,0 +1,85 @@
+"""Isentropic flow relations on whole arrays.
+
+Like :mod:`nozzlesim.kernels`, every function broadcasts its arguments and
+returns an array.  Ratios are static over stagnation values.  The area-Mach
+relation and its inversion on either branch are
+:func:`~nozzlesim.kernels.calcarearatio` and
+:func:`~nozzlesim.kernels.calcmachfromarearatio`.  :func:`distribution` turns
+a wall table into the flow at every station in one call::
+
+    from nozzlesim import isentropic
+
+    state = isentropic.distribution(1.25, mesh.getxytable(0, 1000, 0.01))
+    print(state.mach[-1], state.pressure[-1])
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+
+from .kernels import _asarrays, calcmachfromarearatio
+
+
+class FlowState(NamedTuple):
+    """Isentropic flow at the stations of a wall table."""
+
+    x: np.ndarray
+    arearatio: np.ndarray
+    mach: np.ndarray
+    temperature: np.ndarray
+    pressure: np.ndarray
+    density: np.ndarray
+
+
+def temperatureratio(gamma, mach) -> np.ndarray:
+    """Return ``T/T0`` at ``mach``."""
+
+    gamma, mach = _asarrays(gamma, mach)
+    return 1 / (1 + (gamma - 1) / 2 * mach**2)
+
+
+def pressureratio(gamma, mach) -> np.ndarray:
+    """Return ``p/p0`` at ``mach``."""
+
+    gamma, mach = _asarrays(gamma, mach)
+    return temperatureratio(gamma, mach) ** (gamma / (gamma - 1))
+
+
+def densityratio(gamma, mach) -> np.ndarray:
+    """Return ``rho/rho0`` at ``mach``."""
+
+    gamma, mach = _asarrays(gamma, mach)
+    return temperatureratio(gamma, mach) ** (1 / (gamma - 1))
+
+
+def distribution(gamma, table, axis: float = 0.0, exponent: float = 2.0) -> FlowState:
+    """Return the isentropic flow at every ``(x, y)`` row of an upper wall table.
+
+    ``table`` is sorted by ``x``, such as :meth:`Mesh.getxytable
+    <nozzlesim.mesh.Mesh.getxytable>` or :meth:`Contour.table
+    <nozzlesim.contour.Contour.table>`.  The throat is the narrowest station;
+    the flow is subsonic before it and supersonic from it on.  The area ratio
+    is ``((y - axis) / (ythroat - axis)) ** exponent``: ``2`` is the
+    convention of :meth:`Mesh.calcarearatio <nozzlesim.mesh.Mesh.calcarearatio>`
+    and ``1`` that of a planar nozzle.  Rows without a wall are ``nan``.
+    """
+
+    table = np.asarray(table, dtype=float).reshape(-1, 2)
+    x, height = table[:, 0], table[:, 1] - axis
+    exists = np.isfinite(height) & (height > 0)
+    if not exists.any():
+        raise ValueError("wall table has no station above the axis")
+    throat = np.argmin(np.where(exists, height, np.inf))
+    ratio = np.where(exists, height / height[throat], np.nan) ** exponent
+    supersonic = np.arange(len(x)) >= throat
+    mach = calcmachfromarearatio(gamma, ratio, supersonic)
+    return FlowState(
+        x,
+        ratio,
+        mach,
+        temperatureratio(gamma, mach),
+        pressureratio(gamma, mach),
+        densityratio(gamma, mach),
+    )
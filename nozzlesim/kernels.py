@@ -0,0 +1,249 @@
+"""Array versions of the gas-dynamics helpers in :mod:`nozzlesim.helperfuncs`.
+
+Every function takes array-like arguments, broadcasts them against each other
+with the usual NumPy rules and returns an array.  Angles are in degrees, as in
+:mod:`nozzlesim.helperfuncs`.
+
+The inverse problems are solved for all elements at once with a safeguarded
+Newton iteration (see :func:`solve`) that converges to machine precision.
+The scalar helpers stop their bisection earlier.  Results agree with them to
+within ``1e-6`` relative for everything built on :func:`calcmach`.  The
+scalar :func:`~nozzlesim.helperfuncs.calcmachfromarearatio` does only 20
+bisection steps over ``[1.1, 1000]``; inside that range the two agree to within
+``1e-4`` relative.
+
+Two differences from the scalar API:
+
+* :func:`calcmach` takes the Mach number the turn starts from as an optional
+  trailing ``mach1`` argument, defaulting to ``1``, so ``calcmach(gamma, v)``
+  inverts the Prandtl-Meyer function directly.
+* Inputs with no solution return ``nan`` instead of a clamped value.  For
+  :func:`calcmach` that means angles outside ``[0, calcvmax(gamma)]``; for
+  :func:`calcmachfromarearatio` it means ratios below ``1`` (by more than
+  rounding) and infinite ones.
+
+:func:`calcmachfromarearatio` also solves the subsonic branch, which the
+scalar helper lacks.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+
+def _asarrays(*args) -> list[np.ndarray]:
+    """Return ``args`` as float arrays broadcast to a common shape."""
+
+    return np.broadcast_arrays(*(np.asarray(arg, dtype=float) for arg in args))
+
+
+def solve(
+    func: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]],
+    target: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    guess: np.ndarray,
+    ftol: float = 0.0,
+    rtol: float = 1e-14,
+    maxiter: int = 100,
+) -> np.ndarray:
+    """Solve ``func(x) == target`` elementwise for monotonic increasing ``func``.
+
+    ``func`` returns the value and derivative at ``x``.  Each element runs
+    Newton's method inside its bracket ``[lower, upper]`` and falls back to
+    bisection whenever a step would leave the bracket.  An element is done
+    once ``|func(x) - target| <= ftol`` or its step is below ``rtol``
+    relative; ``ftol`` should cover the rounding noise of ``func``.
+    """
+
+    lower, upper, x, target = (
+        np.array(a, dtype=float) for a in (lower, upper, guess, target)
+    )
+    active = np.ones(x.shape, dtype=bool)
+    for _ in range(maxiter):
+        value, slope = func(x)
+        error = value - target
+        active &= np.abs(error) > ftol
+        upper = np.where(error > 0, x, upper)
+        lower = np.where(error < 0, x, lower)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x - error / slope
+        bisect = ~((step >= lower) & (step <= upper))
+        new = np.where(bisect, (lower + upper) / 2, step)
+        new = np.where(active, new, x)
+        active &= np.abs(new - x) > rtol * np.abs(x)
+        x = new
+        if not active.any():
+            break
+    return x
+
+
+def machangle(mach) -> np.ndarray:
+    """Return the Mach angle in radians for ``mach``."""
+
+    return np.arcsin(1 / np.asarray(mach, dtype=float))
+
+
+def _pm(k: np.ndarray, beta: np.ndarray) -> np.ndarray:
+    """Prandtl-Meyer angle in radians as a function of ``beta = sqrt(M**2 - 1)``."""
+
+    return k * np.arctan(beta / k) - np.arctan(beta)
+
+
+def _pmslope(k: np.ndarray, beta: np.ndarray) -> np.ndarray:
+    """Derivative of :func:`_pm` with respect to ``beta``."""
+
+    return 1 / (1 + (beta / k) ** 2) - 1 / (1 + beta**2)
+
+
+def prandtlmeyer(gamma, mach) -> np.ndarray:
+    """Return the Prandtl-Meyer angle of ``mach`` in degrees."""
+
+    gamma, mach = _asarrays(gamma, mach)
+    k = np.sqrt((gamma + 1) / (gamma - 1))
+    return np.degrees(_pm(k, np.sqrt(mach**2 - 1)))
+
+
+def calcv(gamma, mach1, mach2) -> np.ndarray:
+    """Return the Prandtl-Meyer angle change from ``mach1`` to ``mach2``."""
+
+    return prandtlmeyer(gamma, mach2) - prandtlmeyer(gamma, mach1)
+
+
+def calcvmax(gamma) -> np.ndarray:
+    """Return the maximum Prandtl-Meyer angle for ``gamma``."""
+
+    gamma = np.asarray(gamma, dtype=float)
+    k = np.sqrt((gamma + 1) / (gamma - 1))
+    return np.degrees(np.pi / 2 * (k - 1))
+
+
+def calcmach(gamma, angle, mach1=1.0) -> np.ndarray:
+    """Return the Mach number reached after turning ``angle`` from ``mach1``."""
+
+    gamma, angle, mach1 = _asarrays(gamma, angle, mach1)
+    k = np.sqrt((gamma + 1) / (gamma - 1))
+    target = _pm(k, np.sqrt(mach1**2 - 1)) + np.radians(angle)
+    numax = np.pi / 2 * (k - 1)
+    valid = (target >= 0) & (target < numax)
+    target = np.where(valid, target, 0.0)
+
+    def f(beta):
+        return _pm(k, beta), _pmslope(k, beta)
+
+    # Start from nu ~ (1 - 1/k**2) * beta**3 / 3 near the sonic point and from
+    # nu ~ numax - (k**2 - 1) / beta towards the vacuum limit.
+    with np.errstate(divide="ignore"):
+        far = (k**2 - 1) / (numax - target)
+    guess = np.where(target < numax / 2, np.cbrt(3 * target / (1 - 1 / k**2)), far)
+    upper = np.full_like(target, 1e12)
+    lower = np.zeros_like(target)
+    # ``_pm`` subtracts two terms of order ``k``, which limits its accuracy.
+    ftol = 8 * np.finfo(float).eps * np.max(k, initial=1.0)
+    beta = solve(f, target, lower, upper, np.minimum(guess, 1e6), ftol)
+    return np.where(valid, np.sqrt(beta**2 + 1), np.nan)
+
+
+def shockangle(gamma, v, theta, turningangle) -> np.ndarray:
+    """Return angle of the upstream characteristic at a wall turn."""
+
+    gamma, v, theta, turningangle = _asarrays(gamma, v, theta, turningangle)
+    alpha1 = np.degrees(machangle(calcmach(gamma, v)))
+    return -_sign(turningangle) * alpha1 + theta
+
+
+def shockprop(gamma, v, theta, turningangle) -> np.ndarray:
+    """Return propagation angle of a characteristic through a wall turn."""
+
+    gamma, v, theta, turningangle = _asarrays(gamma, v, theta, turningangle)
+    angle1 = shockangle(gamma, v, theta, turningangle)
+    angle2 = shockangle(
+        gamma, v + np.abs(turningangle), theta + turningangle, turningangle
+    )
+    return (angle1 + angle2) / 2
+
+
+def calcshockpropangle(gamma, v1, theta, turningangle) -> np.ndarray:
+    """Return propagation angle of a characteristic after a bend."""
+
+    gamma, v1, theta, turningangle = _asarrays(gamma, v1, theta, turningangle)
+    alpha1 = np.degrees(machangle(calcmach(gamma, v1)))
+    alpha2 = np.degrees(machangle(calcmach(gamma, v1 + np.abs(turningangle))))
+    abar = -_sign(turningangle) * (alpha1 + alpha2) / 2
+    return abar + theta - turningangle / 2
+
+
+def alphadiff(gamma, v1, v2) -> np.ndarray:
+    """Return difference in Mach angles corresponding to ``v1`` and ``v2``."""
+
+    alpha1 = np.degrees(machangle(calcmach(gamma, v1)))
+    alpha2 = np.degrees(machangle(calcmach(gamma, v2)))
+    return alpha1 - alpha2
+
+
+def calcarearatio(gamma, mach) -> np.ndarray:
+    """Return area ratio ``A/A*`` for a given ``mach`` and ``gamma``."""
+
+    gamma, mach = _asarrays(gamma, mach)
+    return (
+        1
+        / mach
+        * ((2 + (gamma - 1) * mach**2) / (gamma + 1))
+        ** (0.5 * ((gamma + 1) / (gamma - 1)))
+    )
+
+
+def calcmachfromarearatio(gamma, ratio, supersonic=True) -> np.ndarray:
+    """Return the Mach number with area ratio ``ratio``.
+
+    ``supersonic`` broadcasts like the other arguments and picks the branch
+    above ``M = 1`` where true and the one below it where false.
+    """
+
+    gamma, ratio, supersonic = _asarrays(gamma, ratio, supersonic)
+    supersonic = supersonic != 0
+    # ``calcarearatio`` may round the sonic ratio a few ulps below 1.
+    valid = np.isfinite(ratio) & (ratio >= 1 - 4 * np.finfo(float).eps)
+    # Past the top of the supersonic bracket the solve would return its cap.
+    valid &= ~supersonic | (ratio <= calcarearatio(gamma, 1e6))
+    ratio = np.where(valid, np.maximum(ratio, 1.0), 1.0)
+    logratio = np.log(ratio)
+    # ln(A/A*) falls with M below the throat, so solve for its negative there.
+    sign = np.where(supersonic, 1.0, -1.0)
+    target = sign * logratio
+
+    def f(mach):
+        value = np.log(calcarearatio(gamma, mach))
+        slope = (mach**2 - 1) / (mach * (1 + (gamma - 1) / 2 * mach**2))
+        return sign * value, sign * slope
+
+    # Near the throat ln(A/A*) ~ 2 * (M - 1)**2 / (gamma + 1); for large M,
+    # A/A* ~ scale * M**(2 / (gamma - 1)) and for small M, A/A* ~ low / M.
+    # Each branch starts from the larger of its two estimates.
+    exponent = 2 / (gamma - 1)
+    scale = ((gamma - 1) / (gamma + 1)) ** (0.5 * (gamma + 1) / (gamma - 1))
+    low = (2 / (gamma + 1)) ** (0.5 * (gamma + 1) / (gamma - 1))
+    near = np.sqrt((gamma + 1) * logratio / 2)
+    guess = np.where(
+        supersonic,
+        np.minimum(
+            np.maximum((np.exp(logratio) / scale) ** (1 / exponent), 1 + near), 1e5
+        ),
+        np.clip(np.maximum(low / np.exp(logratio), 1 - near), 0.0, 1.0),
+    )
+    upper = np.where(supersonic, 1e6, 1.0)
+    lower = np.where(supersonic, 1.0, 0.0)
+    # Per element, so large ratios do not loosen those near the throat.
+    ftol = 8 * np.finfo(float).eps * np.maximum(np.abs(target), 1.0)
+    mach = solve(f, target, lower, upper, guess, ftol)
+    # Newton only gets within the square root of ``ftol`` of the sonic point.
+    mach = np.where(ratio == 1, 1.0, mach)
+    return np.where(valid, mach, np.nan)
+
+
+def _sign(x: np.ndarray) -> np.ndarray:
+    """Return ``1`` for non-negative ``x`` and ``-1`` otherwise."""
+
+    return np.where(x >= 0, 1.0, -1.0)
@@ -0,0 +1,320 @@
+"""Closed-form characteristic lattice of a pair of uniform arc walls.
+
+When both walls of a mesh are :meth:`Wall.createarc` polylines with equal
+steps, the top wall turning up and the bottom wall turning down, every wave
+of the simulation belongs to a regular lattice.  Top corner ``i`` emits a
+downward wave and bottom corner ``j`` an upward one.  The two meet at node
+``(i, j)``, where each continues with its own turning.  Past the last node a
+wave is cancelled by the opposite wall, which turns back by the wave's
+turning.  The flow between the waves follows from the number of waves
+crossed: after ``a`` top waves of turning ``dt`` and ``b`` bottom waves of
+turning ``db``, the Prandtl-Meyer angle is ``v0 + a * dt + b * db`` and the
+flow angle ``a * dt - b * db``.
+
+:func:`solve` computes the propagation angle of every wave from those states
+and the node positions one anti-diagonal ``i + j`` at a time, all nodes of a
+diagonal at once.  Nothing is searched for.  :func:`iterevents` replays the
+lattice on the mesh in ``x`` order through :meth:`Mesh.processevent
+<nozzlesim.mesh.Mesh.processevent>`; it is the ``"lattice"`` engine of
+:meth:`Mesh.simulate <nozzlesim.mesh.Mesh.simulate>`.  :func:`crosscheck`
+compares a lattice run with a generic engine segment by segment.
+
+The lattice assumes that no wave reaches a wall before it has crossed every
+wave of the other family.  The assumption also fails when a wave reaches the
+opposite wall before ``endexpansion``, where it would reflect.
+:func:`solve` raises ``ValueError`` when the computed lattice violates
+either assumption.  Both hold for short arcs only: with a throat height of
+``1``, an arc length ``n * deltax`` below roughly 0.25 (``theta = 10``,
+``n = 100``) to 0.55 (``theta = 34.45``, ``n = 20``).  The ``main.py``
+case, ``n = 100`` and ``deltax = 0.007``, is not a lattice.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from . import adaptive
+from . import helperfuncs as h
+from .index import StartIndex
+from .point import Point
+from .wall import SymmetryPlane, Wall
+
+
+class Lattice(NamedTuple):
+    """Propagation angles and intersection points of a characteristic lattice.
+
+    With ``nt`` top and ``nb`` bottom corners, ``down[i, j]`` is the angle
+    (degrees) of the wave from top corner ``i`` after crossing ``j`` bottom
+    waves, and ``up[i, j]`` that of the wave from bottom corner ``j`` after
+    crossing ``i`` top waves.  Node ``(i, j)`` is at ``(x[i, j], y[i, j])``.
+    ``tophits[j]`` is where bottom wave ``j`` meets the top wall, and
+    ``bottomhits[i]`` where top wave ``i`` meets the bottom wall.
+    """
+
+    topwalls: list
+    bottomwalls: list
+    down: np.ndarray
+    up: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    tophits: np.ndarray
+    bottomhits: np.ndarray
+
+
+def arcwalls(mesh) -> tuple[list, list]:
+    """Return the top and bottom wall chains of an unsimulated arc ``mesh``.
+
+    Raises ``ValueError`` unless the mesh holds nothing but two expanding
+    uniform arcs starting at ``x = 0``.
+    """
+
+    if any(not isinstance(seg, Wall) for seg in mesh.shocks):
+        raise ValueError("the lattice engine needs an unsimulated mesh")
+    if any(isinstance(seg, SymmetryPlane) for seg in mesh.shocks):
+        raise ValueError("the lattice engine does not support symmetry planes")
+    if mesh.waveplan:
+        raise ValueError("the lattice engine does not support mergeturn or maxturn")
+    chains = adaptive.chains(mesh.shocks, mesh.nextwalls)
+    if len(chains) != 2 or sum(map(len, chains)) != len(mesh.shocks):
+        raise ValueError("the lattice engine needs exactly two wall chains")
+    top, bottom = sorted(chains, key=lambda chain: -chain[0].start.y)
+    for chain, sign in ((top, 1), (bottom, -1)):
+        turns = [b.angle - a.angle for a, b in zip(chain, chain[1:])]
+        if chain[0].start.x != 0 or chain[-1].end is not None:
+            raise ValueError("arc walls must start at x = 0 and end open")
+        if not all(sign * turn > 0 for turn in turns):
+            raise ValueError("arc walls must turn away from each other")
+        if not all(math.isclose(turn, turns[0], rel_tol=1e-9) for turn in turns):
+            raise ValueError("arc walls must turn in equal steps")
+    return top, bottom
+
+
+def machangles(gamma: float, v: np.ndarray) -> np.ndarray:
+    """Return the Mach angles (degrees) for the Prandtl-Meyer angles ``v``.
+
+    Uses the scalar helpers, as :class:`~nozzlesim.shock.Shock` does, once per
+    distinct value.
+    """
+
+    values, inverse = np.unique(v, return_inverse=True)
+    alpha = [math.degrees(h.machangle(h.calcmach(gamma, 1.0, u))) for u in values]
+    return np.array(alpha)[inverse].reshape(v.shape)
+
+
+def intersect(x1, y1, slope1, x2, y2, slope2) -> tuple[np.ndarray, np.ndarray]:
+    """Intersect lines given by points and slopes, as :meth:`Shock.intersect`."""
+
+    intercept1 = y1 - slope1 * x1
+    intercept2 = y2 - slope2 * x2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = (intercept2 - intercept1) / (slope1 - slope2)
+        return x, slope1 * x + intercept1
+
+
+def wallhits(wall: Wall, starts: np.ndarray, angles: np.ndarray, turn: float):
+    """Return where waves from ``starts`` at ``angles`` meet a contracting wall.
+
+    Each wave turns the wall by ``turn`` from the point it hits onwards.
+    """
+
+    hits = np.empty((len(starts), 2))
+    wx, wy, angle = wall.start.x, wall.start.y, wall.angle
+    for k, ((sx, sy), wave) in enumerate(zip(starts, angles)):
+        hits[k] = intersect(
+            sx, sy, math.tan(math.radians(wave)), wx, wy, math.tan(math.radians(angle))
+        )
+        if not hits[k, 0] > max(sx, wx):
+            raise ValueError("a wave misses the wall it should meet")
+        (wx, wy), angle = hits[k], angle + turn
+    return hits
+
+
+def solve(mesh) -> Lattice:
+    """Return the :class:`Lattice` of the unsimulated arc ``mesh``."""
+
+    top, bottom = arcwalls(mesh)
+    nt, nb = len(top) - 1, len(bottom) - 1
+    dt = (top[-1].angle - top[0].angle) / nt
+    db = (bottom[0].angle - bottom[-1].angle) / nb
+
+    # State after crossing ``a`` top and ``b`` bottom waves.
+    a, b = np.ogrid[: nt + 1, : nb + 1]
+    v = h.calcv(mesh.gamma, 1, mesh.initialmach) + a * dt + b * db
+    theta = a * dt - b * db
+    alpha = machangles(mesh.gamma, v)
+
+    # ``Shock.propangle``: the mean of the characteristic angles on both sides.
+    side = -alpha + theta
+    down = (side[:-1] + side[1:]) / 2
+    side = alpha + theta
+    up = (side[:, :-1] + side[:, 1:]) / 2
+
+    # Row ``i + 1`` holds the nodes on top wave ``i``, column ``j + 1`` those
+    # on bottom wave ``j``; row and column ``0`` hold the corners.
+    px = np.full((nt + 1, nb + 1), np.nan)
+    py = np.full((nt + 1, nb + 1), np.nan)
+    px[1:, 0] = [wall.start.x for wall in top[1:]]
+    py[1:, 0] = [wall.start.y for wall in top[1:]]
+    px[0, 1:] = [wall.start.x for wall in bottom[1:]]
+    py[0, 1:] = [wall.start.y for wall in bottom[1:]]
+    downslope = np.tan(np.radians(down))
+    upslope = np.tan(np.radians(up))
+    for k in range(nt + nb - 1):
+        i = np.arange(max(0, k - nb + 1), min(k, nt - 1) + 1)
+        j = k - i
+        px[i + 1, j + 1], py[i + 1, j + 1] = intersect(
+            px[i + 1, j],
+            py[i + 1, j],
+            downslope[i, j],
+            px[i, j + 1],
+            py[i, j + 1],
+            upslope[i, j],
+        )
+    x, y = px[1:, 1:], py[1:, 1:]
+    with np.errstate(invalid="ignore"):
+        ordered = (x > px[1:, :-1]) & (x > px[:-1, 1:])
+    if not ordered.all():
+        raise ValueError("the waves do not cross in lattice order")
+
+    tophits = wallhits(top[-1], np.stack([px[nt, 1:], py[nt, 1:]], 1), up[nt], -db)
+    bottomhits = wallhits(
+        bottom[-1], np.stack([px[1:, nb], py[1:, nb]], 1), down[:, nb], dt
+    )
+    if min(tophits[0, 0], bottomhits[0, 0]) < mesh.endexpansion:
+        raise ValueError("a wave reaches a wall before endexpansion")
+
+    # Every node must lie between the walls.
+    for walls, hits, turn, sign in (
+        (top, tophits, -db, 1),
+        (bottom, bottomhits, dt, -1),
+    ):
+        wx = np.array([wall.start.x for wall in walls] + list(hits[:, 0]))
+        wy = np.array([wall.start.y for wall in walls] + list(hits[:, 1]))
+        last = math.tan(math.radians(walls[-1].angle + len(hits) * turn))
+        wally = np.where(x > wx[-1], wy[-1] + (x - wx[-1]) * last, np.interp(x, wx, wy))
+        if not (sign * (wally - y) > 0).all():
+            raise ValueError("a wave reaches a wall before crossing the lattice")
+
+    return Lattice(top, bottom, down, up, x, y, tophits, bottomhits)
+
+
+def iterevents(
+    mesh, stop: float = float("inf"), proceed: Optional[Callable[[], bool]] = None
+) -> Iterator:
+    """Handle the events of the solved lattice in ``x`` order.
+
+    Yields an :class:`~nozzlesim.engine.Event` per event and follows the
+    ``stop`` and ``proceed`` conventions of :meth:`SweepEngine.iterevents
+    <nozzlesim.engine.SweepEngine.iterevents>`.  A run stopped early leaves
+    the mesh consistent, so a generic engine can finish it.
+    """
+
+    lattice = solve(mesh)
+    top, bottom = lattice.topwalls, lattice.bottomwalls
+    nt, nb = lattice.x.shape
+
+    # ``(x, rank, kind, i, j)``; corners go first at equal ``x``, as in the
+    # generic engines.
+    events = [(wall.end.x, 0, "top", i, 0) for i, wall in enumerate(top[:-1])]
+    events += [(wall.end.x, 0, "bottom", 0, j) for j, wall in enumerate(bottom[:-1])]
+    events += [(x, 1, "node", i, j) for (i, j), x in np.ndenumerate(lattice.x)]
+    events += [(hit[0], 1, "tophit", 0, j) for j, hit in enumerate(lattice.tophits)]
+    events += [
+        (hit[0], 1, "bottomhit", i, 0) for i, hit in enumerate(lattice.bottomhits)
+    ]
+    events.sort(key=lambda event: event[:2])
+
+    # The current segment of every wave and the last segment of each wall.
+    down, up = [None] * nt, [None] * nb
+    topwall, bottomwall = top[-1], bottom[-1]
+    lastcheck = mesh.remainingangle <= 0
+    for _, _, kind, i, j in events:
+        if mesh.x >= stop or (proceed is not None and not proceed()):
+            return
+        if kind == "top":
+            event = mesh.processevent(["wall", [top[i], top[i + 1], top[i].end]])
+            down[i] = event.created[0]
+        elif kind == "bottom":
+            event = mesh.processevent(
+                ["wall", [bottom[j], bottom[j + 1], bottom[j].end]]
+            )
+            up[j] = event.created[0]
+        elif kind == "node":
+            point = Point(float(lattice.x[i, j]), float(lattice.y[i, j]))
+            event = mesh.processevent(["intersection", (down[i], up[j], point)])
+            up[j], down[i] = event.created
+        elif kind == "tophit":
+            point = Point(*map(float, lattice.tophits[j]))
+            event = mesh.processevent(["intersection", (topwall, up[j], point)])
+            (topwall,) = event.created
+        else:
+            point = Point(*map(float, lattice.bottomhits[i]))
+            event = mesh.processevent(["intersection", (down[i], bottomwall, point)])
+            (bottomwall,) = event.created
+        yield event
+        if lastcheck:
+            return
+
+
+def crosscheck(
+    build: Callable, engine: str = "sweep", atol: float = 1e-9, **kwargs
+) -> dict:
+    """Compare the ``"lattice"`` engine with ``engine`` on the same mesh.
+
+    ``build(**kwargs)`` must return an unsimulated mesh; it is called once per
+    engine.  Every lattice segment is matched with a segment of the same
+    type starting within ``atol`` of it, preferring the closest angle.
+    Returns the ``segments`` and ``events`` of both runs, their
+    ``arearatio`` and ``seconds``, the number of segments left ``unmatched``
+    on either side, the largest ``distance`` between matched end points and
+    ``angle`` difference (degrees), and ``match``, true when every segment
+    matched within ``atol``.
+    """
+
+    meshes, events, seconds = [], [], []
+    for name in ("lattice", engine):
+        mesh = build(**kwargs)
+        start = time.perf_counter()
+        events.append(mesh.simulate(engine=name))
+        seconds.append(time.perf_counter() - start)
+        meshes.append(mesh)
+    lattice, reference = meshes
+
+    index = StartIndex(atol, reference.shocks)
+    matched = set()
+    unmatched = 0
+    distance = angle = 0.0
+    for seg in lattice.shocks:
+        candidates = [
+            other
+            for other in index.find(seg.start.x, seg.start.y, type(seg))
+            if id(other) not in matched
+        ]
+        if not candidates:
+            unmatched += 1
+            continue
+        other = min(candidates, key=lambda other: abs(other.angle - seg.angle))
+        matched.add(id(other))
+        angle = max(angle, abs(other.angle - seg.angle))
+        for p, q in ((seg.start, other.start), (seg.end, other.end)):
+            if p is None and q is None:
+                continue
+            if p is None or q is None:
+                distance = float("inf")
+            else:
+                distance = max(distance, math.hypot(p.x - q.x, p.y - q.y))
+    unmatched += len(reference.shocks) - len(matched)
+    return {
+        "segments": (len(lattice.shocks), len(reference.shocks)),
+        "events": tuple(events),
+        "arearatio": (lattice.calcarearatio(), reference.calcarearatio()),
+        "seconds": tuple(seconds),
+        "unmatched": unmatched,
+        "distance": distance,
+        "angle": angle,
+        "match": unmatched == 0 and distance <= atol,
+    }
@@ -0,0 +1,190 @@
+"""Flow state at arbitrary points of a simulated :class:`~nozzlesim.mesh.Mesh`.
+
+The characteristics split the nozzle into regions of uniform flow.
+:class:`FlowLocator` finds the region holding a point with a slab
+decomposition.  The ``x`` axis is cut at every segment start and end point.
+Inside a slab no two segments cross, so the segments alive there can be kept
+sorted by ``y``.  A query is two binary searches: one over the slab
+boundaries and one over the segments of that slab.  That is ``O(log N)``
+per point, done for all points at once with NumPy.
+
+Each gap between two neighbouring segments of a slab takes its state from a
+neighbouring shock.  A characteristic sloping upwards has its downstream
+side below it; one sloping downwards has it above.  Gaps bounded only by
+walls inherit the state of the region they continue from in the previous
+slab, or the inlet state in the first slab.  Points above the top wall or
+below the bottom wall are outside the flow and give ``nan``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from . import helperfuncs as h
+from . import kernels
+from .store import WALL
+
+
+class FlowLocator:
+    """Answer bulk ``(x, y)`` flow-state queries for a finished mesh.
+
+    The locator is a snapshot: build a new one after simulating further.
+    """
+
+    def __init__(self, mesh) -> None:
+        arrays = mesh.as_arrays()
+        startx = arrays["startx"]
+        endx = np.where(np.isnan(arrays["endx"]), np.inf, arrays["endx"])
+        self.slope = np.tan(np.radians(arrays["angle"]))
+        self.intercept = arrays["starty"] - self.slope * startx
+        iswall = arrays["kind"] == WALL
+
+        # Slab ``k`` spans ``bounds[k] <= x < bounds[k + 1]``; the last one is
+        # open ended.
+        self.bounds = np.unique(np.concatenate([startx, endx[np.isfinite(endx)]]))
+        nslabs = len(self.bounds)
+        upper = np.append(self.bounds[1:], np.inf)
+        probe = np.where(
+            np.isfinite(upper), (self.bounds + upper) / 2, self.bounds + 1.0
+        )
+
+        # Segments alive in each slab, sorted by decreasing ``y``, stored as
+        # ``segments[offsets[k]:offsets[k + 1]]``.
+        order = np.argsort(startx, kind="stable")
+        startslab = np.searchsorted(self.bounds, startx[order])
+        endslab = np.searchsorted(self.bounds, endx[order])
+        chunks = []
+        counts = np.zeros(nslabs, dtype=np.int64)
+        active: dict[int, int] = {}
+        nxt = 0
+        for k in range(nslabs):
+            while nxt < len(order) and startslab[nxt] == k:
+                active[int(order[nxt])] = int(endslab[nxt])
+                nxt += 1
+            for seg in [seg for seg, end in active.items() if end <= k]:
+                del active[seg]
+            segs = np.fromiter(active, dtype=np.int64, count=len(active))
+            ys = self.slope[segs] * probe[k] + self.intercept[segs]
+            chunks.append(segs[np.argsort(-ys, kind="stable")])
+            counts[k] = len(segs)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.segments = np.concatenate(chunks) if chunks else np.empty(0, np.int64)
+
+        self.buildstates(arrays, iswall, mesh)
+
+    def buildstates(self, arrays, iswall, mesh) -> None:
+        """Assign ``v``, ``theta`` and ``gamma`` to every gap of every slab.
+
+        Slab ``k`` has ``offsets[k + 1] - offsets[k] + 1`` gaps, numbered from
+        the top starting at ``offsets[k] + k``.
+        """
+
+        nslabs = len(self.bounds)
+        counts = np.diff(self.offsets)
+        ngaps = len(self.segments) + nslabs
+        slab = np.repeat(np.arange(nslabs), counts)
+        gapslab = np.repeat(np.arange(nslabs), counts + 1)
+        starts = self.offsets[:-1] + np.arange(nslabs)
+        below = np.arange(len(self.segments)) + slab + 1
+        above = below - 1
+
+        segs = self.segments
+        rising = self.slope[segs] > 0
+        shock = ~iswall[segs]
+        turn = arrays["turningangle"][segs]
+        upv, uptheta = arrays["v"][segs], arrays["theta"][segs]
+        downv, downtheta = upv + np.abs(turn), uptheta + turn
+
+        v = np.full(ngaps, np.nan)
+        theta = np.full(ngaps, np.nan)
+        gamma = np.full(ngaps, np.nan)
+        # The side below a rising characteristic is downstream of it.
+        for gaps, downstream in ((above, ~rising), (below, rising)):
+            gaps, pick = gaps[shock], downstream[shock]
+            v[gaps] = np.where(pick, downv[shock], upv[shock])
+            theta[gaps] = np.where(pick, downtheta[shock], uptheta[shock])
+            gamma[gaps] = arrays["gamma"][segs][shock]
+
+        # Gaps with a wall somewhere above and below are inside the nozzle.
+        cumwalls = np.concatenate([[0], np.cumsum(iswall[segs])])
+        before = cumwalls[self.offsets[:-1]]
+        wallsabove = np.zeros(ngaps, dtype=np.int64)
+        wallsabove[below] = cumwalls[1:] - before[slab]
+        wallsbelow = (cumwalls[self.offsets[1:]] - before)[gapslab] - wallsabove
+        inside = (wallsabove > 0) & (wallsbelow > 0)
+        v[~inside] = theta[~inside] = gamma[~inside] = np.nan
+        self.gapv, self.gaptheta, self.gapgamma = v, theta, gamma
+
+        # Regions between two walls continue from the previous slab.
+        inletv = h.calcv(mesh.gamma, 1, mesh.initialmach)
+        for gap in np.flatnonzero(inside & np.isnan(v)):
+            k = gapslab[gap]
+            if k == 0:
+                v[gap], theta[gap], gamma[gap] = inletv, 0.0, mesh.gamma
+                continue
+            i = self.offsets[k] + gap - starts[k]
+            top, bottom = segs[i - 1], segs[i]
+            x = self.bounds[k]
+            y = (self.y(top, x) + self.y(bottom, x)) / 2
+            prev = self.findgaps(np.array([x]), np.array([y]), np.array([k - 1]))[0]
+            v[gap], theta[gap], gamma[gap] = v[prev], theta[prev], gamma[prev]
+
+    def y(self, seg, x):
+        """Return the ``y`` of segment ``seg`` (extended as a line) at ``x``."""
+
+        return self.slope[seg] * x + self.intercept[seg]
+
+    def findgaps(self, x, y, slabs=None) -> np.ndarray:
+        """Return the gap index holding each point, or ``-1`` outside all slabs."""
+
+        if slabs is None:
+            slabs = np.searchsorted(self.bounds, x, side="right") - 1
+        valid = slabs >= 0
+        k = np.where(valid, slabs, 0)
+        lo = self.offsets[k].copy()
+        hi = self.offsets[k + 1].copy()
+        # Count the segments above each point by bisection; the segments of a
+        # slab are sorted by decreasing ``y``.
+        while True:
+            searching = lo < hi
+            if not searching.any():
+                break
+            mid = (lo + hi) // 2
+            seg = self.segments[np.minimum(mid, len(self.segments) - 1)]
+            isabove = self.y(seg, x) > y
+            lo = np.where(searching & isabove, mid + 1, lo)
+            hi = np.where(searching & ~isabove, mid, hi)
+        gaps = lo + k
+        return np.where(valid, gaps, -1)
+
+    def query(self, x, y) -> dict[str, np.ndarray]:
+        """Return ``v``, ``theta``, ``gamma`` and ``mach`` at the points ``(x, y)``.
+
+        ``x`` and ``y`` broadcast against each other.  Angles are in degrees.
+        Points outside the nozzle give ``nan``.
+        """
+
+        x, y = np.broadcast_arrays(np.asarray(x, float), np.asarray(y, float))
+        shape = x.shape
+        x, y = x.ravel(), y.ravel()
+        gaps = self.findgaps(x, y)
+        found = gaps >= 0
+        gaps = np.where(found, gaps, 0)
+        v = np.where(found, self.gapv[gaps], np.nan)
+        theta = np.where(found, self.gaptheta[gaps], np.nan)
+        gamma = np.where(found, self.gapgamma[gaps], np.nan)
+        mach = np.full(x.shape, np.nan)
+        inside = ~np.isnan(gamma)
+        if inside.any():
+            mach[inside] = kernels.calcmach(gamma[inside], v[inside])
+        return {
+            "v": v.reshape(shape),
+            "theta": theta.reshape(shape),
+            "gamma": gamma.reshape(shape),
+            "mach": mach.reshape(shape),
+        }
+
+    def mach(self, x, y) -> np.ndarray:
+        """Return the Mach number at the points ``(x, y)``."""
+
+        return self.query(x, y)["mach"]
@@ -1,18 +1,47 @@
 """Basic nozzle mesh utilities."""
 
 from copy import copy
+from itertools import chain
 import math as m
+import time
 
 import numpy as np
-import pygame
 
+from . import adaptive, checkpoint, lattice
 from . import helperfuncs as h
+from .contour import Contour
 from .point import Point
+from .engine import Event, SweepEngine
+from .index import StartIndex
+from .instrument import ENGINEPHASES, MESHPHASES, SimulationStats
+from .locate import FlowLocator
+from .render import PygameRenderer, convertpoint, drawline, drawshock
 from .shock import Shock
-from .wall import Wall
+from .store import CharacteristicStore
+from .wall import SymmetryPlane, Wall
 
 epsilon = 10**-10
 
+# Engine used by :meth:`Mesh.simulate` when none is requested explicitly.
+# ``"sweep"`` uses the incremental event queue in :mod:`nozzlesim.engine`,
+# ``"scan"`` re-sorts and rescans the whole active front for every event.
+# ``"lattice"`` solves uniform arc walls in closed form; see
+# :mod:`nozzlesim.lattice`.
+DEFAULT_ENGINE = "sweep"
+ENGINES = ("sweep", "scan", "lattice")
+
+# Accepted values of the ``retain`` argument of :class:`Mesh`.
+RETAIN = ("all", "discard", "spill")
+
+# Bounded meshes compact once ``shocks`` has grown by this many segments past
+# twice its size after the previous compaction.
+COMPACTSLACK = 1024
+
+# Fronts of at least this many segments are paired by the numpy pass of
+# :meth:`Mesh.findpairs`; below it, building the arrays costs more than the
+# per-pair Python loop.
+VECTORIZEMIN = 96
+
 
 class Mesh:
     """Container for tracking walls and shocks during a nozzle simulation."""
@@ -26,6 +55,11 @@ class Mesh:
         endexpansion,
         remainingangle,
         x=0,
+        tolerance=1e-9,
+        retain="all",
+        spillpath=None,
+        mergeturn=0.0,
+        maxturn=None,
     ):
         """Create a new mesh.
 
@@ -45,18 +79,78 @@ class Mesh:
             Angle remaining in the wall turn when the mesh is created.
         x : float, optional
             Starting ``x`` location.
+        tolerance : float, optional
+            Distance within which two segment start points are treated as the
+            same point, so rounding in computed intersections does not turn a
+            handled event into a new one.  ``0`` requires exact equality.
+        retain : {"all", "discard", "spill"}, optional
+            What happens to characteristics once they have ended.  ``"all"``
+            keeps them in :attr:`shocks`.  ``"discard"`` drops them and only
+            counts them in :attr:`spillstats`.  ``"spill"`` also appends them
+            to the segment log at ``spillpath``; see :meth:`segmentlog` and
+            :meth:`close`.  Walls are always kept.  With either bounded mode,
+            memory follows the active front instead of the total mesh size.
+        spillpath : str, optional
+            File the segment log is written to when ``retain="spill"``.
+        mergeturn : float, optional
+            Lump runs of predefined wall corners turning at most this many
+            degrees in total into a single expansion wave; see
+            :mod:`nozzlesim.adaptive`.  ``0`` gives every corner its own wave.
+        maxturn : float, optional
+            Split the wave of any corner (or lumped run) turning more than
+            this into a fan of weaker waves.
         """
 
         self.gamma = gamma
         self.initialmach = initialmach
         self.wallsegments = wallsegments
 
+        # ``[v, theta, gamma, mach, mu]`` of the inflow, upstream of every wave
+        # emitted at ``x = 0``.
+        inflowv = h.calcv(gamma, 1, initialmach)
+        self.inflow = [inflowv, 0, gamma, *h.machstate(gamma, inflowv)]
+
         # ``shocks`` keeps every shock or wall created during the simulation.
         self.shocks = copy(initialshocks)
 
         # ``activeshocks`` only contains objects that still exist at ``x``.
         self.activeshocks = copy(initialshocks)
 
+        # Lookups by start point and the flat per-segment columns; keep both in
+        # sync through ``addsegment`` and ``setend``.
+        self.index = StartIndex(tolerance, self.shocks)
+        self.store = CharacteristicStore(max(64, 4 * len(self.shocks)))
+        for seg in self.shocks:
+            self.store.append(seg)
+        self.nextwalls = {}
+        for seg in self.shocks:
+            if isinstance(seg, Wall) and seg.end is not None:
+                walls = self.index.find(seg.end.x, seg.end.y, Wall)
+                if walls:
+                    self.nextwalls[id(seg)] = walls[-1]
+
+        # Waves emitted by the predefined wall corners; empty unless adaptive.
+        self.mergeturn, self.maxturn = mergeturn, maxturn
+        self.waveplan, self.wavestats = {}, None
+        if mergeturn or maxturn:
+            walls = [seg for seg in self.shocks if isinstance(seg, Wall)]
+            self.waveplan, self.wavestats = adaptive.waveplan(
+                walls, self.nextwalls, mergeturn, maxturn
+            )
+
+        # Memory-bounded modes; see ``compact``.
+        if retain not in RETAIN:
+            raise ValueError(f"unknown retain {retain!r}, expected one of {RETAIN}")
+        if retain == "spill" and spillpath is None:
+            raise ValueError('retain="spill" needs a spillpath')
+        self.retain = retain
+        self.log = checkpoint.SegmentLog(spillpath) if retain == "spill" else None
+        self.spillstats = {"count": 0, "maxv": -float("inf")}
+        self.retained = len(self.shocks)
+
+        # Phase timers, see ``enablestats``.
+        self.stats = None
+
         # Simulation state
         self.x = x
         self.endexpansion = endexpansion
@@ -76,70 +170,378 @@ class Mesh:
     # 6. go to that x value, spawn/destroy elements as needed to deal with that intersection
     # 7. go to step 3
 
-    def simulate(self, stop=float("inf")):
-        """Propagate the mesh until no more events occur or ``stop`` is reached."""
+    def simulate(
+        self,
+        stop=float("inf"),
+        engine=None,
+        maxevents=None,
+        timeout=None,
+        cancel=None,
+    ):
+        """Propagate the mesh until no more events occur or ``stop`` is reached.
+
+        ``engine`` selects the event loop (see :data:`ENGINES`) and defaults to
+        :data:`DEFAULT_ENGINE`.  All engines produce the same ``shocks``, but
+        ``"lattice"`` only handles short uniform arcs and raises
+        ``ValueError`` for other meshes (see :mod:`nozzlesim.lattice`).  The
+        budget arguments are those of :meth:`iterevents`.  Returns the number
+        of events handled.
+        """
+
+        count = 0
+        for _ in self.iterevents(stop, engine, maxevents, timeout, cancel):
+            count += 1
+        return count
+
+    def iterevents(
+        self,
+        stop=float("inf"),
+        engine=None,
+        maxevents=None,
+        timeout=None,
+        cancel=None,
+    ):
+        """Simulate lazily, yielding an :class:`~nozzlesim.engine.Event` per event.
+
+        Iteration ends when no events remain, ``x`` reaches ``stop``, or a
+        budget runs out: ``maxevents`` events handled, ``timeout`` seconds of
+        wall-clock time spent, or the ``cancel`` callable (e.g. the
+        ``is_set`` of a ``threading.Event``) returning true.  Budgets are
+        checked before each event, so the mesh is always left consistent and a
+        later call continues where this one stopped.  Do not modify the mesh
+        while iterating.
+        """
+
+        engine = DEFAULT_ENGINE if engine is None else engine
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        handled = 0
+
+        def proceed():
+            nonlocal handled
+            if maxevents is not None and handled >= maxevents:
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if cancel is not None and cancel():
+                return False
+            handled += 1
+            return True
+
+        if engine == "sweep":
+            sweep = SweepEngine(self)
+            if self.stats is not None and self.stats.active:
+                self.stats.instrument(sweep, ENGINEPHASES, "sweep", restore=False)
+            events = sweep.iterevents(stop, proceed)
+        elif engine == "lattice":
+            events = lattice.iterevents(self, stop, proceed)
+        else:
+            events = self.scanevents(stop, proceed)
+        if self.retain == "all":
+            return events
+        return self.compacting(events)
+
+    def enablestats(self, trace=False):
+        """Start collecting per-phase timings into :attr:`stats` and return it.
+
+        Returns a fresh :class:`~nozzlesim.instrument.SimulationStats`.  Only
+        this mesh is affected, and nothing is measured until this is called.
+        With ``trace`` every timed call is kept for
+        :meth:`~nozzlesim.instrument.SimulationStats.savetrace`.
+        """
+
+        self.disablestats()
+        stats = SimulationStats(trace)
+        process = self.processevent
+
+        def processevent(event):
+            record = process(event)
+            stats.sample(record.x, len(self.activeshocks))
+            return record
+
+        self.processevent = processevent
+        stats.patched.append((self, "processevent"))
+        stats.instrument(self, MESHPHASES, "mesh")
+        self.stats = stats
+        return stats
+
+    def disablestats(self):
+        """Stop collecting timings; :attr:`stats` keeps what was collected."""
+
+        if self.stats is not None:
+            self.stats.restore()
+
+    def compacting(self, events):
+        """Yield from ``events``, compacting the mesh as it grows."""
+
+        for event in events:
+            yield event
+            if len(self.shocks) > 2 * self.retained + COMPACTSLACK:
+                self.compact()
+        self.compact()
+
+    def compact(self):
+        """Drop (and with ``retain="spill"`` log) ended characteristics.
+
+        A characteristic is kept while it is active or while a wall starts
+        where it does, since :meth:`getupstreamvalues` reads the flow state
+        from it.  Walls are always kept.  Does nothing with ``retain="all"``.
+        """
+
+        if self.retain == "all":
+            return
+        active = {id(seg) for seg in self.activeshocks}
+        kept, dropped = [], []
+        for seg in self.shocks:
+            if (
+                isinstance(seg, Wall)
+                or id(seg) in active
+                or seg.end is None
+                or self.index.find(seg.start.x, seg.start.y, Wall)
+            ):
+                kept.append(seg)
+            else:
+                dropped.append(seg)
+        if dropped:
+            arrays = self.store.take(dropped)
+            if self.log is not None:
+                self.log.append(checkpoint.fromarrays(arrays))
+                self.log.flush()
+            stats = self.spillstats
+            stats["count"] += len(dropped)
+            stats["maxv"] = max(
+                stats["maxv"],
+                float(np.max(arrays["v"] + np.abs(arrays["turningangle"]))),
+            )
+            for seg in dropped:
+                self.index.remove(seg)
+            self.shocks = kept
+            self.store.retain(kept)
+        self.retained = len(self.shocks)
+
+    def segmentlog(self):
+        """Return the characteristics spilled so far as a memory-mapped record array.
+
+        Records use :data:`nozzlesim.checkpoint.RECORD`.  Together with
+        :meth:`as_arrays` they describe the whole mesh.
+        """
+
+        if self.log is None:
+            raise ValueError('only meshes created with retain="spill" have a log')
+        self.log.flush()
+        return checkpoint.readsegmentlog(self.log.path)
+
+    def close(self):
+        """Close the segment log of a ``retain="spill"`` mesh.
+
+        :meth:`segmentlog` still reads the log, but the mesh can no longer
+        spill to it.  A mesh is also a context manager that closes on exit.
+        """
+
+        if self.log is not None:
+            self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def scanevents(self, stop, proceed):
+        """Event generator of the ``"scan"`` engine; see :meth:`iterevents`."""
 
         event = self.firstevent(self.activeshocks, self.x)
         lastcheck = self.remainingangle <= 0
 
         while event is not None and self.x < stop:
-            self.handleevent(event)
+            if not proceed():
+                return
+            yield self.processevent(event)
             event = self.firstevent(self.activeshocks, self.x)
             if lastcheck:
                 return
 
+    @staticmethod
+    def projecty(seg, startx):
+        """Return the y value of ``seg`` (extended as a line) just after ``startx``."""
+
+        return (startx + epsilon - seg.start.x) * seg.slope + seg.start.y
+
     @staticmethod
     def sortshocks(shocks, startx):
         """Return *shocks* sorted by their projected y value at ``startx``."""
 
-        def proj_y(seg):
-            slope = m.tan(m.radians(seg.angle))
-            return (startx + epsilon - seg.start.x) * slope + seg.start.y
+        x = startx + epsilon
+        return sorted(
+            shocks,
+            key=lambda seg: (x - seg.start.x) * seg.slope + seg.start.y,
+            reverse=True,
+        )
+
+    def addsegment(self, seg):
+        """Record a newly created shock or wall in ``shocks`` and ``activeshocks``."""
+
+        self.shocks.append(seg)
+        self.activeshocks.append(seg)
+        self.index.add(seg)
+        self.store.append(seg)
+
+    def setend(self, seg, point):
+        """Set the end point of ``seg`` to ``point``."""
+
+        seg.end = point
+        self.store.setend(seg, point)
+
+    def as_arrays(self):
+        """Return the segments in :attr:`shocks` as a dict of NumPy arrays.
+
+        Row ``i`` of every array describes ``shocks[i]``; see
+        :mod:`nozzlesim.store` for the columns.  The arrays are read-only views
+        that stay valid until the next segment is added.
+        """
+
+        return self.store.as_arrays()
+
+    def save_checkpoint(self, path):
+        """Write the full simulation state to ``path``.
+
+        The file format is described in :mod:`nozzlesim.checkpoint`.
+        """
+
+        checkpoint.save(self, path)
 
-        return sorted(shocks, key=proj_y, reverse=True)
+    @classmethod
+    def load_checkpoint(cls, path, mmap=True):
+        """Return the mesh saved to ``path`` by :meth:`save_checkpoint`.
+
+        The segment records are read through a memory map unless ``mmap`` is
+        false.  :meth:`simulate` continues from the saved ``x``.
+        """
+
+        return checkpoint.load(cls, path, mmap)
+
+    def locator(self):
+        """Return a :class:`~nozzlesim.locate.FlowLocator` for the current mesh.
+
+        Use it to look up the flow state at many points at once, e.g.
+        ``mesh.locator().mach(x, y)`` with NumPy arrays ``x`` and ``y``.
+        """
+
+        return FlowLocator(self)
 
     def handled(self, shocks, object1, object2, x, y):
+        """Return ``True`` if a segment in ``shocks`` starts at ``(x, y)``.
+
+        The segment type that the event at ``(x, y)`` would create is the one
+        looked for.  Candidates come from :attr:`index`, so ``shocks`` is only
+        scanned when something starts at that point.
+        """
+
         if isinstance(object1, Shock) and isinstance(object2, Shock):
             cls = Shock
         elif isinstance(object1, Wall) ^ isinstance(object2, Wall):
-            cls = Shock if x <= self.endexpansion else Wall
+            reflects = (
+                x <= self.endexpansion
+                or isinstance(object1, SymmetryPlane)
+                or isinstance(object2, SymmetryPlane)
+            )
+            cls = Shock if reflects else Wall
         else:
             return False
 
-        for seg in shocks:
-            if seg.start.x == x and seg.start.y == y and isinstance(seg, cls):
-                return True
-
-        return False
+        return any(seg in shocks for seg in self.index.find(x, y, cls))
 
     def findpairs(self, shocks, startx):
-        pairs = []
-        sorted_shocks = self.sortshocks(shocks, startx)
+        """Return ``(top, bottom, point)`` for each neighbouring pair that meets.
 
-        for top, bottom in zip(sorted_shocks, sorted_shocks[1:]):
-            interpoint = Shock.findintersection(
-                top.start, bottom.start, top.angle, bottom.angle
-            )
-            if interpoint is None:
-                continue
+        Only pairs accepted by :meth:`checkpair` are returned, top first.  On
+        fronts of :data:`VECTORIZEMIN` segments or more, the sort, the
+        intersections and everything in :meth:`checkpair` except
+        :meth:`handled` are computed for the whole front at once from the
+        cached line coefficients of the segments.
+        """
 
-            checkx1 = interpoint.x - epsilon
-            checkx2 = interpoint.x - epsilon
-            if checkx1 < top.start.x:
-                checkx1 = interpoint.x
-            if checkx2 < bottom.start.x:
-                checkx2 = interpoint.x
+        if len(shocks) < VECTORIZEMIN:
+            pairs = []
+            sorted_shocks = self.sortshocks(shocks, startx)
+            for top, bottom in zip(sorted_shocks, sorted_shocks[1:]):
+                interpoint = Shock.intersect(top, bottom)
+                if interpoint is not None and self.checkpair(
+                    shocks, top, bottom, interpoint, startx
+                ):
+                    pairs.append((top, bottom, interpoint))
+            return pairs
+
+        inf = float("inf")
+        rows = [
+            (
+                seg.start.x,
+                seg.start.y,
+                seg.slope,
+                seg.intercept,
+                inf if seg.end is None else seg.end.x,
+                isinstance(seg, Wall),
+            )
+            for seg in shocks
+        ]
+        lines = np.fromiter(chain.from_iterable(rows), float, 6 * len(rows))
+        sx, sy, slope, intercept, endx, iswall = lines.reshape(-1, 6).T
+
+        # Same key and tie order as ``sortshocks``.
+        projected = (startx + epsilon - sx) * slope + sy
+        order = np.argsort(-projected, kind="stable")
+        top, bottom = order[:-1], order[1:]
+
+        # ``Shock.intersect`` for every neighbouring pair.
+        slope1, slope2 = slope[top], slope[bottom]
+        parallel = np.abs(slope1 - slope2) <= 1e-9 * np.maximum(
+            np.abs(slope1), np.abs(slope2)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = (intercept[bottom] - intercept[top]) / (slope1 - slope2)
+            y = slope1 * x + intercept[top]
 
-            if (
-                interpoint.x >= startx
-                and top.exists(checkx1)
-                and bottom.exists(checkx2)
-                and not self.handled(shocks, top, bottom, interpoint.x, interpoint.y)
-            ):
-                pairs.append((top, bottom, interpoint))
+        # The existence checks of ``checkpair``.
+        candidate = (
+            ~parallel & (x >= startx) & ~((iswall[top] > 0) & (iswall[bottom] > 0))
+        )
+        for seg in (top, bottom):
+            checkx = x - epsilon
+            checkx = np.where(checkx < sx[seg], x, checkx)
+            candidate &= (checkx >= sx[seg]) & (checkx <= endx[seg])
 
+        pairs = []
+        for i in np.flatnonzero(candidate):
+            upper, lower = shocks[top[i]], shocks[bottom[i]]
+            px, py = float(x[i]), float(y[i])
+            if not self.handled(shocks, upper, lower, px, py):
+                pairs.append((upper, lower, Point(px, py)))
         return pairs
 
+    def checkpair(self, shocks, top, bottom, interpoint, startx):
+        """Return ``True`` if neighbours ``top``/``bottom`` meet at an unhandled event."""
+
+        # Consecutive wall segments meet at their shared corner, which is not
+        # an event.  Treating it as one used to hide every later crossing.
+        if isinstance(top, Wall) and isinstance(bottom, Wall):
+            return False
+
+        checkx1 = interpoint.x - epsilon
+        checkx2 = interpoint.x - epsilon
+        if checkx1 < top.start.x:
+            checkx1 = interpoint.x
+        if checkx2 < bottom.start.x:
+            checkx2 = interpoint.x
+
+        return (
+            interpoint.x >= startx
+            and top.exists(checkx1)
+            and bottom.exists(checkx2)
+            and not self.handled(shocks, top, bottom, interpoint.x, interpoint.y)
+        )
+
     def firstintersection(self, shocks, startx):
         pairs = self.findpairs(shocks, startx)
         return min(pairs, key=lambda x: x[2].x) if pairs else None
@@ -171,15 +573,12 @@ class Mesh:
 
         for seg in shocks:
             if isinstance(seg, Wall) and seg.end is not None:
-                shock = None
-                nxt = None
-                for candidate in self.shocks:
-                    if candidate.start.equals(seg.end):
-                        if isinstance(candidate, Shock):
-                            shock = candidate
-                        elif isinstance(candidate, Wall):
-                            nxt = candidate
-                if firstwallend > seg.end.x >= startx and shock is None:
+                shock, nxt = self.wallendlinks(seg)
+                if (
+                    firstwallend > seg.end.x >= startx
+                    and shock is None
+                    and not self.quietcorner(nxt)
+                ):
                     firstwallend = seg.end.x
                     wall = seg
                     nextwall = nxt
@@ -190,6 +589,25 @@ class Mesh:
             return ["intersection", intersection]
         return None
 
+    def wallendlinks(self, wall):
+        """Return the ``(shock, wall)`` starting at the end of ``wall``.
+
+        Either entry is ``None`` when no such segment exists yet.
+        """
+
+        shocks = self.index.find(wall.end.x, wall.end.y, Shock)
+        return (shocks[-1] if shocks else None), self.nextwalls.get(id(wall))
+
+    def quietcorner(self, wall):
+        """Return ``True`` if the corner at the start of ``wall`` emits no wave.
+
+        Only corners lumped into a neighbour's wave by :attr:`waveplan` are
+        quiet.
+        """
+
+        corner = self.waveplan.get(id(wall))
+        return corner is not None and not corner.turns
+
     # four cases:
     # 1. two shocks interfere in mid air
     # 2. shock reflects off wall
@@ -204,33 +622,30 @@ class Mesh:
     def handleintersection(self, object1, object2, x, y):
         if isinstance(object1, Shock) and isinstance(object2, Shock):
             newshocks = Shock.newshocks(object1, object2, x, y)
-            self.shocks += newshocks
-            self.activeshocks += newshocks
+            for newshock in newshocks:
+                self.addsegment(newshock)
             self.activeshocks.remove(object1)
             self.activeshocks.remove(object2)
             intersection = Point(x, y)
-            object1.end = intersection
-            object2.end = intersection
+            self.setend(object1, intersection)
+            self.setend(object2, intersection)
             self.x = x
 
         elif (isinstance(object1, Shock) and isinstance(object2, Wall)) or (
             isinstance(object1, Wall) and isinstance(object2, Shock)
         ):
-            if x < self.endexpansion:
-                shock = object1 if isinstance(object1, Shock) else object2
+            shock = object1 if isinstance(object1, Shock) else object2
+            wall = object2 if shock is object1 else object1
+            if x < self.endexpansion or isinstance(wall, SymmetryPlane):
                 newshock = self.reflectshock(shock, x, y)
                 self.activeshocks.remove(shock)
-                shock.end = newshock.start
-                self.activeshocks.append(newshock)
-                self.shocks.append(newshock)
+                self.setend(shock, newshock.start)
+                self.addsegment(newshock)
             else:
-                shock = object1 if isinstance(object1, Shock) else object2
-                wall = object2 if shock is object1 else object1
                 newwall = self.contract(wall, shock, x, y)
                 self.activeshocks.remove(wall)
                 self.activeshocks.remove(shock)
-                self.shocks.append(newwall)
-                self.activeshocks.append(newwall)
+                self.addsegment(newwall)
             self.x = x
 
         else:
@@ -241,32 +656,45 @@ class Mesh:
 
     def contract(self, wall, shock, x, y):
         point = Point(x, y)
-        wall.end = point
-        shock.end = point
+        self.setend(wall, point)
+        self.setend(shock, point)
         newwall = Wall(point, wall.angle + shock.turningangle)
+        self.nextwalls[id(wall)] = newwall
         self.remainingangle = abs(wall.angle + shock.turningangle)
         return newwall
 
     def handleevent(self, event):
         if event[0] == "wall":
-            newshock = self.genwallshock(event[1][0], event[1][1])
-            self.activeshocks.append(newshock)
-            self.shocks.append(newshock)
+            for newshock in self.wallwaves(event[1][0], event[1][1]):
+                self.addsegment(newshock)
             self.x = event[1][2].x
         elif event[0] == "intersection":
             self.handleintersection(
                 event[1][0], event[1][1], event[1][2].x, event[1][2].y
             )
 
+    def processevent(self, event):
+        """Handle ``event`` and return an :class:`~nozzlesim.engine.Event` for it."""
+
+        objects = tuple(event[1][:2])
+        ends = [seg.end for seg in objects]
+        before = len(self.shocks)
+        self.handleevent(event)
+        point = event[1][2]
+        ended = tuple(seg for seg, end in zip(objects, ends) if seg.end is not end)
+        return Event(
+            event[0], point.x, point.y, objects, tuple(self.shocks[before:]), ended
+        )
+
     def getupstreamvalues(self, wallseg):
-        """Return ``[v, theta, gamma]`` upstream of ``wallseg``."""
+        """Return ``[v, theta, gamma, mach, mu]`` upstream of ``wallseg``."""
 
         start = wallseg.start
         if start.x == 0:
-            return [h.calcv(self.gamma, 1, self.initialmach), 0, self.gamma]
+            return list(self.inflow)
 
-        for x in self.shocks:
-            if x.start == start and x != wallseg:
+        for x in self.index.find(start.x, start.y):
+            if x is not wallseg:
                 return x.getdownstreamvals()
 
     def genwallshock(self, wall1, wall2):
@@ -274,7 +702,39 @@ class Mesh:
 
         params = self.getupstreamvalues(wall1)
         turningangle = wall2.angle - wall1.angle
-        return Shock(wall2.start, turningangle, params[2], params[0], params[1])
+        return Shock(
+            wall2.start,
+            turningangle,
+            params[2],
+            params[0],
+            params[1],
+            upstream=params[3:],
+        )
+
+    def wallwaves(self, wall1, wall2):
+        """Return the waves emitted by the turn from ``wall1`` to ``wall2``.
+
+        That is one :meth:`genwallshock` unless :attr:`waveplan` lumps or
+        refines the corner.
+        """
+
+        corner = self.waveplan.get(id(wall2))
+        if corner is None:
+            return [self.genwallshock(wall1, wall2)]
+        if corner.fromfan:
+            start = corner.source.start
+            fan = self.index.find(start.x, start.y, Shock)
+            params = fan[-1].getdownstreamvals()
+        else:
+            params = self.getupstreamvalues(corner.source)
+        waves = []
+        for turn in corner.turns:
+            wave = Shock(
+                wall2.start, turn, params[2], params[0], params[1], upstream=params[3:]
+            )
+            waves.append(wave)
+            params = wave.getdownstreamvals()
+        return waves
 
     @staticmethod
     def reflectshock(shock, x, y):
@@ -287,15 +747,18 @@ class Mesh:
             bottomregion[2],
             bottomregion[1],
             bottomregion[0],
+            upstream=bottomregion[3:],
         )
         return bottomshock
 
     def drawallshocks(self, screen, displaybounds, screenx, screeny, justwalls=False):
-        """Draw all shocks and walls to a ``pygame`` ``screen``."""
+        """Draw all shocks and walls to a ``pygame`` ``screen``.
 
-        for seg in self.shocks:
-            if isinstance(seg, Wall) or not justwalls:
-                drawshock(screen, displaybounds, seg, screenx, screeny)
+        Other backends are available through :mod:`nozzlesim.render`.
+        """
+
+        renderer = PygameRenderer(screen, displaybounds, screenx, screeny)
+        renderer.drawmesh(self, justwalls)
 
     def printallshocks(self):
         for x in self.shocks:
@@ -319,77 +782,91 @@ class Mesh:
         return "\n".join(lines)
 
     def calcarearatio(self):
-        """Return the square of the vertical distance between top and bottom walls."""
+        """Return the square of the vertical distance between top and bottom walls.
+
+        A half mesh measures twice the distance from its symmetry plane.
+        """
 
         maxy = -float("inf")
         miny = float("inf")
+        axis = None
         for seg in self.shocks:
-            if isinstance(seg, Wall):
+            if isinstance(seg, SymmetryPlane):
+                axis = seg
+            elif isinstance(seg, Wall):
                 if seg.start.y > maxy:
                     maxy = seg.start.y
                 if seg.start.y < miny:
                     miny = seg.start.y
-        diff = maxy - miny
+        diff = maxy - miny if axis is None else 2 * abs(maxy - axis.start.y)
         return diff**2
 
+    def mirror(self, spillpath=None):
+        """Return the full mesh of a half mesh simulated against a :class:`SymmetryPlane`.
+
+        Every segment is copied together with its reflection about the plane;
+        the plane itself is dropped.  The new mesh continues from the same
+        ``x`` if simulated further, with the same ``mergeturn``, ``maxturn``
+        and ``retain``.  A ``retain="spill"`` mesh needs a new ``spillpath``
+        for the log of the mirrored mesh.
+        """
+
+        planes = [seg for seg in self.shocks if isinstance(seg, SymmetryPlane)]
+        if not planes:
+            raise ValueError("mesh has no symmetry plane to mirror about")
+        axisy = planes[0].start.y
+
+        def reflect(point):
+            return None if point is None else Point(point.x, 2 * axisy - point.y)
+
+        def image(seg):
+            if isinstance(seg, Wall):
+                return Wall(reflect(seg.start), -seg.angle, reflect(seg.end))
+            new = Shock(
+                reflect(seg.start),
+                -seg.turningangle,
+                seg.gamma,
+                seg.v,
+                -seg.theta,
+                reflect(seg.end),
+                upstream=(seg.mach, seg.mu),
+                downstream=(seg.downstreammach, seg.downstreammu),
+            )
+            new.angle = -seg.angle
+            return new
+
+        copies = {}
+        for seg in self.shocks:
+            if not isinstance(seg, SymmetryPlane):
+                copies[id(seg)] = (copy(seg), image(seg))
+        walls = [c for w in self.wallsegments if id(w) in copies for c in copies[id(w)]]
+        shocks = [c for pair in copies.values() for c in pair]
+        mesh = Mesh(
+            self.gamma,
+            self.initialmach,
+            walls,
+            shocks,
+            self.endexpansion,
+            self.remainingangle,
+            self.x,
+            self.index.tolerance,
+            retain=self.retain,
+            spillpath=spillpath,
+            mergeturn=self.mergeturn,
+            maxturn=self.maxturn,
+        )
+        mesh.activeshocks = [
+            c for seg in self.activeshocks if id(seg) in copies for c in copies[id(seg)]
+        ]
+        return mesh
+
+    def contour(self):
+        """Return the current upper and lower walls as a :class:`Contour`."""
+
+        return Contour.frommesh(self)
+
     def getxytable(self, startx, numpoints, deltax):
-        """Return a list of ``(x, y)`` wall positions."""
-
-        table = []
-        for i in range(numpoints):
-            maxy = -float("inf")
-            for seg in self.shocks:
-                if isinstance(seg, Wall):
-                    ypos = seg.getyposition(startx + deltax * i)
-                    if ypos > maxy:
-                        maxy = ypos
-            table.append((startx + deltax * i, maxy))
-        return table
-
-
-def convertpoint(displaybounds, pointx, pointy, screenx, screeny):
-    """Convert physical ``(pointx, pointy)`` to screen coordinates."""
-
-    # In pygame (0, 0) is the top left. In nozzle coordinates (minx, miny) is
-    # the bottom left.  This helper converts between the two.
-    deltax = pointx - displaybounds[0][0]
-    xrange = displaybounds[1][0] - displaybounds[0][0]
-    propdiffx = deltax / xrange
-    newx = propdiffx * screenx
-
-    deltay = pointy - displaybounds[0][1]
-    yrange = displaybounds[1][1] - displaybounds[0][1]
-    propdiffy = deltay / yrange
-    newy = screeny - propdiffy * screeny
-
-    return newx, newy
-
-
-def drawline(screen, displaybounds, start, angle, endx, screenx, screeny):
-    """Draw a line segment representing a shock or wall."""
-
-    endx = min(displaybounds[1][0], endx)
-    slope = m.tan(m.radians(angle))
-    deltax = endx - start.x
-    endy = start.y + deltax * slope
-    end = None
-    if endy > displaybounds[1][1]:
-        end = Shock.findintersection(Point(0, displaybounds[1][1]), start, 0, angle)
-    elif endy < displaybounds[0][1]:
-        end = Shock.findintersection(Point(0, displaybounds[0][1]), start, 0, angle)
-    if end is None:
-        end = Point(endx, endy)
-
-    screenstart = convertpoint(displaybounds, start.x, start.y, screenx, screeny)
-    screenend = convertpoint(displaybounds, end.x, end.y, screenx, screeny)
-    if 0 < screenstart[0] < screenx and 0 < screenstart[1] < screeny:
-        pygame.draw.line(screen, (0, 0, 0), screenstart, screenend)
-        pygame.display.update()
-
-
-def drawshock(screen, displaybounds, shock, screenx, screeny):
-    """Draw ``shock`` to ``screen`` within ``displaybounds``."""
-
-    end = displaybounds[1][0] + 1 if shock.end is None else shock.end.x
-    angle = shock.propangle()
-    drawline(screen, displaybounds, shock.start, angle, end, screenx, screeny)
+        """Return a list of ``(x, y)`` upper wall positions."""
+
+        table = self.contour().table(startx, numpoints, deltax)
+        return [tuple(row) for row in table.tolist()]
@@ -0,0 +1,152 @@
+"""Tabulated inverse of the Prandtl-Meyer function.
+
+:func:`nozzlesim.helperfuncs.calcmach` used to bisect on
+:func:`~nozzlesim.helperfuncs.calcv` for every call.  A :class:`PMTable`
+replaces that with a piecewise cubic Hermite interpolant built once per
+``gamma``.
+
+The table is built in the variable ``t = (v / vmax) ** (1 / 3)`` and stores
+``y = beta * (1 - t**3)`` with ``beta = sqrt(M**2 - 1)``.  Near the sonic
+point ``v`` grows like ``beta**3``, and near ``vmax`` ``beta`` grows like
+``1 / (vmax - v)``.  The substitution absorbs both, so ``y`` is smooth on the
+whole closed interval ``0 <= t <= 1``.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from . import kernels
+
+# Relative Mach number error the tables are built for by default.
+DEFAULT_TOLERANCE = 1e-10
+# Below this, rounding in the table itself dominates; polish instead.
+MIN_TOLERANCE = 1e-11
+
+_settings = {"tolerance": DEFAULT_TOLERANCE, "polish": False}
+_tables: dict[float, "PMTable"] = {}
+
+
+class PMTable:
+    """Piecewise cubic Hermite table of the inverse Prandtl-Meyer function.
+
+    The number of intervals starts at 16 and doubles until the interpolation
+    error, checked against :func:`nozzlesim.kernels.calcmach` at three interior
+    points of every interval, is at most ``tolerance`` relative.  The error
+    actually reached is kept in :attr:`maxerror`.  With ``polish`` set, every
+    lookup adds one Newton step on the exact function, which roughly squares
+    the error.
+    """
+
+    def __init__(
+        self, gamma: float, tolerance: float = DEFAULT_TOLERANCE, polish: bool = False
+    ) -> None:
+        if not tolerance >= MIN_TOLERANCE:
+            raise ValueError(
+                f"tolerance must be at least {MIN_TOLERANCE}; use polish=True "
+                "for tighter results"
+            )
+        self.gamma = gamma
+        self.tolerance = tolerance
+        self.polish = polish
+        self.k = math.sqrt((gamma + 1) / (gamma - 1))
+        self.numax = math.pi / 2 * (self.k - 1)
+        self.vmax = math.degrees(self.numax)
+
+        size = 16
+        while True:
+            self.build(size)
+            self.maxerror = self.checkerror()
+            if self.maxerror <= tolerance:
+                break
+            size *= 2
+
+    def build(self, size: int) -> None:
+        """Tabulate ``y`` and ``dy/dt`` at ``size + 1`` evenly spaced ``t``."""
+
+        k, numax = self.k, self.numax
+        t = np.linspace(0.0, 1.0, size + 1)[:-1]
+        s = t**3
+        beta = np.sqrt(kernels.calcmach(self.gamma, np.degrees(s * numax)) ** 2 - 1)
+        slope = 1 / (1 + (beta / k) ** 2) - 1 / (1 + beta**2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dy = 3 * t**2 * (numax * (1 - s) / slope - beta)
+        # Endpoint limits: beta ~ (3 * nu / (1 - 1/k**2)) ** (1/3) at t = 0 and
+        # nu ~ numax - (k**2 - 1) / beta + O(beta**-3) at t = 1.
+        dy[0] = (3 * numax / (1 - 1 / k**2)) ** (1 / 3)
+
+        self.size = size
+        self.y = (beta * (1 - s)).tolist() + [(k**2 - 1) / numax]
+        self.dy = dy.tolist() + [0.0]
+
+    def checkerror(self) -> float:
+        """Return the largest relative Mach error at the check points."""
+
+        offsets = np.array([[0.25], [0.5], [0.75]])
+        t = ((np.arange(self.size) + offsets) / self.size).ravel()
+        angles = np.degrees(t**3 * self.numax)
+        exact = kernels.calcmach(self.gamma, angles)
+        table = np.array([self.lookup(v) for v in angles])
+        return float(np.max(np.abs(table / exact - 1)))
+
+    def lookup(self, v: float) -> float:
+        """Return the Mach number interpolated from the table for ``v`` in degrees."""
+
+        s = math.radians(v) / self.numax
+        x = s ** (1 / 3) * self.size
+        i = min(int(x), self.size - 1)
+        u = x - i
+        u2 = u * u
+        u3 = u2 * u
+        h = 1 / self.size
+        y = (
+            (2 * u3 - 3 * u2 + 1) * self.y[i]
+            + (u3 - 2 * u2 + u) * h * self.dy[i]
+            + (3 * u2 - 2 * u3) * self.y[i + 1]
+            + (u3 - u2) * h * self.dy[i + 1]
+        )
+        return math.sqrt((y / (1 - s)) ** 2 + 1)
+
+    def mach(self, v: float) -> float:
+        """Return the Mach number with Prandtl-Meyer angle ``v`` in degrees.
+
+        ``v`` must lie in ``[0, vmax)``.
+        """
+
+        mach = self.lookup(v)
+        if self.polish and mach > 1:
+            k = self.k
+            beta = math.sqrt(mach * mach - 1)
+            nu = k * math.atan(beta / k) - math.atan(beta)
+            slope = 1 / (1 + (beta / k) ** 2) - 1 / (1 + beta * beta)
+            beta -= (nu - math.radians(v)) / slope
+            mach = math.sqrt(beta * beta + 1)
+        return mach
+
+    __call__ = mach
+
+
+def gettable(gamma: float) -> PMTable:
+    """Return the table for ``gamma``, building it on first use."""
+
+    table = _tables.get(gamma)
+    if table is None:
+        table = _tables[gamma] = PMTable(gamma, **_settings)
+    return table
+
+
+def configure(tolerance: float = None, polish: bool = None) -> None:
+    """Change the settings used for tables built from now on.
+
+    Existing tables are discarded so the next lookup rebuilds them.
+    """
+
+    if tolerance is not None:
+        if not tolerance >= MIN_TOLERANCE:
+            raise ValueError(f"tolerance must be at least {MIN_TOLERANCE}")
+        _settings["tolerance"] = tolerance
+    if polish is not None:
+        _settings["polish"] = polish
+    _tables.clear()
@@ -8,6 +8,8 @@ from dataclasses import dataclass
 class Point:
     """Simple container for a two dimensional point."""
 
+    __slots__ = ("x", "y")
+
     x: float
     y: float
 
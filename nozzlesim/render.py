@@ -0,0 +1,429 @@
+"""Drawing of meshes, kept apart from the solver.
+
+Nothing here imports :mod:`pygame` until something is drawn with it, so
+``import nozzlesim`` works (and starts quickly) on machines that never render.
+
+A :class:`Renderer` turns segments into clipped straight lines in screen
+coordinates and hands them to its backend:
+
+``"pygame"``
+    :class:`PygameRenderer` draws onto a pygame surface.
+``"svg"``
+    :class:`SVGRenderer` collects the lines in NumPy arrays and writes them out
+    as an SVG document.  It needs only NumPy.
+``"image"``
+    :class:`ImageRenderer` rasterizes into an RGB NumPy array and writes PNG
+    files.  It needs only NumPy and the standard library.
+
+:meth:`Renderer.drawmesh` clips all segments of a mesh in one vectorized pass
+(:func:`cliplines`) and hands the lines to the backend as a batch, so no
+display is needed and nothing is flipped per line.  :func:`savemesh` writes a
+mesh straight to a ``.png`` or ``.svg`` file.  Further backends can be added
+with :func:`register`.  The module level
+:func:`drawshock`, :func:`drawline` and :func:`convertpoint` helpers keep the
+original pygame interface.
+"""
+
+from __future__ import annotations
+
+import abc
+import math as m
+import struct
+import zlib
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from .point import Point
+from .shock import Shock
+from .store import WALL
+from .wall import Wall
+
+Color = tuple[int, int, int]
+BLACK: Color = (0, 0, 0)
+
+_pygame = None
+
+
+def importpygame():
+    """Import and return :mod:`pygame` on first use."""
+
+    global _pygame
+    if _pygame is None:
+        import pygame
+
+        _pygame = pygame
+    return _pygame
+
+
+def convertpoint(displaybounds, pointx, pointy, screenx, screeny):
+    """Convert physical ``(pointx, pointy)`` to screen coordinates."""
+
+    # In pygame (0, 0) is the top left. In nozzle coordinates (minx, miny) is
+    # the bottom left.  This helper converts between the two.
+    deltax = pointx - displaybounds[0][0]
+    xrange = displaybounds[1][0] - displaybounds[0][0]
+    propdiffx = deltax / xrange
+    newx = propdiffx * screenx
+
+    deltay = pointy - displaybounds[0][1]
+    yrange = displaybounds[1][1] - displaybounds[0][1]
+    propdiffy = deltay / yrange
+    newy = screeny - propdiffy * screeny
+
+    return newx, newy
+
+
+def cliplineend(displaybounds, start, angle, endx):
+    """Return where a line from ``start`` at ``angle`` leaves the display.
+
+    The line runs to ``endx`` (capped at the right edge of ``displaybounds``)
+    unless it crosses the top or bottom edge first.
+    """
+
+    endx = min(displaybounds[1][0], endx)
+    slope = m.tan(m.radians(angle))
+    deltax = endx - start.x
+    endy = start.y + deltax * slope
+    end = None
+    if endy > displaybounds[1][1]:
+        end = Shock.findintersection(Point(0, displaybounds[1][1]), start, 0, angle)
+    elif endy < displaybounds[0][1]:
+        end = Shock.findintersection(Point(0, displaybounds[0][1]), start, 0, angle)
+    if end is None:
+        end = Point(endx, endy)
+    return end
+
+
+def segmentend(displaybounds, seg) -> float:
+    """Return the ``x`` at which ``seg`` should stop being drawn."""
+
+    return displaybounds[1][0] + 1 if seg.end is None else seg.end.x
+
+
+def cliplines(
+    arrays: dict,
+    displaybounds: Sequence,
+    width: int,
+    height: int,
+    justwalls: bool = False,
+) -> np.ndarray:
+    """Return the visible segments of ``arrays`` as screen-space lines.
+
+    ``arrays`` holds the columns of :meth:`Mesh.as_arrays`.  The result is an
+    ``(n, 4)`` array of ``x1 y1 x2 y2`` rows, in segment order, computed with
+    the same clipping as :func:`cliplineend` and the per-line drawing path.
+    """
+
+    (left, bottom), (right, top) = displaybounds
+    startx, starty = arrays["startx"], arrays["starty"]
+    slope = np.tan(np.radians(arrays["angle"]))
+    endx = np.where(np.isnan(arrays["endx"]), right + 1, arrays["endx"])
+    endx = np.minimum(right, endx)
+    endy = starty + (endx - startx) * slope
+
+    # Lines leaving through the top or bottom edge stop there.  A horizontal
+    # line cannot cross an edge, matching ``Shock.findintersection``.
+    intercept = starty - slope * startx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for edge, crossed in ((top, endy > top), (bottom, endy < bottom)):
+            crossed &= slope != 0
+            endx = np.where(crossed, (edge - intercept) / slope, endx)
+            endy = np.where(crossed, edge, endy)
+
+    x1, y1 = convertpoint(displaybounds, startx, starty, width, height)
+    x2, y2 = convertpoint(displaybounds, endx, endy, width, height)
+    visible = (0 < x1) & (x1 < width) & (0 < y1) & (y1 < height)
+    if justwalls:
+        visible &= arrays["kind"] == WALL
+    return np.stack([x1, y1, x2, y2], axis=1)[visible]
+
+
+def rasterize(image: np.ndarray, lines: np.ndarray, color: Color = BLACK) -> np.ndarray:
+    """Draw one-pixel ``lines`` (rows of ``x1 y1 x2 y2``) into ``image``.
+
+    Every line is sampled once per pixel along its longer axis and all samples
+    are written in one indexing operation.  ``image`` is modified in place and
+    returned.
+    """
+
+    lines = np.asarray(lines, dtype=float).reshape(-1, 4)
+    if not len(lines):
+        return image
+    x1, y1, x2, y2 = lines.T
+    steps = np.ceil(np.maximum(np.abs(x2 - x1), np.abs(y2 - y1))).astype(np.int64)
+    counts = steps + 1
+    owner = np.repeat(np.arange(len(lines)), counts)
+    first = np.cumsum(counts) - counts
+    t = (np.arange(counts.sum()) - first[owner]) / np.maximum(steps, 1)[owner]
+    x = np.floor(x1[owner] + t * (x2 - x1)[owner]).astype(np.int64)
+    y = np.floor(y1[owner] + t * (y2 - y1)[owner]).astype(np.int64)
+    height, width = image.shape[:2]
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    image[y[inside], x[inside]] = color
+    return image
+
+
+def encodepng(image: np.ndarray) -> bytes:
+    """Return the RGB ``uint8`` ``image`` of shape ``(h, w, 3)`` as PNG data."""
+
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 0  # no filter
+    rows[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class Renderer(abc.ABC):
+    """Base class of the rendering backends.
+
+    Subclasses implement :meth:`line`, which receives screen coordinates, and
+    may override :meth:`finish`, called after a whole mesh has been drawn.
+    A subclass without :meth:`line` cannot be instantiated.
+    """
+
+    def __init__(self, displaybounds: Sequence, width: int, height: int) -> None:
+        self.displaybounds = displaybounds
+        self.width = width
+        self.height = height
+
+    @abc.abstractmethod
+    def line(self, start: tuple, end: tuple, color: Color) -> None:
+        """Draw one line between screen points ``start`` and ``end``."""
+
+    def drawlines(self, lines: np.ndarray, color: Color = BLACK) -> None:
+        """Draw screen-space ``lines`` given as rows of ``x1 y1 x2 y2``.
+
+        Backends that can draw a whole batch at once override this.
+        """
+
+        for x1, y1, x2, y2 in np.asarray(lines).tolist():
+            self.line((x1, y1), (x2, y2), color)
+
+    def finish(self) -> None:
+        """Flush anything buffered by the backend."""
+
+    def drawline(
+        self, start: Point, angle: float, endx: float, color: Color = BLACK
+    ) -> bool:
+        """Draw the clipped line starting at ``start`` with ``angle``.
+
+        Returns ``False`` if the line starts off screen and was skipped.
+        """
+
+        bounds = self.displaybounds
+        end = cliplineend(bounds, start, angle, endx)
+        screenstart = convertpoint(bounds, start.x, start.y, self.width, self.height)
+        screenend = convertpoint(bounds, end.x, end.y, self.width, self.height)
+        # Lines starting off screen are skipped, as they always have been.
+        if 0 < screenstart[0] < self.width and 0 < screenstart[1] < self.height:
+            self.line(screenstart, screenend, color)
+            return True
+        return False
+
+    def drawsegment(self, seg, color: Color = BLACK) -> None:
+        """Draw a single shock or wall."""
+
+        end = segmentend(self.displaybounds, seg)
+        self.drawline(seg.start, seg.propangle(), end, color)
+
+    def drawsegments(
+        self, segments: Iterable, justwalls: bool = False, color: Color = BLACK
+    ) -> None:
+        """Draw ``segments`` (only the walls with ``justwalls``) and finish."""
+
+        for seg in segments:
+            if isinstance(seg, Wall) or not justwalls:
+                self.drawsegment(seg, color)
+        self.finish()
+
+    def drawmesh(self, mesh, justwalls: bool = False, color: Color = BLACK) -> None:
+        """Draw every segment of ``mesh`` in one batch and finish."""
+
+        lines = cliplines(
+            mesh.as_arrays(), self.displaybounds, self.width, self.height, justwalls
+        )
+        self.drawlines(lines, color)
+        self.finish()
+
+
+class PygameRenderer(Renderer):
+    """Draw onto a pygame surface, updating the display once per mesh.
+
+    ``screen`` may also be an offscreen ``pygame.Surface``, in which case no
+    display is touched; :meth:`save` writes it to an image file.
+    """
+
+    def __init__(
+        self,
+        screen,
+        displaybounds: Sequence,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> None:
+        self.pygame = importpygame()
+        if width is None or height is None:
+            width, height = screen.get_size()
+        super().__init__(displaybounds, width, height)
+        self.screen = screen
+
+    def line(self, start: tuple, end: tuple, color: Color) -> None:
+        self.pygame.draw.line(self.screen, color, start, end)
+
+    def finish(self) -> None:
+        display = self.pygame.display
+        if display.get_init() and self.screen is display.get_surface():
+            display.update()
+
+    def save(self, path: str) -> None:
+        """Write the surface to ``path`` in a format chosen by its extension."""
+
+        self.pygame.image.save(self.screen, path)
+
+
+class SVGRenderer(Renderer):
+    """Collect lines in NumPy arrays and serialize them as SVG."""
+
+    def __init__(self, displaybounds: Sequence, width: int, height: int) -> None:
+        super().__init__(displaybounds, width, height)
+        self.lines: list[tuple[float, float, float, float]] = []
+        self.colors: list[Color] = []
+
+    def line(self, start: tuple, end: tuple, color: Color) -> None:
+        self.lines.append((start[0], start[1], end[0], end[1]))
+        self.colors.append(color)
+
+    def drawlines(self, lines: np.ndarray, color: Color = BLACK) -> None:
+        rows = [tuple(row) for row in np.asarray(lines).tolist()]
+        self.lines.extend(rows)
+        self.colors.extend([color] * len(rows))
+
+    def asarray(self) -> np.ndarray:
+        """Return the lines drawn so far as an ``(n, 4)`` array of ``x1 y1 x2 y2``."""
+
+        return np.array(self.lines, dtype=float).reshape(-1, 4)
+
+    def tosvg(self) -> str:
+        """Return the drawing as an SVG document."""
+
+        parts = [
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}">',
+            f'<rect width="{self.width}" height="{self.height}" fill="white"/>',
+        ]
+        coords = np.round(self.asarray(), 3)
+        for (x1, y1, x2, y2), (r, g, b) in zip(coords.tolist(), self.colors):
+            parts.append(
+                f'<line x1="{x1:g}" y1="{y1:g}" x2="{x2:g}" y2="{y2:g}" '
+                f'stroke="rgb({r},{g},{b})" stroke-width="1"/>'
+            )
+        parts.append("</svg>")
+        return "\n".join(parts) + "\n"
+
+    def save(self, path: str) -> None:
+        """Write the SVG document to ``path``."""
+
+        with open(path, "w") as f:
+            f.write(self.tosvg())
+
+
+class ImageRenderer(Renderer):
+    """Rasterize into an RGB NumPy array and write PNG files."""
+
+    def __init__(
+        self,
+        displaybounds: Sequence,
+        width: int,
+        height: int,
+        background: Color = (255, 255, 255),
+    ) -> None:
+        super().__init__(displaybounds, width, height)
+        self.image = np.empty((height, width, 3), dtype=np.uint8)
+        self.image[:] = background
+
+    def line(self, start: tuple, end: tuple, color: Color) -> None:
+        rasterize(self.image, [start + end], color)
+
+    def drawlines(self, lines: np.ndarray, color: Color = BLACK) -> None:
+        rasterize(self.image, lines, color)
+
+    def save(self, path: str) -> None:
+        """Write the image to ``path`` as PNG."""
+
+        with open(path, "wb") as f:
+            f.write(encodepng(self.image))
+
+
+RENDERERS = {"pygame": PygameRenderer, "svg": SVGRenderer, "image": ImageRenderer}
+
+# File extensions :func:`savemesh` understands and the backend used for each.
+FORMATS = {".svg": "svg", ".png": "image"}
+
+
+def register(name: str, cls: type) -> None:
+    """Make the :class:`Renderer` subclass ``cls`` available as ``name``."""
+
+    RENDERERS[name] = cls
+
+
+def getrenderer(name: str, *args, **kwargs) -> Renderer:
+    """Create the renderer registered as ``name`` with the given arguments."""
+
+    try:
+        cls = RENDERERS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown renderer {name!r}, expected one of {tuple(RENDERERS)}"
+        ) from None
+    return cls(*args, **kwargs)
+
+
+def savemesh(
+    mesh,
+    path: str,
+    displaybounds: Sequence,
+    width: int,
+    height: int,
+    justwalls: bool = False,
+) -> None:
+    """Render ``mesh`` offscreen to ``path``, a ``.png`` or ``.svg`` file."""
+
+    ext = path[path.rfind(".") :].lower() if "." in path else ""
+    try:
+        name = FORMATS[ext]
+    except KeyError:
+        raise ValueError(
+            f"cannot render to {path!r}, expected one of {tuple(FORMATS)}"
+        ) from None
+    renderer = getrenderer(name, displaybounds, width, height)
+    renderer.drawmesh(mesh, justwalls)
+    renderer.save(path)
+
+
+def drawline(screen, displaybounds, start, angle, endx, screenx, screeny):
+    """Draw a line segment representing a shock or wall."""
+
+    renderer = PygameRenderer(screen, displaybounds, screenx, screeny)
+    if renderer.drawline(start, angle, endx):
+        renderer.finish()
+
+
+def drawshock(screen, displaybounds, shock, screenx, screeny):
+    """Draw ``shock`` to ``screen`` within ``displaybounds``."""
+
+    end = segmentend(displaybounds, shock)
+    angle = shock.propangle()
+    drawline(screen, displaybounds, shock.start, angle, end, screenx, screeny)
@@ -10,7 +10,32 @@ from .point import Point
 
 
 class Shock:
-    """Representation of a single characteristic line."""
+    """Representation of a single characteristic line.
+
+    Besides ``v``, ``theta`` and ``gamma`` upstream, a shock carries the Mach
+    number and Mach angle (degrees) of the regions on both sides: ``mach`` and
+    ``mu`` upstream, ``downstreammach`` and ``downstreammu`` downstream.  New
+    shocks take them from the shocks they continue, so only a region that did
+    not exist before costs an inverse Prandtl-Meyer evaluation.  The
+    ``upstream`` and ``downstream`` arguments pass them in as ``(mach, mu)``;
+    missing ones come from :func:`~nozzlesim.helperfuncs.machstate`.
+    """
+
+    __slots__ = (
+        "start",
+        "turningangle",
+        "v",
+        "theta",
+        "gamma",
+        "mach",
+        "mu",
+        "downstreammach",
+        "downstreammu",
+        "end",
+        "_angle",
+        "slope",
+        "intercept",
+    )
 
     def __init__(
         self,
@@ -20,19 +45,43 @@ class Shock:
         upstreamv: float,
         upstreamtheta: float,
         end: Optional[Point] = None,
+        upstream: Sequence[float] = (),
+        downstream: Sequence[float] = (),
     ) -> None:
         self.start = start if isinstance(start, Point) else Point(start[0], start[1])
         self.turningangle = turningangle
         self.v = upstreamv
         self.theta = upstreamtheta
         self.gamma = gamma
+        if not upstream:
+            upstream = h.machstate(gamma, upstreamv)
+        if not downstream:
+            downstream = h.machstate(gamma, upstreamv + abs(turningangle))
+        self.mach, self.mu = upstream
+        self.downstreammach, self.downstreammu = downstream
         self.end = end
         self.angle = self.propangle()
 
+    @property
+    def angle(self) -> float:
+        """Propagation angle in degrees.
+
+        Setting it also updates ``slope`` and ``intercept``, the coefficients
+        of the line ``y = slope * x + intercept`` through ``start``.
+        """
+
+        return self._angle
+
+    @angle.setter
+    def angle(self, value: float) -> None:
+        self._angle = value
+        self.slope = math.tan(math.radians(value))
+        self.intercept = self.start.y - self.slope * self.start.x
+
     def propangle(self) -> float:
         """Return propagation angle of this characteristic."""
 
-        return h.shockprop(self.gamma, self.v, self.theta, self.turningangle)
+        return h.propangle(self.theta, self.turningangle, self.mu, self.downstreammu)
 
     @staticmethod
     def findintersection(
@@ -50,6 +99,21 @@ class Shock:
         y = slope1 * x + b1
         return Point(x, y)
 
+    @staticmethod
+    def intersect(seg1, seg2) -> Optional[Point]:
+        """Return the intersection of the lines of two shocks or walls.
+
+        Same result as :meth:`findintersection`, from the cached ``slope`` and
+        ``intercept`` instead of the angles.
+        """
+
+        slope1, slope2 = seg1.slope, seg2.slope
+        if math.isclose(slope1, slope2):
+            return None
+        x = (seg2.intercept - seg1.intercept) / (slope1 - slope2)
+        y = slope1 * x + seg1.intercept
+        return Point(x, y)
+
     def findshockintersection(self, shock2: "Shock") -> Optional[Point]:
         """Intersect this shock with ``shock2``."""
 
@@ -58,17 +122,19 @@ class Shock:
         return self.findintersection(self.start, shock2.start, angle1, angle2)
 
     def getupstreamvals(self) -> list[float]:
-        """Return ``[v, theta, gamma]`` upstream of the wave."""
+        """Return ``[v, theta, gamma, mach, mu]`` upstream of the wave."""
 
-        return [self.v, self.theta, self.gamma]
+        return [self.v, self.theta, self.gamma, self.mach, self.mu]
 
     def getdownstreamvals(self) -> list[float]:
-        """Return ``[v, theta, gamma]`` downstream of the wave."""
+        """Return ``[v, theta, gamma, mach, mu]`` downstream of the wave."""
 
         return [
             self.v + abs(self.turningangle),
             self.theta + self.turningangle,
             self.gamma,
+            self.downstreammach,
+            self.downstreammu,
         ]
 
     def exists(self, x: float) -> bool:
@@ -84,12 +150,20 @@ class Shock:
     def calcregionparams(
         theta: float, v: float, gamma: float, shock: "Shock"
     ) -> list[float]:
-        """Return flow parameters in the region downstream of ``shock``."""
+        """Return ``[theta, v, gamma, mach, mu]`` downstream of ``shock``.
+
+        ``mach`` and ``mu`` are those carried by ``shock`` when ``v`` and
+        ``gamma`` are its own.
+        """
 
         newgamma = gamma
         newtheta = theta + shock.turningangle
         newv = v + abs(shock.turningangle)
-        return [newtheta, newv, newgamma]
+        if v == shock.v and gamma == shock.gamma:
+            state = (shock.downstreammach, shock.downstreammu)
+        else:
+            state = h.machstate(newgamma, newv)
+        return [newtheta, newv, newgamma, *state]
 
     @staticmethod
     def newshocks(
@@ -105,14 +179,30 @@ class Shock:
         )
         startpoint = Point(x, y)
         topshock = Shock(
-            startpoint, shock2.turningangle, topregion[2], topregion[1], topregion[0]
+            startpoint,
+            shock2.turningangle,
+            topregion[2],
+            topregion[1],
+            topregion[0],
+            upstream=topregion[3:],
         )
+        # Both new shocks lead into the region past the crossing; their sums
+        # for its ``v`` only differ by rounding.
+        downstream = ()
+        if bottomregion[2] == topregion[2] and math.isclose(
+            bottomregion[1] + abs(shock1.turningangle),
+            topregion[1] + abs(shock2.turningangle),
+            rel_tol=1e-12,
+        ):
+            downstream = (topshock.downstreammach, topshock.downstreammu)
         bottomshock = Shock(
             startpoint,
             shock1.turningangle,
             bottomregion[2],
             bottomregion[1],
             bottomregion[0],
+            upstream=bottomregion[3:],
+            downstream=downstream,
         )
         return [topshock, bottomshock]
 
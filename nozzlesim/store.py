@@ -0,0 +1,147 @@
+"""Struct-of-arrays record of the segments in a :class:`~nozzlesim.mesh.Mesh`.
+
+The store is an export cache: it mirrors the :class:`~nozzlesim.shock.Shock`
+and :class:`~nozzlesim.wall.Wall` objects, which the engines keep using, so it
+adds to the memory of a mesh rather than replacing the objects.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Optional
+
+import numpy as np
+
+from .point import Point
+from .wall import Wall
+
+# Values of the ``kind`` column.
+SHOCK = 0
+WALL = 1
+
+# Column names and dtypes, in the order :meth:`CharacteristicStore.as_arrays`
+# returns them.  Walls have no flow state, so their ``v``, ``theta``, ``gamma``
+# and ``turningangle`` are ``nan``; so are ``endx``/``endy`` of open segments.
+FIELDS = (
+    ("startx", np.float64),
+    ("starty", np.float64),
+    ("endx", np.float64),
+    ("endy", np.float64),
+    ("angle", np.float64),
+    ("v", np.float64),
+    ("theta", np.float64),
+    ("gamma", np.float64),
+    ("turningangle", np.float64),
+    ("kind", np.int8),
+)
+
+
+class CharacteristicStore:
+    """Contiguous NumPy columns describing every shock and wall of a mesh.
+
+    Rows are appended in the order segments are added to :attr:`Mesh.shocks`,
+    so row ``i`` describes ``mesh.shocks[i]``.  The columns grow by doubling,
+    and :meth:`as_arrays` returns views of the filled part without copying.
+    Segments find their row through :attr:`rows`, keyed by ``id(seg)``.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.size = 0
+        self.rows: dict[int, int] = {}
+        self.columns = {
+            name: np.empty(max(capacity, 1), dtype) for name, dtype in FIELDS
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def capacity(self) -> int:
+        return len(self.columns["kind"])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns and the row index, including unused capacity."""
+
+        columns = sum(column.nbytes for column in self.columns.values())
+        return columns + sys.getsizeof(self.rows)
+
+    def reserve(self, capacity: int) -> None:
+        """Grow the columns so at least ``capacity`` rows fit."""
+
+        if capacity <= self.capacity:
+            return
+        for name, column in self.columns.items():
+            grown = np.empty(capacity, column.dtype)
+            grown[: self.size] = column[: self.size]
+            self.columns[name] = grown
+
+    def append(self, seg) -> int:
+        """Add a row for ``seg`` and return its index."""
+
+        row = self.size
+        if row == self.capacity:
+            self.reserve(2 * row)
+        cols = self.columns
+        cols["startx"][row] = seg.start.x
+        cols["starty"][row] = seg.start.y
+        cols["angle"][row] = seg.angle
+        if isinstance(seg, Wall):
+            cols["kind"][row] = WALL
+            for name in ("v", "theta", "gamma", "turningangle"):
+                cols[name][row] = np.nan
+        else:
+            cols["kind"][row] = SHOCK
+            cols["v"][row] = seg.v
+            cols["theta"][row] = seg.theta
+            cols["gamma"][row] = seg.gamma
+            cols["turningangle"][row] = seg.turningangle
+        self.size = row + 1
+        self.rows[id(seg)] = row
+        self.setend(seg, seg.end)
+        return row
+
+    def setend(self, seg, end: Optional[Point]) -> None:
+        """Record ``end`` as the end point of ``seg``, if it has a row."""
+
+        row = self.rows.get(id(seg))
+        if row is None:
+            return
+        self.columns["endx"][row] = np.nan if end is None else end.x
+        self.columns["endy"][row] = np.nan if end is None else end.y
+
+    def row(self, seg) -> int:
+        """Return the row index of ``seg``."""
+
+        return self.rows[id(seg)]
+
+    def take(self, segments) -> dict[str, np.ndarray]:
+        """Return copies of the rows of ``segments`` as a dict of arrays."""
+
+        rows = np.array([self.rows[id(seg)] for seg in segments], dtype=np.int64)
+        return {name: column[rows] for name, column in self.columns.items()}
+
+    def retain(self, segments) -> None:
+        """Keep only the rows of ``segments``, in that order.
+
+        Capacity shrinks to twice the remaining size, so memory follows the
+        retained rows.
+        """
+
+        kept = self.take(segments)
+        self.size = len(segments)
+        self.rows = {id(seg): i for i, seg in enumerate(segments)}
+        capacity = max(64, 2 * self.size)
+        for name, column in kept.items():
+            self.columns[name] = np.empty(capacity, column.dtype)
+            self.columns[name][: self.size] = column
+
+    def as_arrays(self) -> dict[str, np.ndarray]:
+        """Return read-only views of the filled part of every column."""
+
+        arrays = {}
+        for name, column in self.columns.items():
+            view = column[: self.size]
+            view.flags.writeable = False
+            arrays[name] = view
+        return arrays
@@ -0,0 +1,230 @@
+"""Run parameter sweeps of the ``main.py`` nozzle construction in parallel.
+
+Each case builds a symmetric pair of arcs with :meth:`Wall.createarc`,
+simulates the :class:`Mesh` and records its area ratio, optionally together
+with the wall contour from :meth:`Mesh.getxytable`::
+
+    from nozzlesim import sweep
+
+    cases = sweep.grid(gamma=[1.2, 1.3, 1.4], n=[20, 40], theta=[20, 30])
+    for result in sweep.run(cases, resultsfile="results.jsonl"):
+        print(result["params"], result["arearatio"], result["elapsed"])
+
+Results are streamed back in completion order and, with ``resultsfile``,
+appended to it as JSON lines the moment they arrive.  Running the same sweep
+again with the same file skips every case that already finished, so an
+interrupted sweep resumes where it stopped.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import time
+from typing import Iterable, Iterator, Optional
+
+from . import render
+from .mesh import Mesh
+from .point import Point
+from .wall import SymmetryPlane, Wall
+
+# Parameters of a case; anything not given in the grid takes these values,
+# which reproduce ``main.py``.
+DEFAULTS = {
+    "gamma": 1.25,
+    "initialmach": 1.0,
+    "theta": 34.45,
+    "deltax": 0.007,
+    "n": 20,
+    "height": 1.0,
+    "half": False,
+    "mergeturn": 0.0,
+    "maxturn": None,
+    "engine": None,
+    "table": False,
+    "tablestart": 0.0,
+    "tablepoints": 1000,
+    "tabledeltax": 0.011,
+    "plot": None,
+    "plotbounds": [[0, -10], [20, 10]],
+    "plotsize": [800, 800],
+}
+
+
+def grid(**params) -> list[dict]:
+    """Return the cartesian product of the value lists in ``params``.
+
+    Anything that is not a list or ``range`` is a single value, so pass
+    structured values such as ``plotbounds`` as tuples.  Unknown names raise
+    ``ValueError``.
+    """
+
+    unknown = set(params) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown sweep parameters: {sorted(unknown)}")
+    names = list(params)
+    values = [
+        value if isinstance(value, (list, range)) else [value]
+        for value in params.values()
+    ]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def casekey(params: dict) -> str:
+    """Return a stable string identifying the case described by ``params``."""
+
+    full = {**DEFAULTS, **params}
+    return json.dumps(full, sort_keys=True)
+
+
+def buildmesh(params: dict) -> Mesh:
+    """Return the unsimulated mesh for ``params``, set up as in ``main.py``.
+
+    With ``half`` only the top arc is built, above a :class:`SymmetryPlane`.
+    """
+
+    p = {**DEFAULTS, **params}
+    half = p["height"] / 2
+    topwalls, endx = Wall.createarc(Point(0, half), p["deltax"], p["theta"], p["n"])
+    if p["half"]:
+        bottomwalls = [SymmetryPlane(Point(0, 0))]
+    else:
+        bottomwalls, endx = Wall.createarc(
+            Point(0, -half), p["deltax"], -p["theta"], p["n"]
+        )
+    return Mesh(
+        p["gamma"],
+        p["initialmach"],
+        [],
+        topwalls + bottomwalls,
+        endx,
+        1,
+        mergeturn=p["mergeturn"],
+        maxturn=p["maxturn"],
+    )
+
+
+def runcase(params: dict) -> dict:
+    """Simulate one case and return its result record.
+
+    The record holds the case ``key`` and ``params``, the ``arearatio``, the
+    number of ``segments``, the wall ``table`` if requested, the wall-clock
+    ``elapsed`` seconds and the worker ``pid``.  With ``plot`` set to a path
+    pattern such as ``"plots/{n}_{theta}.png"``, the mesh is also rendered
+    offscreen to the file named by formatting it with the parameters.  An
+    exception is reported in ``error`` instead of being raised, so one bad case
+    does not stop a sweep.
+    """
+
+    p = {**DEFAULTS, **params}
+    result = {"key": casekey(params), "params": params, "pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        mesh = buildmesh(p)
+        mesh.simulate(engine=p["engine"])
+        result["arearatio"] = mesh.calcarearatio()
+        result["segments"] = len(mesh.shocks)
+        if p["table"]:
+            table = mesh.getxytable(p["tablestart"], p["tablepoints"], p["tabledeltax"])
+            result["table"] = [list(row) for row in table]
+        if p["plot"]:
+            path = p["plot"].format(**p)
+            width, height = p["plotsize"]
+            render.savemesh(mesh, path, p["plotbounds"], width, height)
+            result["plot"] = path
+        result["error"] = None
+    except Exception as exc:  # reported per case, see docstring
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def loadresults(path: str) -> list[dict]:
+    """Return the records stored in the results file at ``path``.
+
+    A missing file gives an empty list.  A truncated last line, left behind
+    when a sweep is killed mid-write, is ignored.
+    """
+
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def run(
+    cases: Iterable[dict],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    resultsfile: Optional[str] = None,
+    retryfailed: bool = True,
+) -> Iterator[dict]:
+    """Run ``cases`` on a process pool, yielding each result as it finishes.
+
+    ``workers`` defaults to the number of CPUs; ``1`` runs the cases in this
+    process without a pool.  Cases are handed to workers in chunks of
+    ``chunksize``, by default about four chunks per worker.  Cases already
+    recorded in ``resultsfile`` are skipped, except failed ones when
+    ``retryfailed`` is set.
+    """
+
+    done = set()
+    if resultsfile is not None:
+        for record in loadresults(resultsfile):
+            if record.get("error") is None or not retryfailed:
+                done.add(record["key"])
+
+    pending = []
+    seen = set()
+    for params in cases:
+        key = casekey(params)
+        if key not in done and key not in seen:
+            seen.add(key)
+            pending.append(params)
+    if not pending:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(pending))
+    if chunksize is None:
+        chunksize = max(1, len(pending) // (4 * workers))
+
+    out = None
+    if resultsfile is not None:
+        out = open(resultsfile, "a+")
+        # Terminate a line truncated by an interrupted write before appending.
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+    try:
+        if workers == 1:
+            results = map(runcase, pending)
+            yield from _record(results, out)
+        else:
+            # Imported here so that single-process runs start faster.
+            import multiprocessing
+
+            with multiprocessing.Pool(workers) as pool:
+                results = pool.imap_unordered(runcase, pending, chunksize)
+                yield from _record(results, out)
+    finally:
+        if out is not None:
+            out.close()
+
+
+def _record(results: Iterable[dict], out) -> Iterator[dict]:
+    """Append each of ``results`` to ``out`` (if any) and yield it."""
+
+    for result in results:
+        if out is not None:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        yield result
@@ -12,6 +12,8 @@ from .shock import Shock
 class Wall:
     """A straight wall segment defined by a start point and angle."""
 
+    __slots__ = ("start", "end", "_angle", "slope", "intercept")
+
     def __init__(
         self,
         start: Union[Point, Sequence[float]],
@@ -24,6 +26,18 @@ class Wall:
         self.end = end
         self.angle = angle
 
+    @property
+    def angle(self) -> float:
+        """Wall angle in degrees; setting it updates ``slope`` and ``intercept``."""
+
+        return self._angle
+
+    @angle.setter
+    def angle(self, value: float) -> None:
+        self._angle = value
+        self.slope = math.tan(math.radians(value))
+        self.intercept = self.start.y - self.slope * self.start.x
+
     def propangle(self) -> float:
         """Return the wall angle."""
 
@@ -62,8 +76,7 @@ class Wall:
         """Return the y coordinate on the wall at ``xposition`` or ``-inf``."""
 
         if self.exists(xposition):
-            slope = math.tan(math.radians(self.angle))
-            return (xposition - self.start.x) * slope + self.start.y
+            return (xposition - self.start.x) * self.slope + self.start.y
         return -float("inf")
 
     def __str__(self) -> str:  # pragma: no cover - simple display
@@ -75,3 +88,17 @@ class Wall:
         if self.end is not None:
             parts.append(f"End: {self.end}")
         return ", ".join(parts) + ")"
+
+
+class SymmetryPlane(Wall):
+    """A reflecting centerline for simulating one half of a symmetric nozzle.
+
+    Characteristics reaching it are always reflected, never turn it, and
+    :meth:`Mesh.mirror <nozzlesim.mesh.Mesh.mirror>` rebuilds the full mesh
+    by reflecting the half about it.  It must be horizontal.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, start: Union[Point, Sequence[float]] = (0.0, 0.0)) -> None:
+        super().__init__(start, 0.0)
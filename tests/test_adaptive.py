@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import Shock, adaptive, sweep
+
+
+def _build(n, **kwargs):
+    return sweep.buildmesh({"n": n, "theta": 34.45, "deltax": 0.14 / n, **kwargs})
+
+
+def test_waveplan_lumps_and_refines_corners():
+    mesh = _build(8)
+    walls = [seg for seg in mesh.shocks if seg.end is not None]
+    plan, stats = adaptive.waveplan(walls, mesh.nextwalls, mergeturn=9.0)
+    # 4.3 degree corners pair up, emitting from the first of each pair.
+    assert stats == {
+        "corners": 16,
+        "waves": 8,
+        "merged": 8,
+        "refined": 0,
+        "maxlumped": pytest.approx(34.45 / 4),
+    }
+    turns = [sum(corner.turns) for corner in plan.values()]
+    assert sum(turns) == pytest.approx(0)
+    assert sum(abs(t) for t in turns) == pytest.approx(2 * 34.45)
+
+    plan, stats = adaptive.waveplan(walls, mesh.nextwalls, maxturn=1.0)
+    assert stats["waves"] == 16 * 5 and stats["refined"] == 16
+    assert all(len(corner.turns) == 5 for corner in plan.values())
+
+
+def test_merging_cuts_events_with_small_error():
+    full = _build(80)
+    fullevents = full.simulate()
+    merged = _build(80, mergeturn=2.0)
+    events = merged.simulate()
+    assert events * 10 < fullevents
+    assert merged.wavestats["waves"] == 40
+    assert merged.calcarearatio() == pytest.approx(full.calcarearatio(), rel=0.01)
+    assert not [seg for seg in merged.activeshocks if isinstance(seg, Shock)]
+
+    estimate = adaptive.errorestimate(lambda **kw: _build(80, **kw), 2.0)
+    assert estimate["arearatio"] == merged.calcarearatio()
+    actual = abs(merged.calcarearatio() - full.calcarearatio())
+    assert actual / 2 < estimate["error"] < actual * 2
+
+
+def test_refining_coarse_corners_approaches_fine_walls():
+    fine = _build(40)
+    fine.simulate()
+    coarse = _build(5)
+    coarse.simulate()
+    refined = _build(5, maxturn=1.0)
+    refined.simulate()
+    target = fine.calcarearatio()
+    assert abs(refined.calcarearatio() - target) < abs(coarse.calcarearatio() - target)
+
+
+@pytest.mark.parametrize("params", [{"mergeturn": 2.0}, {"maxturn": 1.5}])
+def test_engines_agree_in_adaptive_mode(params):
+    scan, sweepmesh = _build(20, **params), _build(20, **params)
+    scan.simulate(engine="scan")
+    sweepmesh.simulate(engine="sweep")
+    key = lambda mesh: [(s.start.x, s.start.y, s.angle) for s in mesh.shocks]
+    assert key(scan) == key(sweepmesh)
@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import bench, cache
+
+
+def test_fitexponent_recovers_power_law():
+    ns = [5, 10, 20, 40]
+    assert bench.fitexponent(ns, [3 * n**2 for n in ns]) == pytest.approx(2)
+    assert bench.fitexponent([5], [1.0]) is None
+
+
+def test_report_and_compare(tmp_path):
+    sizes = {name: info.maxsize for name, info in cache.stats().items()}
+    out = tmp_path / "bench.json"
+    argv = ["--n", "3", "6", "--theta", "15", "--calls", "50", "--out", str(out)]
+    assert bench.main(argv) == 0
+    report = json.loads(out.read_text())
+    assert [case["n"] for case in report["cases"]] == [3, 6]
+    assert all(case["events"] > 0 and case["peakmemory"] for case in report["cases"])
+    assert report["scaling"]["15.0"]["events"] > 1
+    assert set(report["micro"]) == {"calcmach", "shockprop", "findintersection"}
+    assert {name: info.maxsize for name, info in cache.stats().items()} == sizes
+    rows = bench.compare(report, report)
+    assert rows and all(ratio == 1 for *_, ratio in rows)
+
+
+def test_microbenchmarks_leave_unbounded_caches_alone():
+    sizes = {name: info.maxsize for name, info in cache.stats().items()}
+    name = next(iter(sizes))
+    cache.configure(maxsize=None, name=name)
+    try:
+        micro = bench.microbenchmarks(calls=20)
+        assert micro["calcmach"]["calls"] == 20
+        assert cache.stats()[name].maxsize is None
+    finally:
+        cache.configure(maxsize=sizes[name], name=name)
+    assert {name: info.maxsize for name, info in cache.stats().items()} == sizes
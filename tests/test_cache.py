@@ -0,0 +1,99 @@
+import os
+import sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import gc
+
+import pytest
+
+from nozzlesim import cache
+import nozzlesim.helperfuncs as h
+
+
+def test_cache_is_bounded_and_counts():
+    calls = []
+
+    @cache.memoize(maxsize=2)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert [square(1.0), square(2.0), square(1.0), square(3.0)] == [1, 4, 1, 9]
+    # 2.0 was least recently used and got evicted.
+    assert square(2.0) == 4
+    assert calls == [1.0, 2.0, 3.0, 2.0]
+    stats = square.cache_info()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 4, 2)
+    assert stats.currsize == 2
+    assert stats.hitrate == pytest.approx(0.2)
+
+    square.cache.configure(maxsize=1)
+    assert square.cache_info().currsize == 1
+    square.cache_clear()
+    assert square.cache_info()[:4] == (0, 0, 0, 0)
+
+
+def test_tolerance_quantizes_float_keys():
+    calls = []
+
+    @cache.memoize(tolerance=1e-6)
+    def ident(x, n=1):
+        calls.append(x)
+        return x
+
+    assert ident(1.0) == 1.0
+    assert ident(1.0 + 1e-9) == 1.0
+    assert ident(1.0, n=2) == 1.0
+    assert len(calls) == 2
+    with pytest.raises(ValueError):
+        ident.cache.configure(tolerance=-1)
+
+
+def test_helperfunc_registry():
+    try:
+        cache.clear()
+        h.calcmach(1.4, 1.0, 10.0)
+        h.calcmach(1.4, 1.0, 10.0)
+        assert cache.stats()["nozzlesim.helperfuncs.calcmach"].hits == 1
+        cache.configure(maxsize=0, name="calcmach")
+        h.calcmach(1.4, 1.0, 10.0)
+        assert cache.stats()["nozzlesim.helperfuncs.calcmach"].currsize == 0
+        with pytest.raises(KeyError):
+            cache.getcache("nosuchfunction")
+    finally:
+        cache.configure(maxsize=cache.DEFAULT_MAXSIZE)
+        cache.clear()
+
+
+def test_registry_keys_by_qualified_name():
+    def first(x):
+        return x
+
+    def second(x):
+        return -x
+
+    first.__module__ = second.__module__ = "elsewhere"
+    second.__qualname__ = first.__qualname__
+    helper = cache.memoize(first)
+    clash = cache.memoize(second)
+    name = "elsewhere." + first.__qualname__
+    assert (helper.cache.name, clash.cache.name) == (name, name + "-2")
+    assert cache.getcache(name) is helper.cache
+
+    def calcmach(x):
+        return x
+
+    shadow = cache.memoize(calcmach)
+    assert "nozzlesim.helperfuncs.calcmach" in cache.stats()
+    with pytest.raises(KeyError, match="ambiguous"):
+        cache.getcache("calcmach")
+    shadow.cache.configure(maxsize=1)
+    assert cache.stats()["nozzlesim.helperfuncs.calcmach"].maxsize != 1
+
+    # Caches leave the registry with their function.
+    del helper, clash, shadow
+    gc.collect()
+    assert not [key for key in cache.stats() if key.startswith("elsewhere.")]
+    assert cache.getcache("calcmach") is h.calcmach.cache
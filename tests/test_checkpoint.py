@@ -0,0 +1,109 @@
+import os
+import sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from nozzlesim import Mesh, Point, Wall, sweep
+from nozzlesim import mesh as meshmodule
+from nozzlesim.checkpoint import readcheckpoint
+from nozzlesim.wall import SymmetryPlane
+from test_mesh import _arcmesh, _segments
+from test_retain import _arcmesh as _retainmesh
+
+
+def test_resume_from_checkpoint(tmp_path):
+    path = str(tmp_path / "run.nzck")
+    whole = _arcmesh(10, 20)
+    whole.simulate()
+    split = _arcmesh(10, 20)
+    split.simulate(stop=0.1)
+    split.save_checkpoint(path)
+
+    restored = Mesh.load_checkpoint(path)
+    assert _segments(restored) == _segments(split)
+    assert [s.start for s in restored.activeshocks] == [
+        s.start for s in split.activeshocks
+    ]
+    assert (restored.x, restored.remainingangle) == (split.x, split.remainingangle)
+    restored.simulate()
+    assert _segments(restored) == _segments(whole)
+
+
+def test_checkpoint_records_are_memory_mapped(tmp_path):
+    path = str(tmp_path / "run.nzck")
+    extra = Wall(Point(5, 5), 1.5, Point(6, 5))
+    mesh = Mesh(1.4, 2.0, [extra], [Wall(Point(0, 1), 0)], 1, 0, tolerance=0.0)
+    mesh.save_checkpoint(path)
+
+    header, records = readcheckpoint(path)
+    assert isinstance(records, np.memmap)
+    assert header["count"] == len(records) == 2
+    assert records["startx"].tolist() == [0.0, 5.0]
+    restored = Mesh.load_checkpoint(path, mmap=False)
+    assert len(restored.shocks) == 1 and restored.index.tolerance == 0.0
+    (wall,) = restored.wallsegments
+    assert (wall.angle, wall.end) == (1.5, Point(6, 5))
+
+    with open(path, "r+b") as f:
+        f.write(b"garbage!")
+    with pytest.raises(ValueError):
+        Mesh.load_checkpoint(path)
+
+
+@pytest.mark.parametrize("events", [1, 3, 50])
+def test_resume_keeps_adaptive_settings(tmp_path, events):
+    path = str(tmp_path / "run.nzck")
+    params = {"n": 30, "mergeturn": 3.0}
+    whole = sweep.buildmesh(params)
+    whole.simulate()
+    split = sweep.buildmesh(params)
+    split.simulate(maxevents=events)
+    split.save_checkpoint(path)
+
+    restored = Mesh.load_checkpoint(path)
+    assert (restored.mergeturn, restored.maxturn) == (3.0, None)
+    restored.simulate()
+    assert _segments(restored) == _segments(whole)
+    assert restored.calcarearatio() == whole.calcarearatio()
+
+
+@pytest.mark.parametrize("events", [1, 20, 60])
+def test_resume_half_mesh_keeps_symmetry_plane(tmp_path, events):
+    path = str(tmp_path / "half.nzck")
+    params = {"n": 10, "theta": 20, "half": True}
+    whole = sweep.buildmesh(params)
+    whole.simulate()
+    split = sweep.buildmesh(params)
+    split.simulate(maxevents=events)
+    split.save_checkpoint(path)
+
+    restored = Mesh.load_checkpoint(path)
+    assert any(isinstance(seg, SymmetryPlane) for seg in restored.shocks)
+    restored.simulate()
+    assert _segments(restored) == _segments(whole)
+    assert restored.calcarearatio() == whole.calcarearatio()
+
+
+def test_resume_continues_segment_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(meshmodule, "COMPACTSLACK", 0)
+    path, logpath = str(tmp_path / "run.nzck"), str(tmp_path / "segs.log")
+    whole = _arcmesh(10, 20)
+    whole.simulate()
+    split = _retainmesh(10, 20, retain="spill", spillpath=logpath)
+    split.simulate(maxevents=60)
+    split.save_checkpoint(path)
+    # Records spilled after the checkpoint are dropped on resume.
+    split.simulate()
+    split.close()
+
+    restored = Mesh.load_checkpoint(path)
+    assert restored.retain == "spill"
+    restored.simulate()
+    log = restored.segmentlog()
+    assert len(log) == restored.spillstats["count"]
+    assert len(restored.shocks) + len(log) == len(whole.shocks)
+    restored.close()
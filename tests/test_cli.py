@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from nozzlesim import cli, export
+
+CONFIG = """
+outputs = ["contour", "nodes"]
+format = "npz"
+
+[defaults]
+theta = 20.0
+
+[[cases]]
+name = "small"
+n = 3
+
+[grid]
+n = [2, 4]
+"""
+
+
+def test_expandcases_merges_defaults_cases_and_grid():
+    config = {
+        "defaults": {"theta": 20.0},
+        "cases": [{"name": "a", "n": 3}, {"n": 5, "theta": 10.0}],
+        "grid": {"n": [2, 4]},
+    }
+    cases = cli.expandcases(config, "run-")
+    assert cases == [
+        ("a", {"theta": 20.0, "n": 3}),
+        ("run-0001", {"theta": 10.0, "n": 5}),
+        ("run-0002", {"theta": 20.0, "n": 2}),
+        ("run-0003", {"theta": 20.0, "n": 4}),
+    ]
+    assert cli.expandcases({"defaults": {"n": 2}}) == [("case0000", {"n": 2})]
+    with pytest.raises(ValueError):
+        cli.expandcases({"cases": [{"n": 2, "bogus": 1}]})
+    with pytest.raises(ValueError):
+        cli.expandcases({"case": [{"n": 2}]})
+
+
+def test_main_runs_toml_cases_and_writes_outputs(tmp_path, capsys):
+    config = tmp_path / "cases.toml"
+    config.write_text(CONFIG)
+    out = tmp_path / "out"
+    assert cli.main([str(config), "-o", str(out)]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines] == ["small", "cases-0001", "cases-0002"]
+
+    results = [
+        json.loads(line) for line in (out / "results.jsonl").read_text().splitlines()
+    ]
+    assert [r["events"] for r in results] == [int(line.split()[1]) for line in lines]
+    assert all(r["error"] is None and len(r["files"]) == 2 for r in results)
+    contour = export.read(str(out / "small.contour.npz"))
+    assert len(contour) == 1000 and np.isfinite(contour["upper"]).all()
+
+
+def test_main_reports_failures_and_bad_configs(tmp_path, capsys):
+    config = tmp_path / "cases.json"
+    config.write_text(json.dumps({"cases": [{"n": 2}, {"n": 2, "engine": "nope"}]}))
+    assert cli.main([str(config), "-o", str(tmp_path), "--outputs"]) == 1
+    assert "failed" in capsys.readouterr().out
+    config.write_text(json.dumps({"cases": [{"n": 2, "bogus": 1}]}))
+    assert cli.main([str(config), "-o", str(tmp_path)]) == 2
+
+
+def test_main_rejects_duplicate_case_names(tmp_path, capsys):
+    config = tmp_path / "cases.json"
+    config.write_text(json.dumps({"cases": [{"name": "a"}, {"name": "a", "n": 3}]}))
+    out = tmp_path / "out"
+    assert cli.main([str(config), "-o", str(out)]) == 2
+    assert "duplicate" in capsys.readouterr().err
+    assert not out.exists()
+    # The same config twice names its cases twice too.
+    config.write_text(json.dumps({"cases": [{"name": "a", "n": 2}]}))
+    assert cli.main([str(config), str(config), "-o", str(out)]) == 2
+
+
+def test_module_entry_point_loads_only_the_solver(tmp_path):
+    config = tmp_path / "case.json"
+    config.write_text(json.dumps({"defaults": {"n": 2}}))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "nozzlesim", str(config)]
+        + ["-o", str(tmp_path / "out")],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "case-0000" in proc.stdout
+    for module in ("pygame", "tomllib", "multiprocessing"):
+        assert f" {module}" not in proc.stderr
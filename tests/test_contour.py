@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import Contour, Point, Polyline, Wall, sweep
+
+
+def _scan(mesh, startx, numpoints, deltax):
+    table = []
+    for i in range(numpoints):
+        x = startx + deltax * i
+        ys = [seg.getyposition(x) for seg in mesh.shocks if isinstance(seg, Wall)]
+        table.append((x, max(ys)))
+    return table
+
+
+@pytest.mark.parametrize("params", [{"n": 20}, {"n": 6, "half": True}])
+def test_getxytable_matches_wall_scan(params):
+    mesh = sweep.buildmesh(params)
+    mesh.simulate()
+    assert mesh.getxytable(-0.5, 300, 0.05) == _scan(mesh, -0.5, 300, 0.05)
+
+
+def test_polyline_evaluates_segments_and_ends():
+    closed = Polyline([0, 1, 3], [0, 1, 0])
+    np.testing.assert_allclose(closed([0.5, 1, 2, 3]), [0.5, 1, 0.5, 0])
+    assert np.isnan(closed([-1, 4])).all()
+    assert closed(-1, left=-np.inf) == -np.inf
+    ray = Polyline([0, 1], [0, 1], [45, 0])
+    assert ray(10) == pytest.approx(1)
+    with pytest.raises(ValueError):
+        Polyline([0, 2, 1], [0, 0, 0])
+
+
+def test_arc_matches_createarc_walls():
+    walls, _ = Wall.createarc(Point(0, 0.5), 0.007, 34.45, 50)
+    arc = Polyline.arc(Point(0, 0.5), 0.007, 34.45, 50)
+    np.testing.assert_allclose(arc.x, [w.start.x for w in walls], atol=1e-12)
+    np.testing.assert_allclose(arc.y, [w.start.y for w in walls], atol=1e-12)
+    rebuilt = arc.towalls()
+    assert [w.angle for w in rebuilt] == [w.angle for w in walls]
+    assert rebuilt[-1].end is None and rebuilt[0].end is rebuilt[1].start
+
+
+def test_contour_loads_tables(tmp_path):
+    x = np.linspace(0, 5, 4000)
+    upper = np.stack([x, 1 + 0.1 * x**2], axis=1)
+    path = tmp_path / "table.csv"
+    np.savetxt(path, upper, delimiter=",")
+    contour = Contour.load(str(path))
+    assert len(contour.upper) == 4000
+    np.testing.assert_allclose(
+        contour.height([1.0, 2.5]), 2 + 0.2 * np.array([1, 6.25]), rtol=1e-6
+    )
+
+    np.savetxt(path, np.column_stack([x, upper[:, 1], np.zeros_like(x)]), delimiter=",")
+    contour = Contour.load(str(path))
+    np.testing.assert_allclose(contour.lower([0.0, 4.0]), 0.0)
@@ -0,0 +1,74 @@
+import math
+import os
+import sys
+
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import design, kernels
+
+
+def test_brent_finds_root():
+    f = lambda x: x**3 - 2
+    root = design.brent(f, 0, 3, f(0), f(3), 1e-12, 0)
+    assert math.isclose(root, 2 ** (1 / 3), rel_tol=1e-10)
+    with pytest.raises(ValueError):
+        design.brent(f, 2, 3, f(2), f(3), 1e-12, 0)
+
+
+@pytest.mark.parametrize(
+    "target,value", [("mach", 2.5), ("arearatio", 10.0), ("length", 3.0)]
+)
+def test_design_meets_target_with_fewer_full_simulations(monkeypatch, target, value):
+    built = []
+    buildmesh = design.buildmesh
+
+    def counting(params):
+        built.append(params["n"])
+        return buildmesh(params)
+
+    monkeypatch.setattr(design, "buildmesh", counting)
+    cold = design.design(target, value, n=10, coarsen=None)
+    coldfull, built[:] = len(built), []
+    warm = design.design(target, value, n=10, coarsen=4)
+    assert built.count(10) < coldfull
+    assert warm.simulations == len(built)
+
+    assert math.isclose(warm.theta, cold.theta, rel_tol=1e-5)
+    measured = {
+        "mach": warm.exitmach,
+        "arearatio": warm.arearatio,
+        "length": warm.length,
+    }[target]
+    assert math.isclose(measured, value, rel_tol=1e-5)
+    assert warm.mesh.calcarearatio() == warm.arearatio
+
+
+def test_mach_target_is_relative_to_throat():
+    # The exit Mach number only depends on the total wall turn.
+    base = design.design("mach", 3.0, n=6)
+    tall = design.design("mach", 3.0, n=6, height=2.0)
+    assert math.isclose(tall.theta, base.theta, rel_tol=1e-5)
+    assert math.isclose(tall.exitmach, 3.0, rel_tol=1e-5)
+    assert math.isclose(tall.arearatio, tall.mesh.calcarearatio() / 4)
+    fast = design.design("mach", 3.0, n=6, initialmach=1.5)
+    assert fast.theta < base.theta
+    assert math.isclose(fast.exitmach, 3.0, rel_tol=1e-5)
+
+
+def test_exit_mach_close_to_sonic():
+    # Below M = 1.1 the scalar bisection used to return its lower bracket.
+    result = design.design("arearatio", 1.005, n=6, bracket=(0.05, 10.0))
+    assert result.exitmach < 1.1
+    assert math.isclose(
+        kernels.calcarearatio(1.25, result.exitmach), result.arearatio, rel_tol=1e-9
+    )
+
+
+def test_design_rejects_unreachable_target():
+    with pytest.raises(ValueError):
+        design.design("arearatio", 1e6, n=4, bracket=(1.0, 10.0))
+    with pytest.raises(ValueError):
+        design.design("thrust", 1.0)
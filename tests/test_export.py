@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import Contour, Shock, export, sweep
+
+
+@pytest.fixture(scope="module")
+def mesh():
+    mesh = sweep.buildmesh({"n": 8})
+    mesh.simulate()
+    return mesh
+
+
+def _datasets(mesh, chunksize):
+    return {
+        "contour": lambda: export.contour(mesh.contour(), -0.5, 700, 0.02, chunksize),
+        "segments": lambda: export.segments(mesh, chunksize),
+        "nodes": lambda: export.nodes(mesh, chunksize),
+    }
+
+
+@pytest.mark.parametrize("format", export.FORMATS)
+def test_exports_round_trip_in_every_format(mesh, tmp_path, format):
+    for name, make in _datasets(mesh, 64).items():
+        path = str(tmp_path / f"{name}.{format}")
+        dataset = make()
+        assert export.write(dataset, path) == dataset.count
+        expected = np.concatenate(list(make().chunks))
+        records = export.read(path)
+        assert records.dtype.names == expected.dtype.names
+        for field in expected.dtype.names:
+            np.testing.assert_array_equal(records[field], expected[field])
+
+
+def test_chunks_cover_the_mesh(mesh):
+    chunks = list(export.segments(mesh, chunksize=100).chunks)
+    assert [len(c) for c in chunks[:-1]] == [100] * (len(chunks) - 1)
+    assert sum(map(len, chunks)) == len(mesh.shocks)
+    nodes = np.concatenate(list(export.nodes(mesh, chunksize=100).chunks))
+    assert len(nodes) == sum(isinstance(seg, Shock) for seg in mesh.shocks)
+    assert (nodes["mach"] >= 1).all()
+
+
+def test_binary_export_is_memory_mapped(mesh, tmp_path):
+    path = str(tmp_path / "contour.bin")
+    export.write(export.contour(mesh.contour(), 0, 1000, 0.011), path)
+    header, records = export.readbinary(path)
+    assert isinstance(records, np.memmap) and not records.flags.writeable
+    assert header["dataset"] == "contour" and header["count"] == 1000
+    table = np.array(mesh.getxytable(0, 1000, 0.011))
+    np.testing.assert_array_equal(records["upper"], table[:, 1])
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 8)
+    with pytest.raises(ValueError):
+        export.readbinary(path)
+
+
+def test_csv_contour_loads_as_contour(mesh, tmp_path):
+    path = str(tmp_path / "table.csv")
+    export.write(export.contour(mesh.contour(), 0, 500, 0.02), path)
+    contour = Contour.load(path)
+    x = 0.02 * np.arange(5, 450, 7)
+    np.testing.assert_allclose(contour.height(x), mesh.contour().height(x))
+
+
+def test_unknown_format_is_rejected(mesh, tmp_path):
+    with pytest.raises(ValueError):
+        export.write(export.segments(mesh), str(tmp_path / "mesh.txt"))
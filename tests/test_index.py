@@ -0,0 +1,44 @@
+import os
+import sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from nozzlesim import Point, Shock, Wall
+from nozzlesim.index import StartIndex
+from nozzlesim.mesh import Mesh
+
+
+def test_exact_lookup_keeps_insertion_order_and_filters_type():
+    wall = Wall(Point(1, 2), 0)
+    shock = Shock(Point(1, 2), 1, 1.4, 0, 0)
+    other = Shock(Point(1, 2.0000001), 1, 1.4, 0, 0)
+    index = StartIndex(0.0, [wall, shock, other])
+    assert index.find(1, 2) == [wall, shock]
+    assert index.find(1, 2, Shock) == [shock]
+    assert index.find(1, 2, Wall) == [wall]
+    assert index.find(5, 5) == []
+
+
+def test_tolerance_matches_across_cell_boundaries():
+    index = StartIndex(1e-6)
+    near = Shock(Point(0.9999996, 0), 1, 1.4, 0, 0)
+    far = Shock(Point(1.00001, 0), 1, 1.4, 0, 0)
+    index.add(near)
+    index.add(far)
+    assert index.find(1.0000004, 0) == [near]
+    with pytest.raises(ValueError):
+        StartIndex(-1)
+
+
+def test_mesh_links_walls_and_indexes_new_segments():
+    walls, endx = Wall.createarc(Point(0, 0.5), 0.07, 10, 3)
+    mesh = Mesh(1.25, 1, [], walls, endx, 1)
+    for wall, nextwall in zip(walls, walls[1:]):
+        assert mesh.wallendlinks(wall) == (None, nextwall)
+    shock = mesh.genwallshock(walls[0], walls[1])
+    mesh.addsegment(shock)
+    assert mesh.wallendlinks(walls[0]) == (shock, walls[1])
+    assert mesh.index.find(shock.start.x, shock.start.y, Shock) == [shock]
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_mesh import _arcmesh, _segments
+
+
+@pytest.mark.parametrize("engine", ["sweep", "scan"])
+def test_stats_count_phases_without_changing_the_mesh(engine):
+    plain = _arcmesh(8, 20)
+    plain.simulate(engine=engine)
+
+    mesh = _arcmesh(8, 20)
+    stats = mesh.enablestats()
+    events = mesh.simulate(engine=engine)
+    assert _segments(mesh) == _segments(plain)
+    assert mesh.stats is stats
+    summary = stats.summary()
+    assert summary["events"] == events == len(stats.front)
+    assert summary["phases"]["mesh.handleevent"]["calls"] == events
+    if engine == "scan":
+        assert summary["phases"]["mesh.findpairs"]["calls"] == events + 1
+    else:
+        assert summary["phases"]["sweep.reorder"]["calls"] == events
+    assert summary["maxfront"] == max(size for _, size in stats.front)
+    assert "nozzlesim.helperfuncs.calcmach" in summary["caches"]
+    assert "mesh.handleevent" in str(stats)
+
+
+def test_disablestats_removes_wrappers():
+    mesh = _arcmesh(4, 15)
+    stats = mesh.enablestats()
+    mesh.simulate(maxevents=3)
+    mesh.disablestats()
+    assert "findpairs" not in vars(mesh) and "processevent" not in vars(mesh)
+    mesh.simulate()
+    assert stats.events == 3
+    with pytest.raises(ValueError):
+        stats.totrace()
+
+
+def test_trace_export(tmp_path):
+    mesh = _arcmesh(4, 15)
+    stats = mesh.enablestats(trace=True)
+    mesh.simulate()
+    path = tmp_path / "trace.json"
+    stats.savetrace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    counters = [e for e in events if e["ph"] == "C"]
+    assert len(counters) == stats.events
+    assert {e["name"] for e in spans} >= {"mesh.handleevent", "sweep.reorder"}
+    assert all(e["dur"] >= 0 for e in spans)
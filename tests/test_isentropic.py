@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import isentropic, kernels, sweep
+
+
+def test_ratios_match_tables():
+    # Standard isentropic tables for gamma = 1.4.
+    assert isentropic.temperatureratio(1.4, 2.0) == pytest.approx(0.555556, abs=1e-6)
+    assert isentropic.pressureratio(1.4, 2.0) == pytest.approx(0.127805, abs=1e-6)
+    assert isentropic.densityratio(1.4, 2.0) == pytest.approx(0.230048, abs=1e-6)
+    mach = np.array([0.0, 0.5, 1.0, 3.0])
+    assert isentropic.pressureratio(1.4, mach).shape == (4,)
+    np.testing.assert_allclose(
+        isentropic.pressureratio(1.4, mach),
+        isentropic.temperatureratio(1.4, mach) * isentropic.densityratio(1.4, mach),
+    )
+
+
+@pytest.mark.parametrize("gamma", [1.1, 1.25, 1.4, 5 / 3])
+def test_area_ratio_inversion_on_both_branches(gamma):
+    mach = np.concatenate([np.geomspace(1e-5, 0.99, 50), np.linspace(1.01, 40, 50)])
+    ratio = kernels.calcarearatio(gamma, mach)
+    solved = kernels.calcmachfromarearatio(gamma, ratio, mach > 1)
+    np.testing.assert_allclose(solved, mach, rtol=1e-12)
+    subsonic = kernels.calcmachfromarearatio(gamma, [1.0, 2.0], False)
+    assert subsonic[0] == 1.0 and subsonic[1] < 1
+    assert np.isnan(kernels.calcmachfromarearatio(gamma, 0.5, False))
+
+
+@pytest.mark.parametrize("supersonic", [True, False])
+def test_area_ratio_inversion_edges(supersonic):
+    below = np.nextafter(1.0, 0.0)
+    ratios = [below, 1 - 1e-9, np.inf, np.nan, 1e40]
+    mach = kernels.calcmachfromarearatio(1.3, ratios, supersonic)
+    assert mach[0] == 1.0
+    assert np.isnan(mach[1:4]).all()
+    assert np.isnan(mach[4]) == supersonic
+    for gamma in (1.1, 1.2, 1.3):
+        sonic = kernels.calcarearatio(gamma, 1.0)
+        assert kernels.calcmachfromarearatio(gamma, sonic, supersonic) == 1.0
+
+
+def test_distribution_of_converging_diverging_table():
+    x = np.linspace(-1, 2, 61)
+    table = np.stack([x, 1 + x**2], axis=1)
+    table[0, 1] = -np.inf
+    state = isentropic.distribution(1.4, table, exponent=1.0)
+    throat = np.flatnonzero(x == 0)[0]
+    assert np.isnan(state.mach[0])
+    assert state.mach[throat] == 1.0
+    assert (state.mach[1:throat] < 1).all() and (state.mach[throat + 1 :] > 1).all()
+    assert (np.diff(state.mach[1:]) > 0).all()
+    np.testing.assert_allclose(
+        kernels.calcarearatio(1.4, state.mach[1:]), 1 + x[1:] ** 2, rtol=1e-12
+    )
+    np.testing.assert_allclose(
+        state.pressure, isentropic.pressureratio(1.4, state.mach)
+    )
+
+
+def test_distribution_of_simulated_nozzle():
+    mesh = sweep.buildmesh({"n": 10})
+    mesh.simulate()
+    state = isentropic.distribution(1.25, mesh.getxytable(0, 2000, 0.02))
+    assert state.mach[0] == 1.0
+    assert (np.diff(state.mach) >= 0).all()
+    assert state.arearatio[-1] == pytest.approx(mesh.calcarearatio(), rel=1e-3)
+    with pytest.raises(ValueError):
+        isentropic.distribution(1.25, [(0.0, -np.inf)])
@@ -0,0 +1,62 @@
+import os
+import sys
+import math
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+import nozzlesim.helperfuncs as h
+import nozzlesim.kernels as k
+
+
+@pytest.mark.parametrize("gamma", [1.1, 1.25, 1.4, 1.67])
+def test_calcmach_matches_scalar(gamma):
+    angles = np.linspace(0, 0.95 * h.calcvmax(gamma), 60)
+    expected = [h.calcmach(gamma, 1.0, float(v)) for v in angles]
+    np.testing.assert_allclose(k.calcmach(gamma, angles), expected, rtol=1e-6)
+    np.testing.assert_allclose(
+        k.calcv(gamma, 1, k.calcmach(gamma, angles)), angles, atol=1e-9
+    )
+
+
+def test_calcmach_broadcasts_and_rejects_out_of_range():
+    gamma = np.array([1.25, 1.4])[:, None]
+    angles = np.array([0.0, 10.0, 40.0])
+    result = k.calcmach(gamma, angles)
+    assert result.shape == (2, 3)
+    assert math.isclose(result[0, 1], h.calcmach(1.25, 1.0, 10.0), rel_tol=1e-6)
+    assert result[1, 0] == 1.0
+    assert np.isnan(k.calcmach(1.4, [-1.0, 200.0])).all()
+    from_two = k.calcmach(1.4, 5.0, mach1=2.0)
+    assert math.isclose(from_two, h.calcmach(1.4, 2.0, 5.0), rel_tol=1e-6)
+
+
+def test_characteristic_angles_match_scalar():
+    gamma = np.array([1.2, 1.4])[:, None, None, None]
+    v = np.array([1.0, 10.0, 40.0])[:, None, None]
+    theta = np.array([-5.0, 0.0, 10.0])[:, None]
+    turning = np.array([-3.0, 2.0])
+    grid = np.broadcast_arrays(gamma, v, theta, turning)
+    cases = list(zip(*(a.ravel().tolist() for a in grid)))
+    for name in ["shockprop", "shockangle", "calcshockpropangle"]:
+        expected = [getattr(h, name)(*case) for case in cases]
+        result = getattr(k, name)(gamma, v, theta, turning).ravel()
+        np.testing.assert_allclose(result, expected, rtol=1e-6)
+    expected = [h.alphadiff(g, a, a + 3) for g, a, _, _ in cases]
+    result = k.alphadiff(gamma, v, v + 3) + 0 * theta + 0 * turning
+    np.testing.assert_allclose(result.ravel(), expected, rtol=1e-6)
+
+
+def test_area_ratio_round_trip():
+    gamma = np.array([1.25, 1.4])[:, None]
+    ratios = np.array([1.0, 1.001, 1.5, 10.0, 1e4])
+    mach = k.calcmachfromarearatio(gamma, ratios)
+    np.testing.assert_allclose(
+        k.calcarearatio(gamma, mach), ratios + 0 * gamma, rtol=1e-12
+    )
+    assert math.isclose(mach[1, 2], h.calcmachfromarearatio(1.4, 1.5), rel_tol=1e-4)
+    assert np.isnan(k.calcmachfromarearatio(1.4, 0.5))
+    assert math.isclose(k.calcarearatio(1.4, 2.0), h.calcarearatio(1.4, 2.0))
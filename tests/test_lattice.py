@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import lattice, sweep
+
+
+def _build(n, **kwargs):
+    return sweep.buildmesh({"n": n, "theta": 34.45, "deltax": 0.14 / n, **kwargs})
+
+
+@pytest.mark.parametrize("n, theta", [(1, 10.0), (3, 34.45), (20, 20.0)])
+def test_lattice_engine_matches_sweep(n, theta):
+    report = lattice.crosscheck(_build, n=n, theta=theta)
+    assert report["match"], report
+    assert report["segments"][0] == report["segments"][1] == 2 * n * n + 6 * n + 2
+    assert report["events"][0] == report["events"][1]
+    assert report["arearatio"][0] == pytest.approx(report["arearatio"][1])
+
+
+def test_solve_is_symmetric_for_symmetric_arcs():
+    solved = lattice.solve(_build(6))
+    assert solved.x.shape == (6, 6)
+    np.testing.assert_allclose(solved.x, solved.x.T, rtol=1e-3)
+    np.testing.assert_allclose(solved.y, -solved.y.T, atol=1e-3)
+    np.testing.assert_allclose(solved.down, -solved.up.T, rtol=1e-12)
+    # The arc corners are only nearly symmetric; waves cross in order.
+    assert (np.diff(solved.x, axis=0) > 0).all()
+    assert (np.diff(solved.x, axis=1) > 0).all()
+
+
+def test_stopped_lattice_run_finishes_with_sweep():
+    full = _build(5)
+    full.simulate()
+    mesh = _build(5)
+    assert mesh.simulate(engine="lattice", maxevents=20) == 20
+    with pytest.raises(ValueError):
+        mesh.simulate(engine="lattice")
+    mesh.simulate()
+    assert len(mesh.shocks) == len(full.shocks)
+    assert mesh.calcarearatio() == pytest.approx(full.calcarearatio())
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"half": True}, {"mergeturn": 2.0}, {"n": 100, "deltax": 0.007}],
+)
+def test_lattice_rejects_other_networks(params):
+    mesh = sweep.buildmesh({"n": 10, **params})
+    with pytest.raises(ValueError):
+        mesh.simulate(engine="lattice")
+    assert len(mesh.shocks) == len(sweep.buildmesh({"n": 10, **params}).shocks)
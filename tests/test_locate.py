@@ -0,0 +1,73 @@
+import os
+import sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import math
+
+import numpy as np
+
+from nozzlesim import Mesh, Point, Shock, Wall
+from nozzlesim import helperfuncs as h
+
+
+def _mesh(n=8, theta=20):
+    topwalls, endx = Wall.createarc(Point(0, 0.5), 0.007, theta, n)
+    bottomwalls, endx = Wall.createarc(Point(0, -0.5), 0.007, -theta, n)
+    mesh = Mesh(1.25, 1.2, [], topwalls + bottomwalls, endx, 1)
+    mesh.simulate()
+    return mesh
+
+
+def _bruteforce(mesh, x, y):
+    """Return ``(v, theta)`` from the nearest shock above or below ``(x, y)``."""
+
+    above = below = None
+    for seg in mesh.shocks:
+        if seg.start.x <= x and (seg.end is None or seg.end.x > x):
+            segy = seg.start.y + (x - seg.start.x) * math.tan(math.radians(seg.angle))
+            if segy > y and (above is None or segy < above[0]):
+                above = (segy, seg)
+            if segy <= y and (below is None or segy > below[0]):
+                below = (segy, seg)
+    for entry, side in ((above, "below"), (below, "above")):
+        if entry is not None and isinstance(entry[1], Shock):
+            seg = entry[1]
+            downstream = (seg.angle > 0) == (side == "below")
+            vals = seg.getdownstreamvals() if downstream else seg.getupstreamvals()
+            return vals[0], vals[1]
+    return None
+
+
+def test_locator_matches_bruteforce():
+    mesh = _mesh()
+    locator = mesh.locator()
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 0.6, 400)
+    y = rng.uniform(-0.8, 0.8, 400)
+    result = locator.query(x, y)
+    checked = 0
+    for xi, yi, v, theta in zip(x, y, result["v"], result["theta"]):
+        expected = _bruteforce(mesh, xi, yi)
+        if expected is not None:
+            assert (v, theta) == expected
+            checked += 1
+    assert checked > 100
+    ok = ~np.isnan(result["v"])
+    np.testing.assert_allclose(
+        result["mach"][ok],
+        [h.calcmach(mesh.gamma, 1.0, v) for v in result["v"][ok]],
+        rtol=1e-8,
+    )
+
+
+def test_inlet_and_outside():
+    mesh = _mesh()
+    locator = mesh.locator()
+    mach = locator.mach([0.0005, 0.0005, 0.0005, -1.0], [0.0, 5.0, -5.0, 0.0])
+    assert math.isclose(mach[0], 1.2)
+    assert np.isnan(mach[1:]).all()
+    grid = locator.query(np.linspace(0, 0.5, 7)[:, None], np.linspace(-0.3, 0.3, 5))
+    assert grid["mach"].shape == (7, 5)
+    assert (grid["mach"] >= 1.2).all()
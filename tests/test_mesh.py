@@ -2,10 +2,16 @@ import os
 import sys
 import math
 
+import pytest
+
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from nozzlesim import Point, Shock, Wall
+from nozzlesim import helperfuncs as h
+import nozzlesim.mesh as meshmodule
+import nozzlesim.sweep as sweepmodule
+from nozzlesim.engine import Front
 from nozzlesim.mesh import Mesh, convertpoint
 
 
@@ -47,6 +53,94 @@ def test_findpairs_and_firstevent():
     assert isinstance(event[1][2], Point)
 
 
+def test_consecutive_walls_are_not_an_event():
+    walls, endx = Wall.createarc(Point(0, 0.5), 0.007, 20, 3)
+    mesh = Mesh(1.25, 1, [], walls, endx, 20)
+    corner = walls[1].start
+    assert not mesh.checkpair(mesh.shocks, walls[0], walls[1], corner, 0)
+
+
+def test_default_tolerance_matches_rounded_start_points():
+    s1 = Shock(Point(0, 0), 5, 1.4, 0, 0)
+    s2 = Shock(Point(0, 1), -5, 1.4, 0, 0)
+    s3 = Shock(Point(1, 0.5), 5, 1.4, 0, 0)
+    mesh = Mesh(1.4, 1, [], [s1, s2, s3], 2, 0)
+    assert mesh.index.tolerance == 1e-9
+    assert mesh.handled(mesh.shocks, s1, s2, 1 + 1e-12, 0.5)
+    exact = Mesh(1.4, 1, [], [s1, s2, s3], 2, 0, tolerance=0.0)
+    assert not exact.handled(exact.shocks, s1, s2, 1 + 1e-12, 0.5)
+    assert exact.handled(exact.shocks, s1, s2, 1, 0.5)
+
+
+def test_default_baseline_area_ratio():
+    # With exact start-point matching and wall corners treated as events, this
+    # run ended early and reported an area ratio of about 2.4e7.
+    mesh = sweepmodule.buildmesh({"n": 20})
+    mesh.simulate()
+    assert mesh.calcarearatio() == pytest.approx(92.1948641793225, rel=1e-6)
+
+
+def test_cached_line_coefficients_follow_angle():
+    s1 = Shock(Point(0, 0), 5, 1.4, 0, 0)
+    s2 = Shock(Point(0, 1), -5, 1.4, 0, 0)
+    s1.angle = 45
+    s2.angle = -45
+    assert math.isclose(s1.slope, 1.0)
+    assert math.isclose(s2.intercept, 1.0)
+    point = Shock.intersect(s1, s2)
+    expected = Shock.findintersection(s1.start, s2.start, s1.angle, s2.angle)
+    assert (point.x, point.y) == (expected.x, expected.y)
+    s2.angle = 45
+    assert Shock.intersect(s1, s2) is None
+
+
+def test_vectorized_findpairs_matches_scalar(monkeypatch):
+    mesh = _arcmesh(20, 34.45)
+    mesh.simulate(maxevents=150)
+    front = mesh.removeended(mesh.activeshocks, mesh.x)
+    scalar = mesh.findpairs(front, mesh.x)
+    monkeypatch.setattr(meshmodule, "VECTORIZEMIN", 2)
+    vectorized = mesh.findpairs(front, mesh.x)
+    assert scalar
+    assert [(t, b, p.x, p.y) for t, b, p in vectorized] == [
+        (t, b, p.x, p.y) for t, b, p in scalar
+    ]
+
+
+def test_carried_mach_state_matches_shockprop():
+    shock = Shock(Point(0, 0), 3, 1.4, 10, 2)
+    assert (shock.mach, shock.mu) == h.machstate(1.4, 10)
+    assert (shock.downstreammach, shock.downstreammu) == h.machstate(1.4, 13)
+    assert shock.propangle() == h.shockprop(1.4, 10, 2, 3)
+    top, bottom = Shock.newshocks(shock, Shock(Point(0, 1), -3, 1.4, 10, 2), 1, 0)
+    assert (top.mach, top.mu) == (shock.downstreammach, shock.downstreammu)
+    assert (bottom.downstreammach, bottom.downstreammu) == h.machstate(1.4, 16)
+    assert bottom.propangle() == h.shockprop(1.4, 13, -1, 3)
+
+
+def test_one_mach_inversion_per_new_region(monkeypatch):
+    mesh = _arcmesh(10, 20.0)
+    calls = []
+    calcmach = h.calcmach
+    monkeypatch.setattr(h, "calcmach", lambda *a: calls.append(a) or calcmach(*a))
+    process = mesh.processevent
+    counts = []
+
+    def processevent(event):
+        calls.clear()
+        record = process(event)
+        shocks = sum(isinstance(seg, Shock) for seg in record.created)
+        counts.append((record.kind, shocks, len(calls)))
+        return record
+
+    mesh.processevent = processevent
+    mesh.simulate()
+    assert counts
+    for kind, shocks, inversions in counts:
+        # Two shocks leaving a crossing share the region between them.
+        assert inversions == (1 if kind == "intersection" and shocks == 2 else shocks)
+
+
 def test_handleintersection_and_area():
     s1 = Shock(Point(0, 0), 5, 1.4, 0, 0)
     s2 = Shock(Point(0, 1), -5, 1.4, 0, 0)
@@ -60,3 +154,90 @@ def test_handleintersection_and_area():
     w2 = Wall(Point(0, 1), 0)
     mesh = Mesh(1.4, 1, [], [w1, w2], 1, 0)
     assert math.isclose(mesh.calcarearatio(), 1.0)
+
+
+def _arcmesh(n, theta, deltax=0.007):
+    topwalls, endx = Wall.createarc(Point(0, 0.5), deltax, theta, n)
+    bottomwalls, endx = Wall.createarc(Point(0, -0.5), deltax, -theta, n)
+    return Mesh(1.25, 1, [], topwalls + bottomwalls, endx, 1)
+
+
+def _segments(mesh):
+    return [
+        (type(s).__name__, s.start.x, s.start.y, s.angle, s.end and (s.end.x, s.end.y))
+        for s in mesh.shocks
+    ]
+
+
+def test_sweep_engine_matches_scan():
+    for n, theta in [(3, 10), (10, 20), (20, 34.45)]:
+        scan = _arcmesh(n, theta)
+        scan.simulate(engine="scan")
+        sweep = _arcmesh(n, theta)
+        sweep.simulate(engine="sweep")
+        assert _segments(sweep) == _segments(scan)
+        assert sweep.x == scan.x
+
+
+def test_sweep_engine_resumes_after_stop():
+    whole = _arcmesh(10, 20)
+    whole.simulate()
+    split = _arcmesh(10, 20)
+    split.simulate(stop=0.1)
+    assert split.x < whole.x
+    split.simulate()
+    assert _segments(split) == _segments(whole)
+
+
+def test_sweep_front_matches_list():
+    segs = [Shock(Point(i, 0), 1, 1.4, 5, 0) for i in range(200)]
+    front = Front(segs[:70])
+    order = list(segs[:70])
+    for k, seg in enumerate(segs[70:]):
+        i = (37 * k) % (len(order) + 1)
+        front.insert(i, seg)
+        order.insert(i, seg)
+    for seg in segs[::3]:
+        assert front.remove(seg) == order.index(seg)
+        order.remove(seg)
+    front.swap(order[10], order[11])
+    order[10], order[11] = order[11], order[10]
+    assert list(front) == order and len(front) == len(order)
+    assert [front[i] for i in range(len(order))] == order
+    assert all(front.index(seg) == i for i, seg in enumerate(order))
+    assert all(front.after(a) is b for a, b in zip(order, order[1:]))
+    assert front.after(order[-1]) is None and segs[0] not in front
+
+
+def test_simulate_rejects_unknown_engine():
+    mesh = _arcmesh(2, 10)
+    with pytest.raises(ValueError):
+        mesh.simulate(engine="bogus")
+
+
+@pytest.mark.parametrize("engine", ["sweep", "scan"])
+def test_iterevents_streams_created_segments(engine):
+    mesh = _arcmesh(6, 15)
+    initial = len(mesh.shocks)
+    events = list(mesh.iterevents(engine=engine))
+    assert {event.kind for event in events} == {"wall", "intersection"}
+    created = [seg for event in events for seg in event.created]
+    assert created == mesh.shocks[initial:]
+    for event in events:
+        assert all(seg.end.x == event.x for seg in event.ended)
+
+
+def test_iterevents_budgets_and_resume():
+    whole = _arcmesh(6, 15)
+    total = whole.simulate()
+
+    mesh = _arcmesh(6, 15)
+    assert len(list(mesh.iterevents(maxevents=5))) == 5
+    assert list(mesh.iterevents(timeout=0)) == []
+    assert list(mesh.iterevents(cancel=lambda: True)) == []
+    seen = []
+    for event in mesh.iterevents(cancel=lambda: len(seen) == 3):
+        seen.append(event)
+    assert len(seen) == 3
+    assert mesh.simulate() == total - 8
+    assert _segments(mesh) == _segments(whole)
@@ -6,6 +6,7 @@ os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from nozzlesim import Point, Shock, Wall
+from nozzlesim import helperfuncs as h
 from nozzlesim.mesh import Mesh
 
 
@@ -19,8 +20,8 @@ def test_point_distance_and_equals():
 
 def test_shock_vals_and_exists_str():
     shock = Shock(Point(0, 0), 5, 1.4, 0, 0)
-    assert shock.getupstreamvals() == [0, 0, 1.4]
-    assert shock.getdownstreamvals() == [5, 5, 1.4]
+    assert shock.getupstreamvals() == [0, 0, 1.4, 1.0, 90.0]
+    assert shock.getdownstreamvals() == [5, 5, 1.4, *h.machstate(1.4, 5)]
     assert not shock.exists(-1)
     assert shock.exists(0.1)
     shock.end = Point(0.2, 0)
@@ -33,7 +34,7 @@ def test_shock_regions_and_newshocks():
     s1 = Shock(Point(0, 0), 3, 1.4, 0, 0)
     s2 = Shock(Point(1, 0), -2, 1.4, 0, 0)
     params = Shock.calcregionparams(0, 0, 1.4, s1)
-    assert params == [3, 3, 1.4]
+    assert params == [3, 3, 1.4, s1.downstreammach, s1.downstreammu]
     new = Shock.newshocks(s1, s2, 1, 1)
     assert len(new) == 2
     assert new[0].turningangle == s2.turningangle
@@ -0,0 +1,55 @@
+import os
+import sys
+import math
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+import nozzlesim.helperfuncs as h
+import nozzlesim.kernels as k
+from nozzlesim import pmtable
+
+
+@pytest.mark.parametrize("gamma", [1.1, 1.25, 1.4, 1.67])
+def test_table_meets_tolerance(gamma):
+    table = pmtable.PMTable(gamma, tolerance=1e-8)
+    assert table.maxerror <= 1e-8
+    angles = np.linspace(0, 0.999 * table.vmax, 997)
+    exact = k.calcmach(gamma, angles)
+    result = np.array([table.mach(v) for v in angles])
+    np.testing.assert_allclose(result, exact, rtol=1e-8)
+
+
+def test_polish_and_tolerance_control_accuracy():
+    coarse = pmtable.PMTable(1.4, tolerance=1e-5)
+    fine = pmtable.PMTable(1.4, tolerance=1e-10)
+    polished = pmtable.PMTable(1.4, tolerance=1e-5, polish=True)
+    assert coarse.size < fine.size
+    exact = float(k.calcmach(1.4, 37.0))
+    assert abs(coarse.mach(37.0) / exact - 1) <= 1e-5
+    assert abs(polished.mach(37.0) / exact - 1) < 1e-9
+    with pytest.raises(ValueError):
+        pmtable.PMTable(1.4, tolerance=1e-14)
+
+
+def test_calcmach_uses_configured_table():
+    try:
+        h.configurepm(tolerance=1e-6)
+        assert pmtable.gettable(1.3).tolerance == 1e-6
+        assert math.isclose(
+            h.calcmach(1.3, 1.0, 20.0), k.calcmach(1.3, 20.0), rel_tol=1e-6
+        )
+    finally:
+        h.configurepm(tolerance=pmtable.DEFAULT_TOLERANCE)
+    assert pmtable.gettable(1.3).tolerance == pmtable.DEFAULT_TOLERANCE
+    # Explicit ``steps`` and angles past ``vmax`` keep the bisection.
+    assert math.isclose(
+        h.calcmach(1.3, 1.0, 20.0, 40), h.calcmach(1.3, 1.0, 20.0), rel_tol=1e-7
+    )
+    assert math.isclose(h.calcmach(1.4, 1.0, 200.0), 100.0, rel_tol=1e-6)
+    assert math.isclose(
+        h.calcmach(1.4, 2.0, 5.0), k.calcmach(1.4, 5.0, 2.0), rel_tol=1e-9
+    )
@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from nozzlesim import Mesh, Point, Wall, render
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _mesh():
+    topwalls, endx = Wall.createarc(Point(0, 0.5), 0.007, 10, 4)
+    bottomwalls, endx = Wall.createarc(Point(0, -0.5), 0.007, -10, 4)
+    mesh = Mesh(1.25, 1, [], topwalls + bottomwalls, endx, 1)
+    mesh.simulate()
+    return mesh
+
+
+def test_import_does_not_load_pygame():
+    code = "import sys, nozzlesim; print('pygame' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_backend_without_line_fails_on_construction():
+    class Incomplete(render.Renderer):
+        pass
+
+    render.register("incomplete", Incomplete)
+    try:
+        with pytest.raises(TypeError):
+            render.getrenderer("incomplete", [(0, -1), (1, 1)], 10, 10)
+    finally:
+        del render.RENDERERS["incomplete"]
+
+
+def test_svg_renderer(tmp_path):
+    mesh = _mesh()
+    renderer = render.getrenderer("svg", [(-0.01, -1), (0.1, 1)], 200, 100)
+    renderer.drawmesh(mesh)
+    lines = renderer.asarray()
+    inside = [s for s in mesh.shocks if s.start.x < 0.1 and -1 < s.start.y < 1]
+    assert lines.shape == (len(inside), 4)
+    assert (lines[:, [0, 2]] >= 0).all() and (lines[:, [0, 2]] <= 200).all()
+
+    walls = render.SVGRenderer([(-0.01, -1), (0.1, 1)], 200, 100)
+    walls.drawmesh(mesh, justwalls=True)
+    assert len(walls.lines) == sum(isinstance(s, Wall) for s in inside)
+
+    path = tmp_path / "mesh.svg"
+    renderer.save(str(path))
+    assert path.read_text().count("<line ") == len(lines)
+    with pytest.raises(ValueError):
+        render.getrenderer("postscript")
+
+
+def test_batch_clipping_matches_per_segment_path():
+    mesh = _mesh()
+    for bounds in ([(0, -10), (20, 10)], [(-0.01, -0.4), (0.05, 0.4)]):
+        single = render.SVGRenderer(bounds, 300, 200)
+        single.drawsegments(mesh.shocks)
+        batch = render.cliplines(mesh.as_arrays(), bounds, 300, 200)
+        np.testing.assert_array_equal(batch, single.asarray())
+
+
+def test_png_output(tmp_path):
+    mesh = _mesh()
+    path = tmp_path / "mesh.png"
+    render.savemesh(mesh, str(path), [(-0.01, -1), (0.1, 1)], 120, 80)
+    data = path.read_bytes()
+    assert data.startswith(b"\x89PNG\r\n\x1a\n")
+    image = render.ImageRenderer([(0, 0), (1, 1)], 10, 10).image
+    render.rasterize(image, [[0.5, 0.5, 9.5, 0.5]])
+    assert (image[0] == 0).all() and (image[1:] == 255).all()
+    with pytest.raises(ValueError):
+        render.savemesh(mesh, str(tmp_path / "mesh.gif"), [(0, 0), (1, 1)], 5, 5)
+
+
+def test_pygame_renderer_matches_svg():
+    pygame = pytest.importorskip("pygame")
+    pygame.display.init()
+    try:
+        screen = pygame.display.set_mode((200, 100))
+        screen.fill((255, 255, 255))
+        mesh = _mesh()
+        bounds = [(-0.01, -1), (0.1, 1)]
+        mesh.drawallshocks(screen, bounds, 200, 100)
+        svg = render.SVGRenderer(bounds, 200, 100)
+        svg.drawmesh(mesh)
+        x, y = svg.asarray()[0, :2]
+        assert screen.get_at((int(x), int(y)))[:3] == (0, 0, 0)
+        offscreen = pygame.Surface((200, 100))
+        render.PygameRenderer(offscreen, bounds).drawmesh(mesh)
+    finally:
+        pygame.display.quit()
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from nozzlesim import Point, Wall, mesh as meshmodule
+from nozzlesim.mesh import Mesh
+from nozzlesim.store import SHOCK
+
+
+def _arcmesh(n, theta, **kwargs):
+    topwalls, endx = Wall.createarc(Point(0, 0.5), 0.007, theta, n)
+    bottomwalls, endx = Wall.createarc(Point(0, -0.5), 0.007, -theta, n)
+    return Mesh(1.25, 1, [], topwalls + bottomwalls, endx, 1, **kwargs)
+
+
+def _rows(arrays):
+    names = ("kind", "startx", "starty", "angle", "endx", "endy", "v")
+    return sorted(
+        zip(
+            *(
+                np.nan_to_num(np.round(arrays[name], 9), nan=-1).tolist()
+                for name in names
+            )
+        )
+    )
+
+
+@pytest.mark.parametrize("engine", ["sweep", "scan"])
+def test_spilled_and_kept_segments_make_up_the_whole_mesh(
+    tmp_path, monkeypatch, engine
+):
+    monkeypatch.setattr(meshmodule, "COMPACTSLACK", 0)
+    whole = _arcmesh(12, 25)
+    whole.simulate(engine=engine)
+
+    with _arcmesh(12, 25, retain="spill", spillpath=str(tmp_path / "segs.log")) as mesh:
+        mesh.simulate(engine=engine)
+    assert mesh.log.file.closed
+    log = mesh.segmentlog()
+    assert len(log) == mesh.spillstats["count"] > 0
+    assert len(mesh.shocks) + len(log) == len(whole.shocks)
+    kept = mesh.as_arrays()
+    combined = {name: np.concatenate([kept[name], log[name]]) for name in kept}
+    assert _rows(combined) == _rows(whole.as_arrays())
+    assert mesh.x == whole.x
+    assert mesh.calcarearatio() == whole.calcarearatio()
+
+
+def test_discard_keeps_walls_and_summary():
+    whole = _arcmesh(12, 25)
+    whole.simulate()
+    mesh = _arcmesh(12, 25, retain="discard")
+    mesh.simulate()
+    walls = [seg for seg in whole.shocks if isinstance(seg, Wall)]
+    assert sum(isinstance(seg, Wall) for seg in mesh.shocks) == len(walls)
+    assert len(mesh.shocks) < len(whole.shocks) // 2
+    assert len(mesh.store) == len(mesh.shocks)
+    arrays = whole.as_arrays()
+    shocks = arrays["kind"] == SHOCK
+    downstream = arrays["v"][shocks] + np.abs(arrays["turningangle"][shocks])
+    assert mesh.spillstats["maxv"] <= downstream.max()
+
+
+def test_retain_validation():
+    with pytest.raises(ValueError):
+        _arcmesh(2, 10, retain="bogus")
+    with pytest.raises(ValueError):
+        _arcmesh(2, 10, retain="spill")
+    with pytest.raises(ValueError):
+        _arcmesh(2, 10).segmentlog()
@@ -0,0 +1,54 @@
+import os
+import sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import math
+
+import numpy as np
+import pytest
+
+from nozzlesim import Point, Shock, Wall, Mesh
+from nozzlesim.store import SHOCK, WALL, CharacteristicStore
+
+
+def test_as_arrays_matches_segments():
+    topwalls, endx = Wall.createarc(Point(0, 0.5), 0.007, 20, 8)
+    bottomwalls, endx = Wall.createarc(Point(0, -0.5), 0.007, -20, 8)
+    mesh = Mesh(1.25, 1, [], topwalls + bottomwalls, endx, 1)
+    mesh.simulate()
+    arrays = mesh.as_arrays()
+    assert len(arrays["kind"]) == len(mesh.shocks) > 100
+
+    for i, seg in enumerate(mesh.shocks):
+        assert arrays["startx"][i] == seg.start.x
+        assert arrays["starty"][i] == seg.start.y
+        assert arrays["angle"][i] == seg.angle
+        if seg.end is None:
+            assert math.isnan(arrays["endx"][i])
+        else:
+            assert (arrays["endx"][i], arrays["endy"][i]) == (seg.end.x, seg.end.y)
+        if isinstance(seg, Wall):
+            assert arrays["kind"][i] == WALL
+            assert math.isnan(arrays["v"][i])
+        else:
+            assert arrays["kind"][i] == SHOCK
+            assert arrays["v"][i] == seg.v
+            assert arrays["turningangle"][i] == seg.turningangle
+
+    with pytest.raises(ValueError):
+        arrays["v"][0] = 1.0
+
+
+def test_store_grows():
+    store = CharacteristicStore(capacity=1)
+    shocks = [Shock(Point(i, 0), 1, 1.4, 5, 0) for i in range(5)]
+    for shock in shocks:
+        store.append(shock)
+    assert len(store) == 5 and store.capacity >= 5
+    store.setend(shocks[2], Point(3, 1))
+    np.testing.assert_array_equal(store.as_arrays()["startx"], np.arange(5.0))
+    assert store.as_arrays()["endy"][2] == 1
+    assert store.row(shocks[4]) == 4
+    assert store.nbytes > sum(c.nbytes for c in store.columns.values())
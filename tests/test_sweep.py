@@ -0,0 +1,69 @@
+import os
+import sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from nozzlesim import sweep
+
+
+def test_grid_and_keys():
+    cases = sweep.grid(gamma=[1.2, 1.4], n=[4, 6, 8], theta=10)
+    assert len(cases) == 6
+    assert cases[0] == {"gamma": 1.2, "n": 4, "theta": 10}
+    # Defaults are part of the key, so spelling them out changes nothing.
+    assert sweep.casekey({"n": 4}) == sweep.casekey({"n": 4, "gamma": 1.25})
+    with pytest.raises(ValueError):
+        sweep.grid(mach=[2])
+
+
+def test_run_resumes_from_results_file(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    cases = sweep.grid(n=[4, 6], theta=[10, 15])
+    first = list(sweep.run(cases[:3], workers=1, resultsfile=path))
+    assert [r["params"] for r in first] == cases[:3]
+    assert all(r["error"] is None and r["elapsed"] >= 0 for r in first)
+
+    rest = list(sweep.run(cases, workers=1, resultsfile=path))
+    assert [r["params"] for r in rest] == cases[3:]
+    assert len(sweep.loadresults(path)) == 4
+    assert list(sweep.run(cases, workers=1, resultsfile=path)) == []
+
+    # A record cut off mid-write is dropped and its case run again.
+    with open(path, "a") as f:
+        f.write('{"key": ')
+    assert len(sweep.loadresults(path)) == 4
+    extra = sweep.grid(n=8, theta=10)
+    assert len(list(sweep.run(extra, workers=1, resultsfile=path))) == 1
+    assert len(sweep.loadresults(path)) == 5
+
+
+def test_pool_matches_serial():
+    cases = sweep.grid(n=[4, 6, 8], theta=[10, 20], table=True, tablepoints=5)
+    serial = {r["key"]: r for r in sweep.run(cases, workers=1)}
+    pooled = {r["key"]: r for r in sweep.run(cases, workers=2, chunksize=2)}
+    assert serial.keys() == pooled.keys()
+    for key, result in serial.items():
+        assert pooled[key]["arearatio"] == result["arearatio"]
+        assert pooled[key]["table"] == result["table"]
+
+
+def test_half_cases_match_full_cases():
+    full, half = sweep.run(sweep.grid(n=6, theta=15, half=[False, True]), workers=1)
+    assert half["arearatio"] == pytest.approx(full["arearatio"])
+    assert half["segments"] < full["segments"]
+
+
+def test_errors_are_reported_per_case():
+    (result,) = sweep.run([{"n": 0}], workers=1)
+    assert result["error"] is not None
+
+
+def test_cases_can_be_plotted(tmp_path):
+    pattern = str(tmp_path / "mesh_{n}.svg")
+    cases = sweep.grid(n=[4, 6], theta=10, plot=pattern, plotbounds=((0, -1), (1, 1)))
+    results = list(sweep.run(cases, workers=1))
+    assert [r["plot"] for r in results] == [pattern.format(n=4), pattern.format(n=6)]
+    assert all(os.path.getsize(r["plot"]) > 0 for r in results)
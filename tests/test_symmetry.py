@@ -6,7 +6,7 @@ import numpy as np
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from nozzlesim import Wall, Point, Mesh, Shock
+from nozzlesim import Wall, Point, Mesh, Shock, SymmetryPlane, sweep
 
 
 def check_symmetry(mesh, epsilon=1e-4):
@@ -15,17 +15,27 @@ def check_symmetry(mesh, epsilon=1e-4):
         matchfound = False
         closestmatch = float("inf")
         for seg2 in mesh.shocks:
-            if (abs(seg.start.x - seg2.start.x) < epsilon
-                    and abs(seg.start.y + seg2.start.y) < epsilon
-                    and abs(seg.angle + seg2.angle) < epsilon):
+            if (
+                abs(seg.start.x - seg2.start.x) < epsilon
+                and abs(seg.start.y + seg2.start.y) < epsilon
+                and abs(seg.angle + seg2.angle) < epsilon
+            ):
                 matchfound = True
                 break
-            closestmatch = min(closestmatch,
-                               np.sqrt((seg.start.x - seg2.start.x) ** 2 + (seg.start.y + seg2.start.y) ** 2) + (
-                                           seg.angle + seg2.angle) ** 2)
+            closestmatch = min(
+                closestmatch,
+                np.sqrt(
+                    (seg.start.x - seg2.start.x) ** 2
+                    + (seg.start.y + seg2.start.y) ** 2
+                )
+                + (seg.angle + seg2.angle) ** 2,
+            )
         if not matchfound:
-            parameters = [(seg.start.x, seg.start.y) if seg.start is not None else (),
-                          (seg.end.x, seg.end.y) if seg.end is not None else (), seg.angle]
+            parameters = [
+                (seg.start.x, seg.start.y) if seg.start is not None else (),
+                (seg.end.x, seg.end.y) if seg.end is not None else (),
+                seg.angle,
+            ]
             print(f"Symmetry break: {parameters}, closest match: {closestmatch:.4f}")
             any_failed = True
     return any_failed
@@ -37,14 +47,76 @@ def test_symmetry():
         topwalls, endx = Wall.createarc(Point(0, 0.5), 0.07, theta, n)
         bottomwalls, endx = Wall.createarc(Point(0, -0.5), 0.07, -theta, n)
         for i in range(len(topwalls)):
-            assert abs(topwalls[i].angle + bottomwalls[
-                i].angle) < 1e-4, f"Angle mismatch at index {i}: {topwalls[i].angle} vs {-bottomwalls[i].angle}  "
-            assert abs(topwalls[i].start.x - bottomwalls[
-                i].start.x) < 1e-4, f"Start x mismatch at index {i}: {topwalls[i].start.x} vs {bottomwalls[i].start.x}  "
-            assert abs(topwalls[i].start.y + bottomwalls[
-                i].start.y) < 1e-4, f"Start y mismatch at index {i}: {topwalls[i].start.y} vs {-bottomwalls[i].start.y}  "
+            assert (
+                abs(topwalls[i].angle + bottomwalls[i].angle) < 1e-4
+            ), f"Angle mismatch at index {i}: {topwalls[i].angle} vs {-bottomwalls[i].angle}  "
+            assert (
+                abs(topwalls[i].start.x - bottomwalls[i].start.x) < 1e-4
+            ), f"Start x mismatch at index {i}: {topwalls[i].start.x} vs {bottomwalls[i].start.x}  "
+            assert (
+                abs(topwalls[i].start.y + bottomwalls[i].start.y) < 1e-4
+            ), f"Start y mismatch at index {i}: {topwalls[i].start.y} vs {-bottomwalls[i].start.y}  "
         mesh = Mesh(1.25, 1, [], topwalls + bottomwalls, endx, 1)
         mesh.simulate()
         table = mesh.getxytable(0, 1000, 0.011)
-        assert not check_symmetry(mesh, epsilon=1e-3), f"Symmetry check failed for n={n} and theta={theta} degrees"
-        assert len(list(x for x in mesh.activeshocks if isinstance(x, Shock))) == 0, f"Active shock found after simulation for n={n} and theta={theta} degrees"
+        assert not check_symmetry(
+            mesh, epsilon=1e-3
+        ), f"Symmetry check failed for n={n} and theta={theta} degrees"
+        assert (
+            len(list(x for x in mesh.activeshocks if isinstance(x, Shock))) == 0
+        ), f"Active shock found after simulation for n={n} and theta={theta} degrees"
+
+
+def test_half_mesh_mirrors_to_full_mesh():
+    for n in [1, 2, 3, 4]:
+        theta = 10
+        topwalls, endx = Wall.createarc(Point(0, 0.5), 0.07, theta, n)
+        bottomwalls, endx = Wall.createarc(Point(0, -0.5), 0.07, -theta, n)
+        full = Mesh(1.25, 1, [], topwalls + bottomwalls, endx, 1)
+        fullevents = full.simulate()
+
+        topwalls, endx = Wall.createarc(Point(0, 0.5), 0.07, theta, n)
+        half = Mesh(1.25, 1, [], topwalls + [SymmetryPlane()], endx, 1)
+        halfevents = half.simulate()
+        assert halfevents < fullevents
+        assert np.isclose(half.calcarearatio(), full.calcarearatio())
+
+        mirrored = half.mirror()
+        assert len(mirrored.shocks) == len(full.shocks)
+        assert not check_symmetry(mirrored, epsilon=1e-9)
+        for seg in full.shocks:
+            assert any(
+                abs(seg.start.x - other.start.x) < 1e-3
+                and abs(seg.start.y - other.start.y) < 1e-3
+                and abs(seg.angle - other.angle) < 1e-6
+                for other in mirrored.shocks
+            )
+        assert not [x for x in mirrored.activeshocks if isinstance(x, Shock)]
+
+
+def test_mirrored_mesh_keeps_settings(tmp_path):
+    params = {"n": 30, "mergeturn": 3.0}
+    full = sweep.buildmesh(params)
+    full.simulate()
+    half = sweep.buildmesh({**params, "half": True})
+    half.simulate(maxevents=3)
+    mirrored = half.mirror()
+    assert (mirrored.mergeturn, mirrored.maxturn) == (3.0, None)
+    mirrored.simulate()
+    assert len(mirrored.shocks) == len(full.shocks)
+    assert np.isclose(mirrored.calcarearatio(), full.calcarearatio())
+
+    topwalls, endx = Wall.createarc(Point(0, 0.5), 0.07, 10, 3)
+    logpath = str(tmp_path / "half.log")
+    half = Mesh(
+        1.25,
+        1,
+        [],
+        topwalls + [SymmetryPlane()],
+        endx,
+        1,
+        retain="spill",
+        spillpath=logpath,
+    )
+    with half, half.mirror(spillpath=str(tmp_path / "full.log")) as full:
+        assert full.retain == "spill"